@@ -0,0 +1,118 @@
+## External Libraries
+from typing import Union, List
+import json
+import os
+import time
+from web3 import Web3
+
+
+class AbiStore():
+    '''
+    A persistent, on-disk store of contract ABIs downloaded from BscScan, keyed by chain and address,
+    so an ABI is only ever downloaded once across all runs and processes.
+
+    File Format
+    -----------
+    One json file per contract: {folder}/{blockchain_name}_{blockchain_net}/{checksum address}.json
+        - holds the abi list, or null if BscScan says the contract is not verified (so it is not asked again).
+        - files are written atomically, so processes sharing the folder never read a half written file.
+
+    BscScan is rate limited, so downloads are spaced at least `min_fetch_interval_seconds` apart, and a
+    rate limited download is retried up to `max_retries` times. Use prefetch() to download every ABI a job
+    will need up front, rather than one at a time in the middle of decoding.
+
+    Methods
+    -------
+    get_fileloc
+    load
+    save
+    fetch
+    get
+    prefetch
+    '''
+
+    def __init__(self, folder: str, blockchain_name: str, blockchain_net: str, BscScan, logger, min_fetch_interval_seconds: float = 0.21, max_retries: int = 5):
+        '''
+        Parameters
+        ----------
+        BscScan
+            The BscScan object of a CommsBlockchainDataProviders for the same blockchain_net.
+        '''
+        self.folder = os.path.join(folder, f'{blockchain_name}_{blockchain_net}')
+        self.BscScan = BscScan
+        self.logger = logger
+        self.min_fetch_interval_seconds = min_fetch_interval_seconds
+        self.max_retries = max_retries
+        self.abis = {}  # {address: abi or None}, everything loaded or downloaded by this instance
+        self.last_fetch_time = 0
+
+
+    def get_fileloc(self, address: str) -> str:
+        return os.path.join(self.folder, f'{address}.json')
+
+
+    def load(self, address: str) -> bool:
+        ''' Loads the address's abi from disk into self.abis. Returns False if it has never been downloaded. '''
+        fileloc = self.get_fileloc(address)
+        if not os.path.exists(fileloc):
+            return False
+        with open(fileloc) as json_file:
+            self.abis[address] = json.load(json_file)
+        return True
+
+
+    def save(self, address: str, abi: Union[list, None]):
+        os.makedirs(self.folder, exist_ok=True)
+        fileloc = self.get_fileloc(address)
+        temp_fileloc = f'{fileloc}.{os.getpid()}.tmp'
+        with open(temp_fileloc, 'w') as json_file:
+            json.dump(abi, json_file)
+        os.replace(temp_fileloc, fileloc)
+        self.abis[address] = abi
+
+
+    def fetch(self, address: str) -> Union[list, None]:
+        ''' Downloads the abi from BscScan and saves it. Returns None if the contract is not verified. '''
+        for attempt in range(self.max_retries + 1):
+            wait_seconds = self.min_fetch_interval_seconds - (time.monotonic() - self.last_fetch_time)
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+            self.last_fetch_time = time.monotonic()
+            result = self.BscScan.get_abi(contract_address=address)
+            try:
+                abi = json.loads(result)
+            except ValueError:
+                if 'not verified' in result.lower():
+                    self.logger.debug(f'Contract ABI not available, as the contract is not verified on BscScan. Address: {address}.')
+                    self.save(address, None)
+                    return None
+                self.logger.debug(f'BscScan ABI download failed, retrying. Address: {address}. Attempt: {attempt + 1}. Result: {result}.')
+                time.sleep(self.min_fetch_interval_seconds * (2 ** attempt))
+                continue
+            self.save(address, abi)
+            return abi
+        error = f'BscScan ABI download failed after {self.max_retries} retries. Address: {address}. Result: {result}.'
+        self.logger.critical(error)
+        raise Exception(error)
+
+
+    def get(self, address: str) -> Union[list, None]:
+        ''' Returns the abi from memory, else disk, else BscScan. None if the contract is not verified. '''
+        address = Web3.toChecksumAddress(address)
+        if (address in self.abis) or self.load(address):
+            return self.abis[address]
+        return self.fetch(address)
+
+
+    def prefetch(self, addresses: List[str]) -> dict:
+        '''
+        Makes sure every address's abi is in memory, downloading the ones never seen before.
+        Returns {address: abi or None}.
+        '''
+        addresses = list(dict.fromkeys(Web3.toChecksumAddress(address) for address in addresses))
+        missing_addresses = [address for address in addresses if (address not in self.abis) and (not self.load(address))]
+        if missing_addresses:
+            self.logger.debug(f'Downloading {len(missing_addresses)} contract ABIs from BscScan.')
+        for address in missing_addresses:
+            self.fetch(address)
+        return {address: self.abis[address] for address in addresses}
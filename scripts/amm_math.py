@@ -0,0 +1,117 @@
+## External Libraries
+from typing import List
+import numpy as np
+
+
+class ConstantProductAMM():
+    '''
+    Exact Uniswap V2 style (x * y = k) swap math, done locally from pool reserves instead of asking the router contract.
+
+    Everything is in integer token units (wei style, before dividing by decimals) and uses the same integer
+    arithmetic and rounding as the on-chain library, so results match getAmountsOut / getAmountsIn exactly.
+        - PancakeSwap V2 keeps a 0.25% fee:  ConstantProductAMM(fee_numerator=9975, fee_denominator=10000)
+        - Uniswap V2 keeps a 0.3% fee:       ConstantProductAMM(fee_numerator=997, fee_denominator=1000)
+
+    The "_many" methods take numpy arrays (or anything array-like) and broadcast, so many trade sizes and/or many
+    pools are quoted at once. They use numpy object arrays of python ints, so they stay exact for 112 bit reserves.
+
+    Methods
+    -------
+    get_amount_out
+    get_amount_in
+    get_amounts_out
+    get_amounts_in
+    get_amount_out_many
+    get_amount_in_many
+    get_price_impact
+    '''
+
+    def __init__(self, fee_numerator: int = 9975, fee_denominator: int = 10000):
+        self.fee_numerator = fee_numerator
+        self.fee_denominator = fee_denominator
+
+
+    def get_amount_out(self, amount_in: int, reserve_in: int, reserve_out: int) -> int:
+        ''' Amount of the output token received for selling exactly `amount_in` of the input token. '''
+        if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+            return 0
+        amount_in_with_fee = amount_in * self.fee_numerator
+        return (amount_in_with_fee * reserve_out) // ((reserve_in * self.fee_denominator) + amount_in_with_fee)
+
+
+    def get_amount_in(self, amount_out: int, reserve_in: int, reserve_out: int) -> int:
+        ''' Amount of the input token that must be sold to receive exactly `amount_out` of the output token. '''
+        if amount_out <= 0:
+            return 0
+        if reserve_in <= 0 or reserve_out <= 0:
+            raise ValueError(f'Cannot buy {amount_out} from a pool with no liquidity. Reserves: ({reserve_in}, {reserve_out}).')
+        if amount_out >= reserve_out:
+            raise ValueError(f'Cannot buy {amount_out} from a pool that only has {reserve_out} of the token.')
+        return ((reserve_in * amount_out * self.fee_denominator) // ((reserve_out - amount_out) * self.fee_numerator)) + 1
+
+
+    def get_amounts_out(self, amount_in: int, path_reserves: List[tuple]) -> List[int]:
+        '''
+        Multi-hop version of get_amount_out, as the router's getAmountsOut.
+
+        Parameters
+        ----------
+        path_reserves : List[tuple]
+            (reserve_in, reserve_out) of each hop's pool, in swap order.
+
+        Returns the amount after each hop, starting with amount_in.
+        '''
+        amounts = [amount_in]
+        for reserve_in, reserve_out in path_reserves:
+            amounts.append(self.get_amount_out(amounts[-1], reserve_in, reserve_out))
+        return amounts
+
+
+    def get_amounts_in(self, amount_out: int, path_reserves: List[tuple]) -> List[int]:
+        ''' Multi-hop version of get_amount_in, as the router's getAmountsIn. Returns the amount before each hop, ending with amount_out. '''
+        amounts = [amount_out]
+        for reserve_in, reserve_out in reversed(path_reserves):
+            amounts.insert(0, self.get_amount_in(amounts[0], reserve_in, reserve_out))
+        return amounts
+
+
+    @staticmethod
+    def _to_int_array(x) -> np.ndarray:
+        return np.vectorize(int, otypes=[object])(np.asarray(x, dtype=object))
+
+
+    def get_amount_out_many(self, amounts_in, reserves_in, reserves_out) -> np.ndarray:
+        '''
+        Vectorised get_amount_out. Inputs broadcast against each other, e.g.
+            - many sizes in one pool:   amounts_in of shape (n,), scalar reserves
+            - one size in many pools:   scalar amounts_in, reserves of shape (m,)
+            - every size in every pool: amounts_in of shape (n, 1), reserves of shape (m,)
+        Returns an object array of python ints.
+        '''
+        amounts_in, reserves_in, reserves_out = (self._to_int_array(x) for x in (amounts_in, reserves_in, reserves_out))
+        amounts_in_with_fee = amounts_in * self.fee_numerator
+        denominator = (reserves_in * self.fee_denominator) + amounts_in_with_fee
+        valid = (amounts_in > 0) & (reserves_in > 0) & (reserves_out > 0)
+        amounts_out = (amounts_in_with_fee * reserves_out) // np.where(valid, denominator, 1)
+        return np.where(valid, amounts_out, 0)
+
+
+    def get_amount_in_many(self, amounts_out, reserves_in, reserves_out) -> np.ndarray:
+        '''
+        Vectorised get_amount_in, broadcasting as get_amount_out_many.
+        Amounts that can't be bought (amount_out >= reserve_out, or a pool with no liquidity) are returned as None.
+        '''
+        amounts_out, reserves_in, reserves_out = (self._to_int_array(x) for x in (amounts_out, reserves_in, reserves_out))
+        valid = (amounts_out <= 0) | ((amounts_out < reserves_out) & (reserves_in > 0) & (reserves_out > 0))
+        denominator = np.where(valid, reserves_out - amounts_out, 1) * self.fee_numerator
+        amounts_in = ((reserves_in * amounts_out * self.fee_denominator) // denominator) + 1
+        amounts_in = np.where(amounts_out > 0, amounts_in, 0)
+        return np.where(valid, amounts_in, None)
+
+
+    def get_price_impact(self, amount_in: int, reserve_in: int, reserve_out: int) -> float:
+        ''' How much worse the average fill price is than the pool's price before the trade, as a decimal. Includes the fee. '''
+        amount_out = self.get_amount_out(amount_in, reserve_in, reserve_out)
+        if amount_out == 0:
+            return 1.0
+        return 1 - ((amount_out / amount_in) / (reserve_out / reserve_in))
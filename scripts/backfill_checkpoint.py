@@ -0,0 +1,100 @@
+## Internal Modules
+from scripts.utils import DataLoc
+
+## External Libraries
+from typing import Union, List
+import json
+import os
+
+
+class BackfillCheckpoint():
+    '''
+    Records, per pool, the last block whose data has been fully processed by a backfill job,
+    so that a job that dies part way through can resume where it stopped instead of starting over.
+
+    File Format
+    -----------
+    One json file per job in DataLoc.Folder.DATA_CHECKPOINTS:
+        {
+            'start_block': int,
+            'end_block': int,
+            'last_blocks': {pool_key: last fully processed block, or start_block - 1 if none},
+            'metadata': dict  # anything the caller needs to resume the job, e.g. its output file names
+        }
+    The file is replaced atomically on every update, so a crash never leaves a half written checkpoint.
+
+    Methods
+    -------
+    open
+    start
+    save
+    next_block
+    update
+    is_complete
+    '''
+
+    def __init__(self, fileloc: str):
+        self.fileloc = fileloc
+        self.start_block = None
+        self.end_block = None
+        self.last_blocks = {}
+        self.metadata = {}
+
+
+    @classmethod
+    def open(cls, job_name: str, DataLoc: DataLoc):
+        return cls(fileloc=os.path.join(DataLoc.Folder.DATA_CHECKPOINTS.value, f'{job_name}.json'))
+
+
+    def start(self, start_block: int, end_block: int, pool_keys: List[str], metadata: Union[dict, None] = None, resume: bool = True):
+        '''
+        Loads the job's checkpoint if resume is True and the saved job is unfinished; otherwise starts a new job.
+        When resuming, the saved block range and metadata are kept and the arguments given here are ignored,
+        apart from new `pool_keys`, which are added to start at the saved job's start_block.
+        '''
+        if resume is True and os.path.exists(self.fileloc):
+            with open(self.fileloc) as json_file:
+                saved = json.load(json_file)
+            self.start_block = saved['start_block']
+            self.end_block = saved['end_block']
+            self.last_blocks = saved['last_blocks']
+            self.metadata = saved['metadata']
+            if not self.is_complete():
+                for pool_key in pool_keys:
+                    self.last_blocks.setdefault(pool_key, self.start_block - 1)
+                return self.save()
+        self.start_block = start_block
+        self.end_block = end_block
+        self.last_blocks = {pool_key: start_block - 1 for pool_key in pool_keys}
+        self.metadata = {} if metadata is None else metadata
+        return self.save()
+
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.fileloc), exist_ok=True)
+        temp_fileloc = f'{self.fileloc}.tmp'
+        with open(temp_fileloc, 'w') as json_file:
+            json.dump({
+                'start_block': self.start_block,
+                'end_block': self.end_block,
+                'last_blocks': self.last_blocks,
+                'metadata': self.metadata,
+            }, json_file)
+        os.replace(temp_fileloc, self.fileloc)
+        return self
+
+
+    def next_block(self, pool_key: str) -> int:
+        ''' The first block the pool still needs. '''
+        return self.last_blocks[pool_key] + 1
+
+
+    def update(self, pool_keys: List[str], last_block: int):
+        ''' Call only after the data for `pool_keys` up to and including `last_block` has been saved. '''
+        for pool_key in pool_keys:
+            self.last_blocks[pool_key] = last_block
+        return self.save()
+
+
+    def is_complete(self) -> bool:
+        return all(last_block >= self.end_block for last_block in self.last_blocks.values())
@@ -0,0 +1,167 @@
+## External Libraries
+from typing import Union
+import numpy as np
+
+
+class BarBuilder():
+    '''
+    Builds OHLCV and VWAP bars for one pair from trades in the columnar format of TradeStorage.
+
+    Prices are quoted in units of the quote symbol per unit of the underlying symbol, and volume is in
+    units of the underlying symbol. Bars are only made for intervals that have at least one trade.
+
+    Incremental Use
+    ---------------
+    Call self.update() with each new chunk of trades, in order. The last bar of the trades seen so far is kept
+    open (the next chunk may still add trades to it) and is merged with the next chunk's first bar if they share
+    an interval. Bars that can no longer change are closed, added to self.bars and returned. Call self.flush()
+    once no more trades are coming, to close the open bar.
+
+    Methods
+    -------
+    empty_bars
+    trade_prices
+    build
+    update
+    flush
+    save
+    load
+    '''
+
+    bar_columns = ['bar_start', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'vwap', 'trade_count']
+
+    def __init__(self, underlying_symbol: str, quote_symbol: str, interval: int, by: str = 'time'):
+        '''
+        Parameters
+        ----------
+        interval : int
+            Bar length, in seconds if by='time', or in blocks if by='block'.
+        by : str
+            Can be 'time', 'block'.
+        '''
+        if by not in ['time', 'block']:
+            raise Exception(f'The "by" argument must be given one of ["time", "block"]. Was given "{by}" instead. Type {type(by)}.')
+        self.underlying_symbol = underlying_symbol
+        self.quote_symbol = quote_symbol
+        self.interval = interval
+        self.by = by
+        self.key_column = 'timestamp' if by == 'time' else 'block_number'
+        self.bars = self.empty_bars()      # closed bars
+        self.open_bar = self.empty_bars()  # zero or one bar
+
+
+    @classmethod
+    def empty_bars(cls) -> dict:
+        bars = {column: np.array([], dtype=np.float64) for column in cls.bar_columns}
+        bars['bar_start'] = np.array([], dtype=np.int64)
+        bars['trade_count'] = np.array([], dtype=np.int64)
+        return bars
+
+
+    def trade_prices(self, columns: dict):
+        '''
+        Returns (keys, prices, volumes, quote_volumes) for the trades in `columns` that are between the underlying and quote symbols.
+        '''
+        buys_underlying = columns['buy_symbol'] == self.underlying_symbol
+        sells_underlying = columns['sell_symbol'] == self.underlying_symbol
+        is_pair_trade = (buys_underlying & (columns['sell_symbol'] == self.quote_symbol)) | (sells_underlying & (columns['buy_symbol'] == self.quote_symbol))
+        buys_underlying = buys_underlying[is_pair_trade]
+        volumes = np.where(buys_underlying, columns['buy_amount'][is_pair_trade], columns['sell_amount'][is_pair_trade])
+        quote_volumes = np.where(buys_underlying, columns['sell_amount'][is_pair_trade], columns['buy_amount'][is_pair_trade])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prices = quote_volumes / volumes
+        is_priced = np.isfinite(prices)
+        return columns[self.key_column][is_pair_trade][is_priced], prices[is_priced], volumes[is_priced], quote_volumes[is_priced]
+
+
+    def build(self, columns: dict) -> dict:
+        ''' Builds bars from trades sorted by (block_number, txn_index), without changing self.bars or self.open_bar. '''
+        keys, prices, volumes, quote_volumes = self.trade_prices(columns)
+        if len(keys) == 0:
+            return self.empty_bars()
+        bar_keys = (keys // self.interval) * self.interval
+        bar_starts, starts = np.unique(bar_keys, return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        volume = np.add.reduceat(volumes, starts)
+        quote_volume = np.add.reduceat(quote_volumes, starts)
+        return {
+            'bar_start': bar_starts.astype(np.int64),
+            'open': prices[starts],
+            'high': np.maximum.reduceat(prices, starts),
+            'low': np.minimum.reduceat(prices, starts),
+            'close': prices[ends - 1],
+            'volume': volume,
+            'quote_volume': quote_volume,
+            'vwap': quote_volume / volume,
+            'trade_count': (ends - starts).astype(np.int64),
+        }
+
+
+    @staticmethod
+    def _merge_bars(earlier: dict, later: dict) -> dict:
+        ''' Merges two single-bar dicts for the same interval. '''
+        volume = earlier['volume'] + later['volume']
+        quote_volume = earlier['quote_volume'] + later['quote_volume']
+        return {
+            'bar_start': earlier['bar_start'],
+            'open': earlier['open'],
+            'high': np.maximum(earlier['high'], later['high']),
+            'low': np.minimum(earlier['low'], later['low']),
+            'close': later['close'],
+            'volume': volume,
+            'quote_volume': quote_volume,
+            'vwap': quote_volume / volume,
+            'trade_count': earlier['trade_count'] + later['trade_count'],
+        }
+
+
+    def update(self, columns: dict, up_to: Union[int, None] = None) -> dict:
+        '''
+        Rolls the bars forward with a new chunk of trades, which must all come after the trades already seen.
+
+        Parameters
+        ----------
+        up_to : int
+            The last timestamp (by='time') or block (by='block') the chunk covers, even if it had no trades there.
+            If given, the open bar is also closed when its interval ends at or before `up_to`.
+
+        Returns the newly closed bars.
+        '''
+        new_bars = self.build(columns)
+        if len(new_bars['bar_start']) == 0:
+            new_bars = self.open_bar
+        elif len(self.open_bar['bar_start']) != 0:
+            if self.open_bar['bar_start'][0] == new_bars['bar_start'][0]:
+                first_bar = self._merge_bars(self.open_bar, {column: array[:1] for column, array in new_bars.items()})
+                new_bars = {column: np.concatenate([first_bar[column], new_bars[column][1:]]) for column in self.bar_columns}
+            else:
+                new_bars = {column: np.concatenate([self.open_bar[column], new_bars[column]]) for column in self.bar_columns}
+        ## Keep the Last Bar Open unless the Chunk covers its whole Interval
+        if len(new_bars['bar_start']) == 0:
+            return self.empty_bars()
+        keep_open = (up_to is None) or (new_bars['bar_start'][-1] + self.interval > up_to + 1)
+        n_closed = len(new_bars['bar_start']) - (1 if keep_open else 0)
+        closed_bars = {column: array[:n_closed] for column, array in new_bars.items()}
+        self.open_bar = {column: array[n_closed:] for column, array in new_bars.items()}
+        self.bars = {column: np.concatenate([self.bars[column], closed_bars[column]]) for column in self.bar_columns}
+        return closed_bars
+
+
+    def flush(self) -> dict:
+        ''' Closes the open bar. Returns it. '''
+        closed_bars = self.open_bar
+        self.bars = {column: np.concatenate([self.bars[column], closed_bars[column]]) for column in self.bar_columns}
+        self.open_bar = self.empty_bars()
+        return closed_bars
+
+
+    @classmethod
+    def save(cls, file_loc: str, bars: dict):
+        with open(file_loc, 'wb') as f:
+            np.savez_compressed(f, **{column: bars[column] for column in cls.bar_columns})
+
+
+    @classmethod
+    def load(cls, file_loc: str) -> dict:
+        with np.load(file_loc) as npz_file:
+            return {column: npz_file[column] for column in cls.bar_columns}
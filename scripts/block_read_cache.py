@@ -0,0 +1,99 @@
+## External Libraries
+import threading
+import time
+
+
+class BlockReadCache():
+    '''
+    Memoizes on-chain reads for the latest block, for as long as that block is the latest.
+
+    Entries are keyed by (call, args, block number), and the whole cache is dropped as soon as a new block is seen,
+    so repeated reads within a block are free.
+        - reads that use the cache must be made at self.get_block_number() (not 'latest'), so every entry holds
+          exactly the data of the block it is keyed by, whichever block the node is at.
+        - new blocks are told by the NewBlockSubscriber. If it has told nothing for `max_age_seconds` (e.g. it is
+          slow or has died), self.get_block_number() asks the node for the block number itself, so the cache is
+          never more than max_age_seconds behind the chain.
+
+    Methods
+    -------
+    get_block_number
+    get
+    set
+    clear
+
+    Attributes
+    ----------
+    self.block_number  (the block that every entry was read at)
+    self.hits / self.misses
+    '''
+
+    missing = object()  # returned by self.get() on a miss, as None can be a cached value
+
+    def __init__(self, NewBlockSubscriber, max_age_seconds: float = 3):
+        '''
+        Parameters
+        ----------
+        max_age_seconds : float
+            About one block time. The longest the cache trusts its block number without hearing of a new block.
+        '''
+        self.NewBlockSubscriber = NewBlockSubscriber
+        self.max_age_seconds = max_age_seconds
+        self.lock = threading.Lock()
+        self.block_number = None
+        self.block_checked = 0  # time.time() when self.block_number was last known to be the latest block
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+        NewBlockSubscriber.subscribe(self.clear)
+
+
+    def clear(self, block_number: int):
+        ''' Called by the NewBlockSubscriber with each new block number. '''
+        with self.lock:
+            if (self.block_number is None) or (block_number > self.block_number):
+                self.values = {}
+                self.block_number = block_number
+            if block_number >= self.block_number:
+                self.block_checked = time.time()
+
+
+    def get_block_number(self) -> int:
+        '''
+        The block that reads using the cache should be made at, and stored with.
+        Starts the NewBlockSubscriber if needed, and asks the node directly if it hasn't told of a block in max_age_seconds.
+        '''
+        if self.block_number is None:
+            self.clear(self.NewBlockSubscriber.start().latest_block_number)
+        elif (time.time() - self.block_checked) > self.max_age_seconds:
+            self.clear(self.NewBlockSubscriber.w3.eth.block_number)
+        return self.block_number
+
+
+    def get(self, key):
+        '''
+        Parameters
+        ----------
+        key
+            Hashable, and identifying the call and its args. E.g. (contract address, calldata)
+        '''
+        with self.lock:
+            value = self.values.get((key, self.block_number), self.missing)
+        if value is self.missing:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+    def set(self, key, value, block_number: int):
+        '''
+        Parameters
+        ----------
+        block_number : int
+            The block the value was read at, i.e. self.get_block_number() from before the read.
+            Not stored if a newer block has been seen since.
+        '''
+        with self.lock:
+            if block_number == self.block_number:
+                self.values[(key, block_number)] = value
@@ -0,0 +1,107 @@
+## External Libraries
+from typing import Union
+import bisect
+import struct
+import os
+
+
+class BlockTimestampIndex():
+    '''
+    An on-disk, append-only index of block number -> block timestamp, so that neither direction
+    of lookup needs to query a node or a block explorer.
+
+    File Format
+    -----------
+    Consecutive 16 byte records of (block_number, timestamp) as little-endian unsigned 64 bit integers.
+        - Records are only ever appended, so many processes can share the same file.
+        - Records do not have to be in block order; duplicates are ignored on load.
+
+    Methods
+    -------
+    refresh
+    add
+    missing
+    get_bracket
+    '''
+
+    record = struct.Struct('<QQ')
+
+    def __init__(self, fileloc: str):
+        self.fileloc = fileloc
+        self.timestamp_by_block = {}
+        self.block_numbers = []  # sorted
+        self.timestamps = []     # sorted, and index-aligned with self.block_numbers
+        self.file_position = 0   # bytes of the file already loaded
+        self.refresh()
+
+
+    def _insert(self, block_number: int, timestamp: int):
+        if block_number in self.timestamp_by_block:
+            return
+        self.timestamp_by_block[block_number] = timestamp
+        if (not self.block_numbers) or (block_number > self.block_numbers[-1]):  # usual case: blocks are added in order
+            self.block_numbers.append(block_number)
+            self.timestamps.append(timestamp)
+        else:
+            i = bisect.bisect_left(self.block_numbers, block_number)
+            self.block_numbers.insert(i, block_number)
+            self.timestamps.insert(i, timestamp)
+
+
+    def refresh(self):
+        ''' Loads any records appended to the file (by this or another process) since the last load. '''
+        if not os.path.exists(self.fileloc):
+            return self
+        with open(self.fileloc, 'rb') as f:
+            f.seek(self.file_position)
+            data = f.read()
+        n_bytes = len(data) - (len(data) % self.record.size)  # ignore a record that is still being written
+        for block_number, timestamp in self.record.iter_unpack(data[:n_bytes]):
+            self._insert(block_number, timestamp)
+        self.file_position += n_bytes
+        return self
+
+
+    def add(self, block_timestamps: dict):
+        '''
+        Parameters
+        ----------
+        block_timestamps : dict
+            {block_number: timestamp}, where timestamp is in unix seconds.
+        '''
+        new_records = {int(b): int(t) for b, t in block_timestamps.items() if b not in self.timestamp_by_block}
+        if not new_records:
+            return self
+        os.makedirs(os.path.dirname(self.fileloc), exist_ok=True)
+        with open(self.fileloc, 'ab') as f:
+            f.write(b''.join(self.record.pack(b, t) for b, t in sorted(new_records.items())))  # one write, so appends from other processes do not interleave
+        for block_number, timestamp in sorted(new_records.items()):
+            self._insert(block_number, timestamp)
+        return self
+
+
+    def missing(self, block_numbers: list) -> list:
+        ''' Returns the block numbers that do not have an exact timestamp in the index. '''
+        return sorted({b for b in block_numbers if b not in self.timestamp_by_block})
+
+
+    def get_bracket(self, timestamp: float, closest: str = 'before') -> Union[tuple, None]:
+        '''
+        The two known blocks either side of the block closest to the timestamp, so that the exact answer
+        is one of the blocks from the first to the second, inclusive:
+            - 'before': (last known block at or before the timestamp, first known block after it)
+            - 'after':  (last known block before the timestamp, first known block at or after it)
+        Either side is None if there is no known block on that side. Returns None if the index is empty.
+
+        Parameters
+        ----------
+        closest : str
+            Can be 'before', 'after'. Aka the last block at or before the timestamp, or the first block at or after the timestamp.
+        '''
+        if not self.block_numbers:
+            return None
+        i = bisect.bisect_right(self.timestamps, timestamp) if closest == 'before' else bisect.bisect_left(self.timestamps, timestamp)
+        return (
+            self.block_numbers[i-1] if i > 0 else None,
+            self.block_numbers[i] if i < len(self.block_numbers) else None,
+        )
@@ -1,13 +1,27 @@
 ## Internal Modules
 from scripts.utils import DataLoc, MyLogger, StoredAddressInfo
 from scripts.comms_blockchain_data_providers import CommsBlockchainDataProviders
+from scripts.block_timestamp_index import BlockTimestampIndex
+from scripts.log_scanner import LogScanner
+from scripts.node_pool import NodePool, NodePoolProvider
+from scripts.new_block_subscriber import NewBlockSubscriber
+from scripts.multicall import Multicall
+from scripts.contract_registry import ContractRegistry
+from scripts.event_decoder import EventDecoder
+from scripts.abi_store import AbiStore
+from scripts.nonce_manager import NonceManager
+from scripts.gas_oracle import GasOracle
+from scripts.block_read_cache import BlockReadCache
 
 ## External Libraries
 from typing import Union
 import json
+import os
 from datetime import datetime
 from web3 import Web3, middleware
 from web3.middleware import geth_poa_middleware
+from web3.datastructures import AttributeDict
+from web3._utils.method_formatters import block_formatter, receipt_formatter, transaction_result_formatter
 from web3.gas_strategies.time_based import fast_gas_price_strategy, medium_gas_price_strategy
 
 
@@ -21,8 +35,17 @@ class CommsBlockchainBSC():
     from_dex_number
     get_nonce
     set_gas_price_strategy
+    get_gas_price
+    get_chain_id
     get_latest_block_number
+    get_block_number_by_datetime
     get_block_by_datetime
+    get_block_timestamps
+    fill_block_timestamps
+    batch_request
+    get_transaction_receipts
+    get_transactions
+    get_blocks
     get_token_address
     swap_wbnb
     _parse_log_attribute_dict
@@ -32,16 +55,30 @@ class CommsBlockchainBSC():
     ----------
     self.DataLoc
     self.CommsBlockchainDataProviders
+    self.BlockTimestampIndex
+    self.NodePool
+    self.LogScanner
+    self.NewBlockSubscriber
+    self.Multicall
+    self.EventDecoder
+    self.AbiStore
+    self.NonceManager
+    self.GasOracle
+    self.BlockReadCache
     self.logger
     self.blockchain_name
     self.blockchain_net
     self.average_block_seconds
     self.nodes
+    self.node  (the best node when self.w3 connected; requests are routed by self.NodePool)
+    self.rpc_batch_size
     self.address_wallet
     self.private_key (lol)
     self.w3  (the object to communicate with the blockchain)
     self.address_wbnb
     self.contract_wbnb
+    self.address_multicall
+    self.contract_multicall
 
     Blockchain Docs
     ---------------
@@ -66,12 +103,20 @@ class CommsBlockchainBSC():
             raise Exception(error)
         self.blockchain_name = 'binance_smart_chain'
         self.blockchain_net = blockchain_net  # mainnet or testnet
+        self.chain_id = None  # see self.get_chain_id()
 
         ## Open and Apply Config Data
         with open(self.DataLoc.File.CONFIG.value) as json_file:
             config = json.load(json_file)['CommsBlockchainBSC']
             self.average_block_seconds = config['average_block_seconds']
             self.nodes = config['nodes'][self.blockchain_net]
+            self.rpc_batch_size = config['rpc_batch_size']
+            self.multicall_max_calls = config['multicall_max_calls']
+            log_scanner_config = config['log_scanner']
+            node_pool_config = config['node_pool']
+            new_blocks_config = config['new_blocks']
+            abi_store_config = config['abi_store']
+            gas_oracle_config = config['gas_oracle']
         with open(self.DataLoc.File.TOKEN_ADDRESS.value) as json_file:
             self.token_addresses = json.load(json_file)[self.blockchain_name][self.blockchain_net]
         ## FIXME: This needs to be way safer...
@@ -82,35 +127,67 @@ class CommsBlockchainBSC():
 
         ## Comms Objects
         self.CommsBlockchainDataProviders = CommsBlockchainDataProviders(blockchain_net=blockchain_net)
+        self.BlockTimestampIndex = BlockTimestampIndex(
+            fileloc=os.path.join(self.DataLoc.Folder.DATA_CHAIN_INDEX.value, f'block_timestamps_{self.blockchain_name}_{self.blockchain_net}.bin')
+        )
+        self.NodePool = NodePool(nodes=self.nodes, logger=self.logger, **node_pool_config)
+        self.AbiStore = AbiStore(
+            folder=self.DataLoc.Folder.DATA_ABIS.value, blockchain_name=self.blockchain_name, blockchain_net=self.blockchain_net,
+            BscScan=self.CommsBlockchainDataProviders.BscScan, logger=self.logger, **abi_store_config
+        )
+        self.LogScanner = LogScanner(nodes=self.nodes, logger=self.logger, node_pool=self.NodePool, **log_scanner_config)
 
         ## Connect to Blockchain
         self.w3 = self.connect()
+        self.NewBlockSubscriber = NewBlockSubscriber(
+            w3=self.w3, logger=self.logger,
+            ws_nodes=new_blocks_config['ws_nodes'][self.blockchain_net],
+            poll_interval_seconds=new_blocks_config['poll_interval_seconds'],
+            reconnect_seconds=new_blocks_config['reconnect_seconds'],
+            ws_timeout_seconds=new_blocks_config['ws_timeout_seconds'],
+        )  # only started when something waits on new blocks
+        self.BlockReadCache = BlockReadCache(NewBlockSubscriber=self.NewBlockSubscriber, max_age_seconds=self.average_block_seconds)
+        self.GasOracle = GasOracle(w3=self.w3, logger=self.logger, NewBlockSubscriber=self.NewBlockSubscriber, **gas_oracle_config)  # only started when a gas price is first needed
+        self.EventDecoder = EventDecoder(codec=self.w3.codec, logger=self.logger)
+        self.NonceManager = NonceManager.get_manager(
+            w3=self.w3, address=self.address_wallet, logger=self.logger,
+            blockchain_name=self.blockchain_name, blockchain_net=self.blockchain_net
+        )
         self.set_contract_objects()
         ''' Sets the following instance attributes:
             self.address_wbnb
             self.contract_wbnb
+            self.address_multicall
+            self.contract_multicall
+            self.Multicall
         '''
-        self.loaded_abis = {}
         return
 
 
     def connect(self):
-        ## Connect to Blockchain
+        '''
+        Probes every node in self.nodes, and returns a w3 object whose requests are routed by self.NodePool
+        to the best healthy node (and failed over to the others), instead of being pinned to one node.
+        '''
+        ## Find Healthy Nodes
+        healthy_nodes = self.NodePool.probe_all()
         for node in self.nodes:
-            w3 = Web3(Web3.HTTPProvider(node))
-            is_connected = w3.isConnected()
-            if is_connected is True:
-                self.logger.debug(f'Connected to {self.blockchain_name} - {self.blockchain_net}. Node: {node}.')
-                ## Inject-geth is needed for middleware onion shit to work on POA blockchains like Binance Smart Chain
-                w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-                break
+            stats = self.NodePool.stats[node]
+            if stats['ejected']:
+                self.logger.debug(f'Could not connect to {self.blockchain_name} - {self.blockchain_net}. Node: {node}.')
             else:
-                error = f'Could not connect to {self.blockchain_name} - {self.blockchain_net}. Node: {node}. Status: {is_connected}. Type: {type(is_connected)}.'
-                self.logger.debug(error)
-        if not is_connected:
+                self.logger.debug(f'Connected to {self.blockchain_name} - {self.blockchain_net}. Node: {node}. Latency: {stats["latency"]:.3f}s.')
+        if not healthy_nodes:
             error = f'Binance nodes exhausted. Unable to connect to all nodes... fuck. {self.blockchain_name} - {self.blockchain_net}.'
             self.logger.debug(error)
             raise Exception(error)  # sys.exit()
+        self.node = healthy_nodes[0]
+        self.NodePool.start()
+
+        ## Connect to Blockchain
+        w3 = Web3(NodePoolProvider(self.NodePool))
+        ## Inject-geth is needed for middleware onion shit to work on POA blockchains like Binance Smart Chain
+        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         return w3
 
 
@@ -120,15 +197,19 @@ class CommsBlockchainBSC():
         '''
         with open(self.DataLoc.File.CONTRACT_ADDRESS.value) as json_file:
             addresses = json.load(json_file)[self.blockchain_name][self.blockchain_net]
-        with open(self.DataLoc.File.ABI.value) as json_file:
-            abis = json.load(json_file)[self.blockchain_name]['mainnet']  # testnet abi's are hopefully the same
+        abi_path = (self.blockchain_name, 'mainnet')  # testnet abi's are hopefully the same
         ## Create WBNB Contract Object
         address_wbnb = Web3.toChecksumAddress(addresses['wbnb'])
-        abi_wbnb = abis[address_wbnb]
-        contract_wbnb = self.w3.eth.contract(address=address_wbnb, abi=abi_wbnb)
+        contract_wbnb = ContractRegistry.get_contract(self.w3, address=address_wbnb, abi_path=abi_path + (address_wbnb,))
+        ## Create Multicall3 Contract Object
+        address_multicall = Web3.toChecksumAddress(addresses['multicall3'])
+        contract_multicall = ContractRegistry.get_contract(self.w3, address=address_multicall, abi_path=abi_path + (address_multicall,))
         ## Set Instance Attributes
         self.address_wbnb = address_wbnb
         self.contract_wbnb = contract_wbnb
+        self.address_multicall = address_multicall
+        self.contract_multicall = contract_multicall
+        self.Multicall = Multicall(w3=self.w3, contract_multicall=contract_multicall, logger=self.logger, max_calls=self.multicall_max_calls, BlockReadCache=self.BlockReadCache)
         return
 
 
@@ -143,7 +224,8 @@ class CommsBlockchainBSC():
 
 
     def get_nonce(self):
-        return self.w3.eth.get_transaction_count(self.address_wallet)
+        ''' Handed out locally by self.NonceManager; only the first call (and the first after a failed send) makes an RPC call. '''
+        return self.NonceManager.get_nonce()
 
 
     def set_gas_price_strategy(self, strategy_name: str):
@@ -166,11 +248,17 @@ class CommsBlockchainBSC():
         '''
         Attributes
         ----------
+        strategy_name : str
+            'simple': the node's gas price (as of self.GasOracle's last quote) plus `multiplier`.
+            'oracle': self.GasOracle's default percentile of recent blocks' gas prices, plus `multiplier`.
+            'premade_fast': web3's time based strategy, which samples recent blocks on every call.
         multiplier : str
             As a percentage. E.g. 0.1 means a 10% increase on the current gas price.
         '''
         if strategy_name == 'simple':
-            gas_price = int(self.w3.eth.gasPrice * (1 + multiplier))
+            gas_price = int(self.GasOracle.get_node_gas_price() * (1 + multiplier))
+        elif strategy_name == 'oracle':
+            gas_price = int(self.GasOracle.get_gas_price() * (1 + (multiplier or 0)))
         elif strategy_name == 'premade_fast':
             gas_price = self.w3.eth.generate_gas_price()
             if gas_price is None:
@@ -178,10 +266,65 @@ class CommsBlockchainBSC():
         return gas_price
 
 
+    def get_chain_id(self) -> int:
+        ''' Cached, so that building a transaction with it doesn't cost an eth_chainId call each time. '''
+        if self.chain_id is None:
+            self.chain_id = self.w3.eth.chain_id
+        return self.chain_id
+
+
     def get_latest_block_number(self):
         return self.w3.eth.block_number
 
 
+    def get_block_number_by_datetime(self, dt: datetime, closest: str):
+        '''
+        Looks up the block number from the known blocks in self.BlockTimestampIndex.
+        Only if the datetime is outside the range of known blocks is BscScan queried, and the block
+        it returns is added to the index so that nearby lookups are local from then on.
+
+        The answer is exact: while the closest known blocks either side are not adjacent, the block interpolated
+        between them is downloaded (and added to the index) to narrow them, alternating with the midpoint so a
+        gap of n blocks takes at most about 2*log2(n) downloads. On BSC's steady block times, it's usually one or two.
+
+        Parameters
+        ----------
+        closest : str
+            Can be 'before', 'after'. Aka the last block at or before the datetime, or the first block at or after it.
+        '''
+        if closest not in ['before', 'after']:
+            raise Exception(f'The "closest" argument must be given one of ["before", "after"]. Was given "{closest}" instead. Type {type(closest)}.')
+        timestamp = dt.timestamp()
+        index = self.BlockTimestampIndex.refresh()
+        if not (index.timestamps and (index.timestamps[0] <= timestamp <= index.timestamps[-1])):
+            block_id = self.CommsBlockchainDataProviders.BscScan.get_block_id_by_datetime(dt=dt, closest=closest)
+            self.get_block_timestamps([block_id])
+            return block_id
+
+        ## Narrow the Known Blocks either side until they are Adjacent
+        lo, hi = index.get_bracket(timestamp=timestamp, closest=closest)
+        is_lo_side = (lambda t: t <= timestamp) if closest == 'before' else (lambda t: t < timestamp)
+        use_midpoint = False
+        while (lo is not None) and (hi is not None) and (hi - lo > 1):
+            if use_midpoint:
+                guess = (lo + hi) // 2
+            else:
+                t_lo, t_hi = index.timestamp_by_block[lo], index.timestamp_by_block[hi]
+                guess = lo + int((hi - lo) * (timestamp - t_lo) / (t_hi - t_lo)) if t_hi > t_lo else (lo + hi) // 2
+            guess = min(max(guess, lo + 1), hi - 1)
+            use_midpoint = not use_midpoint
+            if is_lo_side(self.get_block_timestamps([guess])[guess]):
+                lo = guess
+            else:
+                hi = guess
+        ## The Timestamp is on the Edge of the Known Range
+        if hi is None:
+            return lo
+        if lo is None:
+            return hi
+        return lo if closest == 'before' else hi
+
+
     def get_block_by_datetime(self, dt: datetime, closest: str):
         '''
         Parameters
@@ -189,10 +332,132 @@ class CommsBlockchainBSC():
         closest : str
             Can be 'before', 'after'
         '''
-        block_id = self.CommsBlockchainDataProviders.BscScan.get_block_id_by_datetime(dt=dt, closest=closest)
+        block_id = self.get_block_number_by_datetime(dt=dt, closest=closest)
         return self.w3.eth.get_block(block_id, full_transactions=False)
 
 
+    def get_block_timestamps(self, block_numbers: list, batch_size: Union[int, None] = None) -> dict:
+        '''
+        Returns {block_number: timestamp} for every block number given.
+        Timestamps come from self.BlockTimestampIndex; block headers are only downloaded (in batches) for blocks not yet in the index.
+        '''
+        index = self.BlockTimestampIndex.refresh()
+        missing_block_numbers = index.missing(block_numbers)
+        if missing_block_numbers:
+            blocks = self.get_blocks(missing_block_numbers, batch_size=batch_size)
+            index.add({block_number: block['timestamp'] for block_number, block in blocks.items()})
+        return {block_number: index.timestamp_by_block[block_number] for block_number in block_numbers}
+
+
+    def fill_block_timestamps(self, start_block: int, end_block: int, step: int = 1, batch_size: Union[int, None] = None):
+        '''
+        Bulk downloads block headers between start_block and end_block (inclusive) into self.BlockTimestampIndex.
+
+        Parameters
+        ----------
+        step : int
+            Only every `step` blocks are downloaded. Blocks in between are not in the index, but a sparse fill still bounds
+            how far get_block_number_by_datetime() has to search, as it only narrows between known blocks.
+        '''
+        block_numbers = list(range(start_block, end_block + 1, step))
+        if block_numbers[-1] != end_block:
+            block_numbers.append(end_block)
+        self.get_block_timestamps(block_numbers, batch_size=batch_size)
+        return self
+
+
+    def batch_request(self, method: str, params_list: list, batch_size: Union[int, None] = None) -> list:
+        '''
+        Makes one JSON-RPC call per item in `params_list`, sending the calls to the node in
+        JSON-RPC batch requests of `batch_size` calls each, instead of one HTTP round-trip per call.
+
+        Parameters
+        ----------
+        method : str
+            The JSON-RPC method name. E.g. 'eth_getTransactionReceipt'
+        params_list : list
+            A list of the "params" list for each call.
+        batch_size : int
+            Max number of calls per HTTP request. Defaults to the "rpc_batch_size" config value.
+
+        Returns the unformatted "result" of each call, in the same order as `params_list`.
+        Calls a node answers without a result (e.g. a lagging node that doesn't have the block yet) are retried,
+        on their own, on each of the other nodes in self.NodePool before giving up.
+        '''
+        if batch_size is None:
+            batch_size = self.rpc_batch_size
+        results = []
+        for batch_start in range(0, len(params_list), batch_size):
+            batch_params = params_list[batch_start: batch_start + batch_size]
+            batch_results = {}  # {request_id: result}
+            pending_ids = list(range(len(batch_params)))
+            failed_nodes = []  # nodes that answered some of the pending calls without a result
+            while pending_ids:
+                payload = [
+                    {'jsonrpc': '2.0', 'method': method, 'params': batch_params[request_id], 'id': request_id}
+                    for request_id in pending_ids
+                ]
+                node, response = self.NodePool.post(json.dumps(payload), exclude_nodes=failed_nodes)
+                response = response.json()
+                ## Node rejected the whole batch (e.g. batch too large)
+                if not isinstance(response, list):
+                    error = f'Node rejected JSON-RPC batch request. Node: {node}. Method: {method}. Batch size: {len(payload)}. Response: {response}.'
+                    self.logger.critical(error)
+                    raise Exception(error)
+                ## Responses in a batch can be returned in any order
+                response_by_id = {d.get('id'): d for d in response}
+                for request_id in pending_ids:
+                    result = response_by_id.get(request_id, {}).get('result', None)
+                    if result is not None:
+                        batch_results[request_id] = result
+                failed_ids = [request_id for request_id in pending_ids if request_id not in batch_results]
+                if not failed_ids:
+                    break
+                failed_nodes.append(node)
+                if len(failed_nodes) >= len(self.NodePool.nodes):
+                    error = f'JSON-RPC batch call failed on every node. Nodes: {failed_nodes}. Method: {method}. Params: {batch_params[failed_ids[0]]}. Response: {response_by_id.get(failed_ids[0], {})}. Failed calls: {len(failed_ids)}.'
+                    self.logger.critical(error)
+                    raise Exception(error)
+                self.logger.debug(f'Retrying {len(failed_ids)} JSON-RPC batch calls that had no result on another node. Node: {node}. Method: {method}.')
+                pending_ids = failed_ids
+            results.extend(batch_results[request_id] for request_id in range(len(batch_params)))
+        return results
+
+
+    def get_transaction_receipts(self, txn_hashes: list, batch_size: Union[int, None] = None) -> list:
+        ''' Batched version of self.w3.eth.get_transaction_receipt(). Returns receipts in the same order as `txn_hashes`. '''
+        raw_receipts = self.batch_request(
+            method='eth_getTransactionReceipt',
+            params_list=[[Web3.toHex(txn_hash)] for txn_hash in txn_hashes],
+            batch_size=batch_size
+        )
+        return [AttributeDict.recursive(receipt_formatter(d)) for d in raw_receipts]
+
+
+    def get_transactions(self, txn_hashes: list, batch_size: Union[int, None] = None) -> list:
+        ''' Batched version of self.w3.eth.get_transaction(). Returns transactions in the same order as `txn_hashes`. '''
+        raw_txns = self.batch_request(
+            method='eth_getTransactionByHash',
+            params_list=[[Web3.toHex(txn_hash)] for txn_hash in txn_hashes],
+            batch_size=batch_size
+        )
+        return [AttributeDict.recursive(transaction_result_formatter(d)) for d in raw_txns]
+
+
+    def get_blocks(self, block_numbers: list, batch_size: Union[int, None] = None) -> dict:
+        ''' Batched version of self.w3.eth.get_block(full_transactions=False). Returns {block_number: block}. '''
+        block_numbers = sorted(set(block_numbers))
+        raw_blocks = self.batch_request(
+            method='eth_getBlockByNumber',
+            params_list=[[hex(block_number), False] for block_number in block_numbers],
+            batch_size=batch_size
+        )
+        return {
+            block_number: AttributeDict.recursive(block_formatter(d))
+            for block_number, d in zip(block_numbers, raw_blocks)
+        }
+
+
     def get_token_address(self, symbol:str, token_name: Union[str, None] = None):
         '''
         Parameters
@@ -222,35 +487,42 @@ class CommsBlockchainBSC():
             - if to_wbnb is True: lock BNB and mint BEP-20 conforming WBNB
             - if to_wbnb is False: burn WBNB and unlock BNB
         '''
-        ## Get Data
-        decimals = 18  # Binance Smart Chain layer 1 uses 18 decimals for BNB amounts
-        decimal_quantity = self.to_dex_number(number=quantity, decimals=decimals)
-        nonce = self.w3.eth.get_transaction_count(self.address_wallet)
-
-        ## Make Transaction
-        if to_wbnb is True:
-            txn_inputs = {
-                'value': decimal_quantity,
-                'gas': 300000,  # usually between 25,000 to 50,000
-                'gasPrice': self.get_gas_price(strategy_name='simple', multiplier=0.2),
-                'nonce': nonce,
-            }
-            txn = self.contract_wbnb.functions.deposit().buildTransaction(txn_inputs)
-        elif to_wbnb is False:
-            txn_inputs = {
-                'gas': 300000,  # usually between 25,000 to 50,000
-                'gasPrice': self.get_gas_price(strategy_name='simple', multiplier=0.2),
-                'nonce': nonce,
-            }
-            txn = self.contract_wbnb.functions.withdraw(decimal_quantity).buildTransaction(txn_inputs)
-        else:
+        ## Check Input
+        if not isinstance(to_wbnb, bool):
             error = f'Parameter "to_wbnb" must be of type bool. Argument given: {to_wbnb}. Type: {type(to_wbnb)}.'
             self.logger.critical(error)  # critical because this means my code is ass
             raise Exception(error)
 
-        ## Sign and Send Transaction
-        signed_txn = self.w3.eth.account.sign_transaction(txn, self.private_key)
-        txn_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        ## Get Data
+        decimals = 18  # Binance Smart Chain layer 1 uses 18 decimals for BNB amounts
+        decimal_quantity = self.to_dex_number(number=quantity, decimals=decimals)
+        gas_price = self.get_gas_price(strategy_name='simple', multiplier=0.2)
+        nonce = self.get_nonce()  # reserved last, and given back if anything from here to the send fails
+
+        try:
+            ## Make Transaction
+            if to_wbnb is True:
+                txn_inputs = {
+                    'value': decimal_quantity,
+                    'gas': 300000,  # usually between 25,000 to 50,000
+                    'gasPrice': gas_price,
+                    'nonce': nonce,
+                }
+                txn = self.contract_wbnb.functions.deposit().buildTransaction(txn_inputs)
+            else:
+                txn_inputs = {
+                    'gas': 300000,  # usually between 25,000 to 50,000
+                    'gasPrice': gas_price,
+                    'nonce': nonce,
+                }
+                txn = self.contract_wbnb.functions.withdraw(decimal_quantity).buildTransaction(txn_inputs)
+
+            ## Sign and Send Transaction
+            signed_txn = self.w3.eth.account.sign_transaction(txn, self.private_key)
+            txn_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as e:
+            self.NonceManager.resync_after_error(e)
+            raise
 
         ## Return Transaction Info
         txn_info = txn_inputs
@@ -278,10 +550,12 @@ class CommsBlockchainBSC():
         https://ethereum.stackexchange.com/questions/94954/how-to-understand-uniswaps-events
         https://medium.com/coinmonks/unlocking-the-secrets-of-an-ethereum-transaction-3a33991f696c
         https://medium.com/linum-labs/everything-you-ever-wanted-to-know-about-events-and-logs-on-ethereum-fec84ea7d0a5
+
+        Each log is decoded once, by the event in its contract's abi whose signature matches the log's topic0 (see self.EventDecoder).
+        The abi of every contract in the receipt is fetched up front from self.AbiStore.
         '''
         output_dict = {}
-        loaded_abis = {}
-        get_event_signature = lambda event_abi: f"{event_abi['name']}({','.join([param['type'] for param in event_abi['inputs']])})"
+        abis = self.AbiStore.prefetch([log['address'] for log in txn_receipt.logs])
 
         # ## Decode Input Data
         # txn_data = self.w3.eth.get_transaction(txn_hash)
@@ -289,40 +563,18 @@ class CommsBlockchainBSC():
 
         # ## Decode Logs
         # txn_receipt = self.w3.eth.get_transaction_receipt(txn_hash)
-        txn_index = txn_receipt['transactionIndex']
         for log in txn_receipt.logs:
 
-            ## Get Contract Object
-            contract_address = log['address']
-            try:
-                abi = self.loaded_abis[contract_address]
-            except KeyError:
-                abi = CommsBlockchainDataProviders(blockchain_net='mainnet').BscScan.get_abi(contract_address=contract_address)
-                self.loaded_abis[contract_address] = abi
-            contract = self.w3.eth.contract(address=contract_address, abi=abi)
-
-            ## Get Contract Events
-            events = [abi for abi in contract.abi if abi['type'] == 'event']
-            event_sig_hexs = {
-                Web3.toHex(Web3.keccak(text=get_event_signature(event))): event
-                for event in events
-            }
-
-            ## Decode each Topic in Txn Logs
-            for topic in log['topics']:
-                topic_event_sig_hex = Web3.toHex(topic)
-                ## Find the Contract Event that can decode the Topic data
-                matching_event = event_sig_hexs.get(topic_event_sig_hex, None)
-                if matching_event is not None:
-                    ## Decode the Topic Data via "matching" Contract Event
-                    decoded_receipt_data = contract.events[matching_event['name']]().processReceipt(txn_receipt)
-                    if len(decoded_receipt_data) != 0:
-                        ## Extract the Relevant Info from each Parsed Topic and add to output_dict
-                        for parsed_event in decoded_receipt_data:  # should only be one, just in case
-                            output_dict.update(self._parse_log_attribute_dict(parsed_event))
-                    else:
-                        print('wtf!!!')
-                        self.logger.warning(f"'Weird finding: an event whose signature matched the og's topic, decoded the topic into an empty variable. Decoded topic: {decoded_receipt_data}. Type: {type(decoded_receipt_data)}.")
+            ## Get Contract ABI
+            contract_address = Web3.toChecksumAddress(log['address'])
+            abi = abis[contract_address]
+            if abi is None:  # contract not verified on BscScan
+                continue
+
+            ## Decode the Log via the Contract Event matching its topic0
+            parsed_event = self.EventDecoder.decode_log(log, abi_key=contract_address, abi=abi)
+            if parsed_event is not None:
+                output_dict.update(self._parse_log_attribute_dict(parsed_event))
         return output_dict
 
 
@@ -1,10 +1,10 @@
 ## Internal Modules
 from scripts.utils import DataLoc, MyLogger, StoredAddressInfo
+from scripts.http_sessions import get_session
 
 ## External Libraries
 from typing import Union, List
 import multiprocessing
-import requests
 import json
 import re
 from datetime import datetime
@@ -246,7 +246,7 @@ class CoinMarketCap():
         ## Get Symbol Data
         url = f'{self.url}/v1/cryptocurrency/map'
         payload = {'symbol': symbol, 'CMC_PRO_API_KEY':self.api_key}
-        response = requests.get(url, params=payload).json()
+        response = get_session().get(url, params=payload).json()
         self.logger.debug
         data = response['data']
 
@@ -292,7 +292,7 @@ class CoinGecko():
     # @try5times
     def get_id(self, symbol: str):
         url = f'{self.url}/coins/list'
-        response = requests.get(url).json()
+        response = get_session().get(url).json()
         for token_d in response:
             if token_d['symbol'] == symbol:
                 return token_d['id']
@@ -311,7 +311,7 @@ class CoinGecko():
             'developer_data': False,
             'sparkline': False
         }
-        response = requests.get(url, params=payload).json()
+        response = get_session().get(url, params=payload).json()
         ## Get Blockchain Name that CoinGecko Recognises
         convert = self.config['blockchain_name_conversion']['coingecko']
         try:
@@ -378,7 +378,7 @@ class CoinGecko():
             'developer_data': False,
             'sparkline': False
         }
-        response = requests.get(url, params=payload).json()
+        response = get_session().get(url, params=payload).json()
         exchanges_listing_coin = [self.func_parse_exchange_details(symbol=symbol, d=d) for d in response['tickers']]
         exchanges_listing_coin = [d for d in exchanges_listing_coin if d is not None]
         return {'data': exchanges_listing_coin, 'datetime': datetime.utcnow()}
@@ -399,7 +399,7 @@ class BscScan:
             'address': contract_address,
             'apikey': self.api_key,
         }
-        response = requests.get(self.url, params=payload).json()
+        response = get_session().get(self.url, params=payload).json()
         return response['result']
 
 
@@ -423,7 +423,7 @@ class BscScan:
             'closest': closest,
             'apikey': self.api_key,
         }
-        response = requests.get(self.url, params=payload).json()
+        response = get_session().get(self.url, params=payload).json()
         return int(response['result'])
 
 
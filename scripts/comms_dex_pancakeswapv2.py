@@ -3,14 +3,22 @@ from scripts.comms_blockchain_bsc import CommsBlockchainBSC
 from scripts.utils import MyLogger
 from scripts.order_class import OrderClass
 from scripts.comms_blockchain_data_providers import CommsBlockchainDataProviders
+from scripts.backfill_checkpoint import BackfillCheckpoint
+from scripts.trade_storage import TradeStorage
+from scripts.contract_registry import ContractRegistry
+from scripts.amm_math import ConstantProductAMM
+from scripts.pair_address import compute_pair_address
+from scripts.route_finder import RouteFinder
 
 ## External Libraries
-from typing import Union
+from typing import Union, List, Callable
 import json
 import math
 import pickle
+import numpy as np
 from datetime import datetime, timedelta, timezone
 from web3 import Web3
+from eth_utils import event_abi_to_log_topic
 from web3.exceptions import BadFunctionCallOutput, ContractLogicError
 
 
@@ -22,12 +30,28 @@ class CommsDEXPancakeSwapV2(CommsBlockchainBSC):
     get_pool_address
     get_pool_contract
     get_token_addresses_from_pool
+    get_token_decimals
+    decode_swap_direction
     get_reserves
+    get_reserves_many
+    get_raw_reserves_many
     get_current_price
+    get_route_pools
+    find_best_route
+    get_swap_events_many
+    get_historical_trades_many
     get_historical_trades
+    get_sync_events_many
+    get_reserve_history_many
+    get_reserve_history
+    backfill_historical_trades
     get_sell_amount
     get_buy_amount
+    get_path_buy_amount
     create_swap_txn
+    stage_order
+    fire_staged_order
+    cancel_staged_order
     place_order
 
 
@@ -71,66 +95,169 @@ class CommsDEXPancakeSwapV2(CommsBlockchainBSC):
             self.contract_factory
             self.address_router
             self.contract_router
+            self.init_code_hash
         '''
+        self.existing_pools = set()  # pool addresses confirmed to have been deployed
+        self.pool_tokens = {}  # {pool_address: (token0_address, token1_address)}; a pool's token ordering never changes
+        self.token_decimals = {}  # {token_address: decimals}
+        self.AMM = ConstantProductAMM(fee_numerator=9975, fee_denominator=10000)  # PancakeSwap V2 keeps a 0.25% swap fee
+        with open(self.DataLoc.File.CONFIG.value) as json_file:
+            config = json.load(json_file)['CommsDEXPancakeSwapV2']
+            self.staged_order_gas_price_multipliers = sorted(config['staged_order']['gas_price_multipliers'])
+            self.staged_order_deadline_minutes = config['staged_order']['deadline_minutes']
+            routing_config = config['routing']
+        with open(self.DataLoc.File.CONTRACT_ADDRESS.value) as json_file:
+            addresses = json.load(json_file)[self.blockchain_name][self.blockchain_net]
+            self.route_base_tokens = [Web3.toChecksumAddress(addresses[name]) for name in routing_config['base_tokens'] if name in addresses]  # not every base token is on testnet
+        self.RouteFinder = RouteFinder(AMM=self.AMM, max_hops=routing_config['max_hops'])
         return
 
 
     def set_contract_objects(self):
         '''
-        Sets address and contract instance attributes to communicate with the PancakeSwap V2 smart contract system.
+        Sets address and contract instance attributes to communicate with the PancakeSwap V2 smart contract system,
+        as well as the chain-wide ones set by CommsBlockchainBSC (WBNB, Multicall3).
         '''
+        super().set_contract_objects()
         with open(self.DataLoc.File.CONTRACT_ADDRESS.value) as json_file:
             addresses = json.load(json_file)[self.blockchain_name][self.blockchain_net]['pancakeswapv2']
-        with open(self.DataLoc.File.ABI.value) as json_file:
-            abis = json.load(json_file)[self.blockchain_name]['mainnet']['pancakeswapv2']  # testnet abi's are hopefully the same
+        abi_path = (self.blockchain_name, 'mainnet', 'pancakeswapv2')  # testnet abi's are hopefully the same
         ## Create Factory Contract Object
         address_factory = Web3.toChecksumAddress(addresses['factory'])
-        abi_factory = abis['factory']
-        contract_factory = self.w3.eth.contract(address=address_factory, abi=abi_factory)
+        contract_factory = ContractRegistry.get_contract(self.w3, address=address_factory, abi_path=abi_path + ('factory',))
         ## Create Router Contract Object
         address_router = Web3.toChecksumAddress(addresses['router'])
-        abi_router = abis['router']
-        contract_router = self.w3.eth.contract(address=address_router, abi=abi_router)
+        contract_router = ContractRegistry.get_contract(self.w3, address=address_router, abi_path=abi_path + ('router',))
         ## Set Instance Attributes
         self.address_factory = address_factory
         self.contract_factory = contract_factory
         self.address_router = address_router
         self.contract_router = contract_router
+        self.init_code_hash = addresses['init_code_hash']  # keccak256 of the pair creation code, used to compute pair addresses offline
         return
 
 
-    def get_pool_address(self, token_contract_address_a: str, token_contract_address_one: str):
-        ''' Doesn't matter which way you put the two addresses in, it'll return the same pool address '''
-        pool_address = self.contract_factory.functions.getPair(token_contract_address_a, token_contract_address_one).call()
-        if pool_address == '0x0000000000000000000000000000000000000000':
-            error = f'No PancakeSwapV2 pool exists for these addresses: [{token_contract_address_a}, {token_contract_address_one}].'
-            self.logger.info(error)
-            return None
-        else:
-            return pool_address
+    def get_pool_address(self, token_contract_address_a: str, token_contract_address_one: str, check_exists: bool = True):
+        '''
+        Doesn't matter which way you put the two addresses in, it'll return the same pool address.
+
+        The address is computed offline from the factory address, the two token addresses, and the init code hash
+        (see compute_pair_address), the same way the factory's CREATE2 deploys it, so no getPair call is needed.
+
+        Parameters
+        ----------
+        check_exists : bool
+            If True, checks once per pool that it has been deployed (one eth_getCode call), returning None if not.
+            If False, makes no network call, but the pool may not exist.
+        '''
+        pool_address = compute_pair_address(
+            self.address_factory,
+            Web3.toChecksumAddress(token_contract_address_a),
+            Web3.toChecksumAddress(token_contract_address_one),
+            self.init_code_hash
+        )
+        if check_exists and (pool_address not in self.existing_pools):
+            if len(self.w3.eth.get_code(pool_address)) == 0:
+                error = f'No PancakeSwapV2 pool exists for these addresses: [{token_contract_address_a}, {token_contract_address_one}].'
+                self.logger.info(error)
+                return None
+            self.existing_pools.add(pool_address)
+        return pool_address
 
 
     def get_pool_contract(self, pool_address: str):
-        with open(self.DataLoc.File.ABI.value) as json_file:
-            abis = json.load(json_file)[self.blockchain_name]['mainnet']['pancakeswapv2']
-        universal_pool_abi = abis['pair']
-        return self.w3.eth.contract(address=pool_address, abi=universal_pool_abi)
+        ''' Every pool shares the same universal pair abi, so contract objects come from the process-wide ContractRegistry. '''
+        return ContractRegistry.get_contract(self.w3, address=pool_address, abi_path=(self.blockchain_name, 'mainnet', 'pancakeswapv2', 'pair'))
 
 
     def get_token_addresses_from_pool(self, pool_contract: str):
-        return (pool_contract.functions.token0().call(), pool_contract.functions.token1().call())
+        ''' Returns (token0_address, token1_address). Cached per pool, as a pool's token ordering is fixed at creation. '''
+        try:
+            return self.pool_tokens[pool_contract.address]
+        except KeyError:
+            pool_tokens = (pool_contract.functions.token0().call(), pool_contract.functions.token1().call())
+            self.pool_tokens[pool_contract.address] = pool_tokens
+            return pool_tokens
+
+
+    def get_token_decimals(self, token_address: str) -> int:
+        ''' Cached per token. Uses the pair abi, as it includes the standard ERC-20 functions. '''
+        try:
+            return self.token_decimals[token_address]
+        except KeyError:
+            decimals = self.get_pool_contract(pool_address=token_address).functions.decimals().call()
+            self.token_decimals[token_address] = decimals
+            return decimals
+
+
+    @staticmethod
+    def decode_swap_direction(swap_event: dict, token0_address: str, token1_address: str):
+        '''
+        Finds the swap direction using only the args of a pool's Swap event and the pool's token ordering.
+            - amount0In > 0 means token0 was sold to the pool and token1 was bought, and vice versa.
+
+        Returns (buy_token_address, sell_token_address, amount_in, amount_out).
+        '''
+        if swap_event['amount0In'] > swap_event['amount1In']:
+            return token1_address, token0_address, swap_event['amount0In'], swap_event['amount1Out']
+        else:
+            return token0_address, token1_address, swap_event['amount1In'], swap_event['amount0Out']
 
 
     def get_reserves(self, pool_contract):
         '''
         Returns the amount of token_a and token_b that make up the liquidity pool.
         '''
-        decimals = 10 ** pool_contract.functions.decimals().call()
-        reserves = pool_contract.functions.getReserves().call()
-        output = {
-            pool_contract.functions.token0().call(): (reserves[0] / decimals),
-            pool_contract.functions.token1().call(): (reserves[1] / decimals),
+        return self.get_reserves_many([pool_contract])[pool_contract.address]
+
+
+    def get_reserves_many(self, pool_contracts: list, block_identifier: Union[str, int] = 'latest') -> dict:
+        '''
+        Reads the reserves of many pools in one eth_call through self.Multicall, all at the same block.
+        Each pool's token0 and token1 are only read the first time the pool is seen.
+
+        Returns {pool_address: {token0_address: reserve_0, token1_address: reserve_1}}
+        '''
+        return {
+            pool_address: {token_address: reserve / (10 ** raw_reserves['decimals']) for token_address, reserve in raw_reserves['reserves'].items()}
+            for pool_address, raw_reserves in self.get_raw_reserves_many(pool_contracts, block_identifier=block_identifier).items()
         }
+
+
+    def get_raw_reserves_many(self, pool_contracts: list, block_identifier: Union[str, int] = 'latest') -> dict:
+        '''
+        Same as self.get_reserves_many(), but with the reserves as integer token units, as needed by self.AMM.
+
+        Pools that haven't been deployed are left out.
+
+        Returns {pool_address: {'decimals': pool decimals, 'reserves': {token0_address: reserve_0, token1_address: reserve_1}}}
+        '''
+        ## Build Calls
+        calls = []
+        for pool_contract in pool_contracts:
+            calls.extend([pool_contract.functions.decimals(), pool_contract.functions.getReserves()])
+        uncached_pool_contracts = {pool_contract.address: pool_contract for pool_contract in pool_contracts if pool_contract.address not in self.pool_tokens}
+        for pool_contract in uncached_pool_contracts.values():
+            calls.extend([pool_contract.functions.token0(), pool_contract.functions.token1()])
+
+        ## Make Calls
+        outputs = self.Multicall.aggregate(calls, block_identifier=block_identifier)
+        token_outputs = outputs[2 * len(pool_contracts):]
+        for i, pool_address in enumerate(uncached_pool_contracts):
+            if token_outputs[2 * i] is not None:  # None if the pool isn't deployed
+                self.pool_tokens[pool_address] = (token_outputs[2 * i], token_outputs[(2 * i) + 1])
+
+        ## Parse Outputs
+        output = {}
+        for i, pool_contract in enumerate(pool_contracts):
+            reserves = outputs[(2 * i) + 1]
+            if reserves is None:  # nothing is deployed at the pool address, so the call returned no data
+                continue
+            token0_address, token1_address = self.pool_tokens[pool_contract.address]
+            output[pool_contract.address] = {
+                'decimals': outputs[2 * i],
+                'reserves': {token0_address: reserves[0], token1_address: reserves[1]},
+            }
         return output
 
 
@@ -147,93 +274,368 @@ class CommsDEXPancakeSwapV2(CommsBlockchainBSC):
         return price_in_sell
 
 
-    def get_historical_trades(
-        self, symbol_1: str, symbol_2: str,
+    def get_route_pools(self, token_addresses: List[str]) -> List[str]:
+        '''
+        Adds the pools between every two of `token_addresses` and self.route_base_tokens to self.RouteFinder's graph,
+        and returns their addresses. The addresses are computed offline, so the pools may not exist.
+        '''
+        token_addresses = list(dict.fromkeys([Web3.toChecksumAddress(token_address) for token_address in token_addresses] + self.route_base_tokens))
+        pool_addresses = []
+        for i, token_address_a in enumerate(token_addresses):
+            for token_address_b in token_addresses[i + 1:]:
+                pool_address = self.get_pool_address(token_address_a, token_address_b, check_exists=False)
+                self.RouteFinder.add_pair(pool_address, token_address_a, token_address_b)
+                pool_addresses.append(pool_address)
+        return pool_addresses
+
+
+    def find_best_route(self, buy_token_contract_address: str, sell_token_contract_address: str, sell_quantity: float) -> Union[dict, None]:
+        '''
+        Finds the path of 1 to self.RouteFinder.max_hops pools, through self.route_base_tokens (e.g. WBNB, BUSD),
+        that returns the most buy tokens for selling sell_quantity sell tokens.
+        The reserves of every candidate pool are read in one eth_call, which is free if they were already read this block.
+
+        Returns {'path', 'pools', 'amounts', 'amount_out'} (see RouteFinder.find_best_route()), or None if no path has liquidity.
+        '''
+        buy_token_contract_address, sell_token_contract_address = Web3.toChecksumAddress(buy_token_contract_address), Web3.toChecksumAddress(sell_token_contract_address)
+        pool_addresses = self.get_route_pools([sell_token_contract_address, buy_token_contract_address])
+        raw_reserves = self.get_raw_reserves_many([self.get_pool_contract(pool_address) for pool_address in pool_addresses])
+        self.RouteFinder.update_reserves({pool_address: pool['reserves'] for pool_address, pool in raw_reserves.items()})
+        return self.RouteFinder.find_best_route(
+            self.to_dex_number(sell_quantity, decimals=self.get_token_decimals(sell_token_contract_address)),
+            token_in=sell_token_contract_address, token_out=buy_token_contract_address,
+            pool_addresses=set(raw_reserves)  # only the pools just read, not ones left in the graph by earlier orders
+        )
+
+
+    def get_swap_events_many(self, pool_addresses: List[str], from_block: int, to_block: int) -> dict:
+        '''
+        Gets the Swap events of many pools with one eth_getLogs query per block range, filtered by all the
+        pool addresses plus the Swap event topic, and routes the decoded events back to their pool.
+
+        Returns {pool_address: [decoded Swap event, ...]}, with each pool's events in (blockNumber, logIndex) order.
+        '''
+        pool_addresses = [Web3.toChecksumAddress(pool_address) for pool_address in pool_addresses]
+        swap_event_decoder = self.get_pool_contract(pool_address=pool_addresses[0]).events.Swap()  # every pair shares the same abi
+        raw_swap_logs = self.LogScanner.get_logs(
+            filter_params={'address': pool_addresses, 'topics': [Web3.toHex(event_abi_to_log_topic(swap_event_decoder.abi))]},
+            from_block=from_block, to_block=to_block
+        )
+        swap_events = {pool_address: [] for pool_address in pool_addresses}
+        for log in raw_swap_logs:
+            swap_events[log['address']].append(swap_event_decoder.processLog(log))
+        return swap_events
+
+
+    def get_historical_trades_many(
+        self, pairs: List[tuple],
         start: Union[datetime, None] = None, end: Union[datetime, None] = None,
         start_block: Union[int, None] = None, end_block: Union[int, None] = None,
-        save: bool = False
-    ):
+        batch_size: Union[int, None] = None, use_receipts: bool = False
+    ) -> dict:
         '''
         Function
         --------
-        1. Takes two symbols, a start and end date, and queries all Pancakeswap Pools
-           with those two tokens to find all the swap events in that period.
+        1. Takes a list of (symbol_1, symbol_2) pairs, a start and end date, and queries the Pancakeswap Pools
+           of all the pairs at once to find all the swap events in that period.
         2. Then gets the full transaction hash each swap event was a part of.
-        3. Then compares the "transfer" event amounts in the transaction hash
-           to the amounts in and out of the swap event to figure out which token
-           was bought/sold.
-        4. Then records the buy/sell tokens and amounts to an output_data variable.
+        3. Then figures out which token was bought/sold, either:
+            - from the swap event's amounts in/out and the pool's token ordering (default), or
+            - if use_receipts is True, by comparing the "transfer" event amounts in the
+              transaction receipt to the amounts in and out of the swap event.
+        4. Then records the buy/sell tokens and amounts to an output_data variable per pair.
+
+        Parameters
+        ----------
+        batch_size : int
+            If None, the receipt and transaction of each swap are downloaded one call at a time.
+            Else, they are downloaded via JSON-RPC batch requests of `batch_size` calls each.
+            Block timestamps come from self.BlockTimestampIndex, and missing block headers are always downloaded in batches.
+        use_receipts : bool
+            If False, no transaction receipts are downloaded or decoded, and "gas_used" is recorded as None.
+
+        Returns {(symbol_1, symbol_2): output_data}, where output_data is in the format returned by self.get_historical_trades().
         '''
-        output_data = {}
         ## Get Contract Addresses and Objects
-        symbol_1_address = self.get_token_address(symbol=symbol_1)
-        symbol_2_address = self.get_token_address(symbol=symbol_2)
-        pool_address = self.get_pool_address(symbol_1_address, symbol_2_address)
-        pool_contract = self.get_pool_contract(pool_address=pool_address)
-        decimals = pool_contract.functions.decimals().call()
-
-        ## Get all Swap Events from Pool Contract between datetimes
+        pools = {}  # {pool_address: pool info}
+        for symbol_1, symbol_2 in pairs:
+            symbol_1_address = self.get_token_address(symbol=symbol_1)
+            symbol_2_address = self.get_token_address(symbol=symbol_2)
+            pool_address = self.get_pool_address(symbol_1_address, symbol_2_address)
+            pool_contract = self.get_pool_contract(pool_address=pool_address)
+            pools[pool_address] = {
+                'pair': (symbol_1, symbol_2),
+                'symbol_1_address': symbol_1_address,
+                'symbol_2_address': symbol_2_address,
+                'decimals': pool_contract.functions.decimals().call(),
+                'token_addresses': self.get_token_addresses_from_pool(pool_contract),
+            }
+
+        ## Get all Swap Events from Pool Contracts between datetimes
         if start_block is None:
-            from_block = self.CommsBlockchainDataProviders.BscScan.get_block_id_by_datetime(dt=start, closest='before')
+            from_block = self.get_block_number_by_datetime(dt=start, closest='before')
         else:
             from_block = start_block
         if end_block is None:
-            to_block= self.CommsBlockchainDataProviders.BscScan.get_block_id_by_datetime(dt=end, closest='after')
+            to_block = self.get_block_number_by_datetime(dt=end, closest='after')
         else:
             to_block = end_block
-        event_filter = pool_contract.events.Swap.createFilter(fromBlock=from_block, toBlock=to_block)
-        unparsed_swaps = event_filter.get_all_entries()
-
-        ## Parse the Transaction Log associated with each Swap Event
-        txn_hashes = {d.transactionHash: d.args for d in unparsed_swaps}
-        for txn_hash, swap_event in txn_hashes.items():
-            ## Prep Data for Finding the Swapped Amounts and Direction (buy/sell which token)
-            txn_receipt = self.w3.eth.get_transaction_receipt(txn_hash)
-            parsed_receipt = self.parse_transaction_receipt(txn_receipt=txn_receipt)
-            symbol_1_amount = [d.get('value', d.get('wad')) for d in parsed_receipt.values() if d['event'] == 'Transfer' and d['address'] == symbol_1_address][0]
-            symbol_2_amount = [d.get('value', d.get('wad')) for d in parsed_receipt.values() if d['event'] == 'Transfer' and d['address'] == symbol_2_address][0]
-            ## Assign Swapped Amounts and Direction
-            amount_in = max([swap_event['amount0In'], swap_event['amount1In']])  # max() removes the zero value
-            amount_out = max([swap_event['amount0Out'], swap_event['amount1Out']])  # max() removes the zero value
-            buy_symbol = symbol_1 if (symbol_1_amount == amount_out) else symbol_2 if (symbol_2_amount == amount_out) else None
-            sell_symbol = symbol_1 if (symbol_1_amount == amount_in) else symbol_2 if (symbol_2_amount == amount_in) else None
-            ## Get Other Data
-            block_number = txn_receipt['blockNumber']
-            block_datetime =  datetime.fromtimestamp(self.w3.eth.getBlock(block_number)['timestamp'], tz=timezone.utc)
-            gas_price = self.w3.eth.getTransaction(txn_hash)['gasPrice']
-            gas_used = txn_receipt['gasUsed']
-            ## Record to Output Variable
-            output_data.update({
-                txn_hash.hex(): {
-                    'block_number': block_number,
-                    'txn_index': txn_receipt['transactionIndex'],
-                    'block_datetime': block_datetime,
-                    'buy_symbol': buy_symbol,
-                    'sell_symbol': sell_symbol,
-                    'buy_amount': self.from_dex_number(amount_out, decimals=decimals),
-                    'sell_amount': self.from_dex_number(amount_in, decimals=decimals),
-                    'gas_used': gas_used,
-                    'gas_price': gas_price,
-                }
-            })
+        unparsed_swaps = self.get_swap_events_many(pool_addresses=list(pools), from_block=from_block, to_block=to_block)
+
+        ## Download the Receipt and Transaction of each Swap Event, and the Timestamp of each Block
+        swap_logs = {pool_address: {d.transactionHash: d for d in swaps} for pool_address, swaps in unparsed_swaps.items()}
+        txn_hashes = list({txn_hash for pool_swap_logs in swap_logs.values() for txn_hash in pool_swap_logs})
+        block_numbers = {d.blockNumber for swaps in unparsed_swaps.values() for d in swaps}
+        if batch_size is None:
+            txn_receipts = {txn_hash: self.w3.eth.get_transaction_receipt(txn_hash) for txn_hash in txn_hashes} if use_receipts else {}
+            txns = {txn_hash: self.w3.eth.getTransaction(txn_hash) for txn_hash in txn_hashes}
+        else:
+            txn_receipts = dict(zip(txn_hashes, self.get_transaction_receipts(txn_hashes, batch_size=batch_size))) if use_receipts else {}
+            txns = dict(zip(txn_hashes, self.get_transactions(txn_hashes, batch_size=batch_size)))
+        block_timestamps = self.get_block_timestamps(list(block_numbers), batch_size=batch_size)
+
+        ## Parse each Swap Event
+        all_output_data = {}
+        for pool_address, pool in pools.items():
+            output_data = {}
+            symbol_1, symbol_2 = pool['pair']
+            symbol_1_address, symbol_2_address = pool['symbol_1_address'], pool['symbol_2_address']
+            symbols = {symbol_1_address: symbol_1, symbol_2_address: symbol_2}
+            decimals = pool['decimals']
+            for txn_hash, swap_log in swap_logs[pool_address].items():
+                swap_event = swap_log.args
+                ## Assign Swapped Amounts and Direction
+                if use_receipts is True:
+                    txn_receipt = txn_receipts[txn_hash]
+                    parsed_receipt = self.parse_transaction_receipt(txn_receipt=txn_receipt)
+                    symbol_1_amount = [d.get('value', d.get('wad')) for d in parsed_receipt.values() if d['event'] == 'Transfer' and d['address'] == symbol_1_address][0]
+                    symbol_2_amount = [d.get('value', d.get('wad')) for d in parsed_receipt.values() if d['event'] == 'Transfer' and d['address'] == symbol_2_address][0]
+                    amount_in = max([swap_event['amount0In'], swap_event['amount1In']])  # max() removes the zero value
+                    amount_out = max([swap_event['amount0Out'], swap_event['amount1Out']])  # max() removes the zero value
+                    buy_symbol = symbol_1 if (symbol_1_amount == amount_out) else symbol_2 if (symbol_2_amount == amount_out) else None
+                    sell_symbol = symbol_1 if (symbol_1_amount == amount_in) else symbol_2 if (symbol_2_amount == amount_in) else None
+                    gas_used = txn_receipt['gasUsed']
+                else:
+                    buy_address, sell_address, amount_in, amount_out = self.decode_swap_direction(swap_event, *pool['token_addresses'])
+                    buy_symbol = symbols.get(buy_address, None)
+                    sell_symbol = symbols.get(sell_address, None)
+                    gas_used = None  # only available in the transaction receipt
+                ## Get Other Data
+                block_number = swap_log['blockNumber']
+                block_datetime =  datetime.fromtimestamp(block_timestamps[block_number], tz=timezone.utc)
+                gas_price = txns[txn_hash]['gasPrice']
+                ## Record to Output Variable
+                output_data.update({
+                    txn_hash.hex(): {
+                        'block_number': block_number,
+                        'txn_index': swap_log['transactionIndex'],
+                        'block_datetime': block_datetime,
+                        'buy_symbol': buy_symbol,
+                        'sell_symbol': sell_symbol,
+                        'buy_amount': self.from_dex_number(amount_out, decimals=decimals),
+                        'sell_amount': self.from_dex_number(amount_in, decimals=decimals),
+                        'gas_used': gas_used,
+                        'gas_price': gas_price,
+                    }
+                })
+            all_output_data[pool['pair']] = output_data
+        return all_output_data
+
+
+    def get_sync_events_many(self, pool_addresses: List[str], from_block: int, to_block: int) -> dict:
+        '''
+        Same as self.get_swap_events_many(), but for the Sync(reserve0, reserve1) event, which
+        a pair emits with its new reserves after every change to them.
+        '''
+        pool_addresses = [Web3.toChecksumAddress(pool_address) for pool_address in pool_addresses]
+        sync_event_decoder = self.get_pool_contract(pool_address=pool_addresses[0]).events.Sync()  # every pair shares the same abi
+        raw_sync_logs = self.LogScanner.get_logs(
+            filter_params={'address': pool_addresses, 'topics': [Web3.toHex(event_abi_to_log_topic(sync_event_decoder.abi))]},
+            from_block=from_block, to_block=to_block
+        )
+        sync_events = {pool_address: [] for pool_address in pool_addresses}
+        for log in raw_sync_logs:
+            sync_events[log['address']].append(sync_event_decoder.processLog(log))
+        return sync_events
+
+
+    def get_reserve_history_many(
+        self, pairs: List[tuple],
+        start: Union[datetime, None] = None, end: Union[datetime, None] = None,
+        start_block: Union[int, None] = None, end_block: Union[int, None] = None,
+        batch_size: Union[int, None] = None
+    ) -> dict:
+        '''
+        Builds the reserve and price history of each pair's pool from its Sync events only;
+        no transactions or receipts are downloaded. Each row is the exact pool state after a change to it.
+
+        Returns {(symbol_1, symbol_2): columns}, where columns is a dict of NumPy arrays:
+            block_number : int64
+            txn_index    : int32
+            log_index    : int32
+            timestamp    : int64    block timestamp in unix seconds
+            reserve_1    : float64  symbol_1 in the pool, in symbol_1 units
+            reserve_2    : float64  symbol_2 in the pool, in symbol_2 units
+            price        : float64  symbol_2 per symbol_1
+        '''
+        ## Get Contract Addresses and Token Ordering
+        pools = {}  # {pool_address: pool info}
+        for symbol_1, symbol_2 in pairs:
+            symbol_1_address = self.get_token_address(symbol=symbol_1)
+            symbol_2_address = self.get_token_address(symbol=symbol_2)
+            pool_address = self.get_pool_address(symbol_1_address, symbol_2_address)
+            token0_address, _ = self.get_token_addresses_from_pool(self.get_pool_contract(pool_address=pool_address))
+            pools[pool_address] = {
+                'pair': (symbol_1, symbol_2),
+                'symbol_1_is_token0': token0_address == symbol_1_address,
+                'symbol_1_decimals': self.get_token_decimals(symbol_1_address),
+                'symbol_2_decimals': self.get_token_decimals(symbol_2_address),
+            }
+
+        ## Get all Sync Events and Block Timestamps
+        if start_block is None:
+            start_block = self.get_block_number_by_datetime(dt=start, closest='before')
+        if end_block is None:
+            end_block = self.get_block_number_by_datetime(dt=end, closest='after')
+        sync_events = self.get_sync_events_many(pool_addresses=list(pools), from_block=start_block, to_block=end_block)
+        block_numbers = {d.blockNumber for events in sync_events.values() for d in events}
+        block_timestamps = self.get_block_timestamps(list(block_numbers), batch_size=batch_size)
+
+        ## Make Columns
+        all_columns = {}
+        for pool_address, pool in pools.items():
+            events = sync_events[pool_address]
+            reserve0 = np.array([float(d.args['reserve0']) for d in events], dtype=np.float64)
+            reserve1 = np.array([float(d.args['reserve1']) for d in events], dtype=np.float64)
+            reserve_1, reserve_2 = (reserve0, reserve1) if pool['symbol_1_is_token0'] else (reserve1, reserve0)
+            reserve_1 = reserve_1 / (10 ** pool['symbol_1_decimals'])
+            reserve_2 = reserve_2 / (10 ** pool['symbol_2_decimals'])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                price = reserve_2 / reserve_1
+            all_columns[pool['pair']] = {
+                'block_number': np.array([d.blockNumber for d in events], dtype=np.int64),
+                'txn_index': np.array([d.transactionIndex for d in events], dtype=np.int32),
+                'log_index': np.array([d.logIndex for d in events], dtype=np.int32),
+                'timestamp': np.array([block_timestamps[d.blockNumber] for d in events], dtype=np.int64),
+                'reserve_1': reserve_1,
+                'reserve_2': reserve_2,
+                'price': price,
+            }
+        return all_columns
+
+
+    def get_reserve_history(
+        self, symbol_1: str, symbol_2: str,
+        start: Union[datetime, None] = None, end: Union[datetime, None] = None,
+        start_block: Union[int, None] = None, end_block: Union[int, None] = None,
+        batch_size: Union[int, None] = None
+    ) -> dict:
+        ''' Single pair version of self.get_reserve_history_many(). '''
+        return self.get_reserve_history_many(
+            pairs=[(symbol_1, symbol_2)],
+            start=start, end=end, start_block=start_block, end_block=end_block,
+            batch_size=batch_size
+        )[(symbol_1, symbol_2)]
+
+
+    def get_historical_trades(
+        self, symbol_1: str, symbol_2: str,
+        start: Union[datetime, None] = None, end: Union[datetime, None] = None,
+        start_block: Union[int, None] = None, end_block: Union[int, None] = None,
+        save: bool = False, batch_size: Union[int, None] = None, use_receipts: bool = False
+    ):
+        '''
+        Single pair version of self.get_historical_trades_many(); see it for the parameters.
+        If save is True, the trades are saved in the columnar format of TradeStorage.
+
+        Returns {txn_hash: {block_number, txn_index, block_datetime, buy_symbol, sell_symbol, buy_amount, sell_amount, gas_used, gas_price}}.
+        '''
+        output_data = self.get_historical_trades_many(
+            pairs=[(symbol_1, symbol_2)],
+            start=start, end=end, start_block=start_block, end_block=end_block,
+            batch_size=batch_size, use_receipts=use_receipts
+        )[(symbol_1, symbol_2)]
         ## Save Data
         if save is True:
             start_strf = start.strftime("%Y-%m-%d-%H-%M-%S")
             end_strf = end.strftime("%Y-%m-%d-%H-%M-%S")
-            file_name = f'pancakeswapv2_{symbol_1}_{symbol_2}_{start_strf}_{end_strf}.pkl'
-            file_loc = f'{self.DataLoc.Folder.DEX_PRICES.value}/{file_name}'
-            with open(file_loc, 'wb') as pfile:
-                pickle.dump(output_data, pfile, protocol=pickle.HIGHEST_PROTOCOL)
+            file_name = f'pancakeswapv2_{symbol_1}_{symbol_2}_{start_strf}_{end_strf}{TradeStorage.file_extension}'
+            file_loc = f'{self.DataLoc.Folder.DATA_DEX_PRICES.value}/{file_name}'
+            TradeStorage.save(file_loc, TradeStorage.to_columns(output_data))
         return output_data
 
 
-    def get_sell_amount(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, slippage: float, buy_amount: float = 0):
+    def backfill_historical_trades(
+        self, checkpoint: BackfillCheckpoint, pairs: List[tuple], on_chunk: Callable,
+        chunk_blocks: int = 1000, wait_for_blocks: bool = False,
+        batch_size: Union[int, None] = None, use_receipts: bool = False
+    ) -> BackfillCheckpoint:
+        '''
+        Runs self.get_historical_trades_many() over the checkpoint's block range in chunks, recording the
+        last fully processed block of each pool in the checkpoint after each chunk. Blocks a pool has already
+        been processed for are never queried again, so a restarted job resumes exactly where it stopped.
+
+        Parameters
+        ----------
+        checkpoint : BackfillCheckpoint
+            Made via BackfillCheckpoint.open(...).start(...), with pool keys from self.get_backfill_pool_key().
+        on_chunk : Callable
+            Called as on_chunk(all_output_data, chunk_start_block, chunk_end_block) after each chunk, and must
+            save the chunk's data before returning, as the checkpoint is updated straight after.
+        chunk_blocks : int
+            Max number of blocks per chunk.
+        wait_for_blocks : bool
+            If True, waits on self.NewBlockSubscriber until a chunk's last block has been mined before querying it (for ranges that end in the future).
+            Else, stops at the latest block, leaving the rest of the range for the next run.
+        '''
+        keyed_pairs = {self.get_backfill_pool_key(*pair): pair for pair in pairs}
+        while True:
+            ## Find the Lowest Block still Needed, and the Pools that Need it
+            next_blocks = {pool_key: checkpoint.next_block(pool_key) for pool_key in keyed_pairs if checkpoint.next_block(pool_key) <= checkpoint.end_block}
+            if not next_blocks:
+                break
+            chunk_start = min(next_blocks.values())
+            chunk_pool_keys = [pool_key for pool_key, next_block in next_blocks.items() if next_block == chunk_start]
+            ## End the Chunk before any other Pool's next block, so no pool gets a block it already has
+            later_next_blocks = [next_block for next_block in next_blocks.values() if next_block > chunk_start]
+            chunk_end = min([chunk_start + chunk_blocks - 1, checkpoint.end_block] + [next_block - 1 for next_block in later_next_blocks])
+
+            ## Wait for the Chunk's Blocks to Exist
+            latest_block = self.get_latest_block_number()
+            if chunk_end > latest_block:
+                if wait_for_blocks is False:
+                    chunk_end = latest_block
+                    if chunk_end < chunk_start:
+                        break
+                else:
+                    self.NewBlockSubscriber.wait_for_block(chunk_end)
+
+            ## Download, Save, then Checkpoint
+            all_output_data = self.get_historical_trades_many(
+                pairs=[keyed_pairs[pool_key] for pool_key in chunk_pool_keys],
+                start_block=chunk_start, end_block=chunk_end,
+                batch_size=batch_size, use_receipts=use_receipts
+            )
+            on_chunk(all_output_data, chunk_start, chunk_end)
+            checkpoint.update(pool_keys=chunk_pool_keys, last_block=chunk_end)
+            self.logger.debug(f'Backfill checkpoint updated. Pools: {chunk_pool_keys}. Blocks: {chunk_start}-{chunk_end}. Checkpoint: {checkpoint.fileloc}.')
+        return checkpoint
+
+
+    @staticmethod
+    def get_backfill_pool_key(symbol_1: str, symbol_2: str) -> str:
+        return f'pancakeswapv2_{symbol_1}_{symbol_2}'
+
+
+    def get_sell_amount(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, slippage: float, buy_amount: float = 0, raw_reserves: Union[dict, None] = None):
         '''
         Parameters
         ----------
         slippage : float
             Quote this amount in decimal form. E.g. 2% slippage should be given as 0.02
             NOTE: 0.02 is recommended by reddit people to not be front run
+        raw_reserves : dict
+            The pool's {token_address: reserve} from self.get_raw_reserves_many(). If not given, they are read in one eth_call.
 
         Returns the actual output amount for a given input amount.
             - This function takes into account pool liquidity.
@@ -243,49 +645,74 @@ class CommsDEXPancakeSwapV2(CommsBlockchainBSC):
               and occurs without the action of any other trades.
               Slippage is this difference, but due to other trades being filled before your own.
 
-        Smart Contract Functions
-        ------------------------
-        getAmountsIn:
-
         Misc
         ----
         The calculation is {out_token buy amount} =  ({out_token reserve amount} * {in_token sell amount}) / ({in_token sell amount} + {in_token reserve amount})
+        It is done locally by self.AMM, with the same integer math and fee as the router's getAmountsIn.
         '''
-        decimals = pool_contract.functions.decimals().call()
+        if raw_reserves is None:
+            raw_reserves = self.get_raw_reserves_many([pool_contract])[pool_contract.address]['reserves']
         slippage_adjusted_buy_amount = buy_amount * (1 + slippage)  # adding (+) slippage because more input is needed to account for slippage
         ## How many input / sell tokens are needed to purchase a given amount of output / buy tokens
-        sell_amount = self.contract_router.functions.getAmountsIn(
-            self.to_dex_number(slippage_adjusted_buy_amount, decimals=decimals),
-            [sell_token_contract_address, buy_token_contract_address]  # [SELL, BUY]
-            ).call()  # returns [amount_in, amount_out]
-        return self.from_dex_number(sell_amount[0], decimals=decimals)
+        sell_amount = self.AMM.get_amount_in(
+            self.to_dex_number(slippage_adjusted_buy_amount, decimals=self.get_token_decimals(buy_token_contract_address)),
+            reserve_in=raw_reserves[sell_token_contract_address], reserve_out=raw_reserves[buy_token_contract_address]
+        )
+        return self.from_dex_number(sell_amount, decimals=self.get_token_decimals(sell_token_contract_address))
 
 
-    def get_buy_amount(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, slippage: float = 0.02, sell_amount: float = 0):
+    def get_buy_amount(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, slippage: float = 0.02, sell_amount: float = 0, raw_reserves: Union[dict, None] = None):
         '''
         Parameters
         ----------
         slippage : float
             Quote this amount in decimal form. E.g. 2% slippage should be given as 0.02
             NOTE: 0.02 is recommended by reddit people to not be front run
+        raw_reserves : dict
+            The pool's {token_address: reserve} from self.get_raw_reserves_many(). If not given, they are read in one eth_call.
 
-        Smart Contract Functions
-        ------------------------
-        getAmountsOut:
-            outputs [amount_in, amount_out], where
-            amount_in is a provided argument
-            amount_out is the number of buy-tokens returned from selling amount_in number of sell-tokens, accounting for pool liquidity AND DEX swap fees but not accounting for layer 1 miner fees.
+        Returns the number of buy-tokens returned from selling sell_amount number of sell-tokens, accounting for pool liquidity
+        AND DEX swap fees but not accounting for layer 1 miner fees. Calculated locally by self.AMM, with the same integer math
+        and fee as the router's getAmountsOut.
         '''
-        decimals = pool_contract.functions.decimals().call()
+        if raw_reserves is None:
+            raw_reserves = self.get_raw_reserves_many([pool_contract])[pool_contract.address]['reserves']
         slippage_adjusted_sell_amount = sell_amount * (1 - slippage)  # subtracting (-) slippage because expecting less output is needed to account for slippage
-        buy_amount = self.contract_router.functions.getAmountsOut(
-            self.to_dex_number(slippage_adjusted_sell_amount, decimals=decimals),
-            [sell_token_contract_address, buy_token_contract_address]  # [SELL, BUY]
-            ).call()  # returns [amount_in, amount_out]
-        return self.from_dex_number(buy_amount[1], decimals=decimals)
+        buy_amount = self.AMM.get_amount_out(
+            self.to_dex_number(slippage_adjusted_sell_amount, decimals=self.get_token_decimals(sell_token_contract_address)),
+            reserve_in=raw_reserves[sell_token_contract_address], reserve_out=raw_reserves[buy_token_contract_address]
+        )
+        return self.from_dex_number(buy_amount, decimals=self.get_token_decimals(buy_token_contract_address))
 
 
-    def create_swap_txn(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, sell_quantity: float, price_in_sell: Union[float, None] = None, slippage : Union[float, None] = None):
+    def get_path_buy_amount(self, path: List[str], slippage: float = 0.02, sell_amount: float = 0) -> Union[float, None]:
+        '''
+        Multi-hop version of self.get_buy_amount(), along `path` (token addresses, in swap order), as the router's getAmountsOut.
+        The path's reserves are read in one eth_call, which is free if they were already read this block.
+
+        Returns None if any pool on the path has no liquidity.
+        '''
+        path = [Web3.toChecksumAddress(token_address) for token_address in path]
+        pool_addresses = []
+        for token_address_in, token_address_out in zip(path[:-1], path[1:]):
+            pool_address = self.get_pool_address(token_address_in, token_address_out, check_exists=False)
+            self.RouteFinder.add_pair(pool_address, token_address_in, token_address_out)
+            pool_addresses.append(pool_address)
+        raw_reserves = self.get_raw_reserves_many([self.get_pool_contract(pool_address) for pool_address in pool_addresses])
+        self.RouteFinder.update_reserves({pool_address: pool['reserves'] for pool_address, pool in raw_reserves.items()})
+        slippage_adjusted_sell_amount = sell_amount * (1 - slippage)  # subtracting (-) slippage because expecting less output is needed to account for slippage
+        amounts = self.RouteFinder.quote(self.to_dex_number(slippage_adjusted_sell_amount, decimals=self.get_token_decimals(path[0])), path)
+        if amounts is None:
+            return None
+        return self.from_dex_number(amounts[-1], decimals=self.get_token_decimals(path[-1]))
+
+
+    def create_swap_txn(
+        self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, sell_quantity: float,
+        price_in_sell: Union[float, None] = None, slippage : Union[float, None] = None,
+        min_buy_quantity: Union[float, None] = None, nonce: Union[int, None] = None, gas_price: Union[int, None] = None, deadline_minutes: float = 5,
+        path: Union[List[str], None] = None
+    ):
         '''
         swapExactTokensForTokens
             - Receive an as many output tokens as possible for an exact amount of input tokens.
@@ -293,55 +720,215 @@ class CommsDEXPancakeSwapV2(CommsBlockchainBSC):
             - To make a limit order with the function swapExactTokensForTokens,
               min_amount_out is calculated as {min_amount_out = amount_in / price} and does not consider the size of pool reserves.
               Aka, self.get_buy_amount is not used as this would assume achieving a lower price due to the AMM output calculation.
+
+        The swap is routed along the path with the most output (see self.find_best_route()), which may go through
+        WBNB / BUSD etc. when they have more liquidity than the direct pool. With no liquidity on any path,
+        the direct pool (pool_contract) is used, e.g. for a pair that is about to list.
+
+        Parameters
+        ----------
+        min_buy_quantity / nonce / gas_price / path
+            If given, used instead of being quoted / handed out / read from the gas oracle / routed (e.g. by self.stage_order()).
         '''
+        ## Find Route
+        if path is None:
+            route = self.find_best_route(buy_token_contract_address, sell_token_contract_address, sell_quantity=sell_quantity)
+            path = [sell_token_contract_address, buy_token_contract_address] if route is None else route['path']
+
+        ## Already Quoted
+        if min_buy_quantity is not None:
+            pass
         ## Market Order
-        if price_in_sell is None:  # use slippage from market price
-            min_buy_quantity = self.get_buy_amount(
-                pool_contract=pool_contract, slippage=slippage, sell_amount=sell_quantity,
-                buy_token_contract_address=buy_token_contract_address,
-                sell_token_contract_address=sell_token_contract_address
-            )
+        elif price_in_sell is None:  # use slippage from market price, along the route
+            min_buy_quantity = self.get_path_buy_amount(path=path, slippage=slippage, sell_amount=sell_quantity)
+            if min_buy_quantity is None:
+                error = f'Cannot quote a market order with no liquidity on its path. Path: {path}.'
+                self.logger.critical(error)
+                raise Exception(error)
         ## Limit Order
         else:
             min_buy_quantity = sell_quantity / price_in_sell  # entire must be filled at this price. Accounting for AMM output calculation (m*n=k), that means market price will have to be much better than limit price to have entire filled at an average fill price of the limit price
 
         ## Get Data
-        decimals = pool_contract.functions.decimals().call()
-        nonce = self.get_nonce()
-        decimal_sell_quantity = self.to_dex_number(sell_quantity, decimals=decimals)
-        decimal_min_buy_quantity = self.to_dex_number(min_buy_quantity, decimals=decimals)
-        gas_price = int(self.w3.eth.gasPrice * 1.4)  # self.w3.eth.generate_gas_price()
-
-        ## Create Transaction Inputs
-        txn_inputs = {
-            'from'      : self.address_wallet,
-            'value'     : decimal_sell_quantity,
-            'gas'       : 250000,  # 250000 looks to be much larger than any DEX uses on average
-            'gasPrice'  : gas_price,  # stated in Wei  # from gas price calculator function set to w3 object in self.connect function
-            'nonce'     : nonce,
-        }
-
-        ## Create Swap Transaction
-        decimals = pool_contract.functions.decimals().call()
-        txn = self.contract_router.functions.swapExactTokensForTokens(
-            decimal_sell_quantity,       # amount of sell token to sell
-            decimal_min_buy_quantity,    # min amount of buy token to receive
-            [sell_token_contract_address, buy_token_contract_address],
-            self.address_wallet, # my crypto bank account
-            math.floor((datetime.utcnow() + timedelta(minutes=5)).timestamp()),
-        ).buildTransaction(txn_inputs)
-
-        ## Sign Transaction
-        signed_txn = self.w3.eth.account.sign_transaction(txn, self.private_key)
+        decimal_sell_quantity = self.to_dex_number(sell_quantity, decimals=self.get_token_decimals(sell_token_contract_address))
+        decimal_min_buy_quantity = self.to_dex_number(min_buy_quantity, decimals=self.get_token_decimals(buy_token_contract_address))
+        gas_price = self.get_gas_price(strategy_name='oracle') if gas_price is None else gas_price  # read from the background gas oracle, no network call
+        chain_id = self.get_chain_id()  # given so that buildTransaction makes no eth_chainId call
+
+        ## Reserve Nonce, last, so that a failure above can't burn it
+        reserved_nonce = nonce is None
+        nonce = self.get_nonce() if reserved_nonce else nonce
+        try:
+            ## Create Transaction Inputs
+            txn_inputs = {
+                'from'      : self.address_wallet,
+                'value'     : decimal_sell_quantity,
+                'gas'       : 250000,  # 250000 looks to be much larger than any DEX uses on average
+                'gasPrice'  : gas_price,  # stated in Wei
+                'nonce'     : nonce,
+                'chainId'   : chain_id,
+            }
+
+            ## Create Swap Transaction
+            txn = self.contract_router.functions.swapExactTokensForTokens(
+                decimal_sell_quantity,       # amount of sell token to sell
+                decimal_min_buy_quantity,    # min amount of buy token to receive
+                path,
+                self.address_wallet, # my crypto bank account
+                math.floor((datetime.utcnow() + timedelta(minutes=deadline_minutes)).timestamp()),
+            ).buildTransaction(txn_inputs)
+
+            ## Sign Transaction
+            signed_txn = self.w3.eth.account.sign_transaction(txn, self.private_key)
+        except Exception as e:
+            if reserved_nonce:  # a nonce given by the caller is the caller's to give back
+                self.NonceManager.resync_after_error(e)
+            raise
 
         ## Return Info
         txn_inputs.update({
             'sell_quantity': sell_quantity,
             'min_buy_quantity': min_buy_quantity,
+            'path': path,
         })
         return signed_txn, txn_inputs
 
 
+    def stage_order(self, order: OrderClass, min_buy_quantity: Union[float, None] = None):
+        '''
+        Does everything place_order() does except sending, ahead of time, so that firing the order with
+        self.fire_staged_order() is a single send_raw_transaction. E.g. for an order on a pair that is about to list.
+
+        The swap is signed once per rung of a gas price ladder (self.staged_order_gas_price_multipliers times the gas
+        oracle's current price). Every rung has the same nonce, so only one of them can ever be mined.
+        The nonce is reserved now, so a staged order that won't be fired must be cancelled with self.cancel_staged_order().
+
+        Parameters
+        ----------
+        min_buy_quantity : float
+            The least buy tokens to accept. If given, no quote is made. Needed for a market order (price_in_sell of None)
+            on a pool that has no liquidity yet (or isn't deployed yet), as there is nothing to quote it from.
+            Such an order must also give quantity_to_sell, for the same reason.
+
+        Returns the staged order: {'order', 'pool_address', 'nonce', 'txn_info', 'signed_txns': [(gas_price, signed_txn), ...], 'fired'}
+        '''
+        self.logger.info(f'Staging order: {order}.')
+
+        ## Check for Shit Order
+        if order['order_type'] != 'spot':
+            error = f'Only spot orders can be placed on PancakeSwapV2. Order: {order}.'
+            self.logger.critical(error)  # critical because my code is shit
+            raise Exception(error)
+
+        ## Get Contract Addresses
+        buy_token_contract_address  = self.CommsBlockchainDataProviders.get_contract_address(symbol=order['buy_symbol'],  token_name=order['notes'].get('buy_token_name', None),  blockchain_name=self.blockchain_name, blockchain_net=self.blockchain_net, save=True, override=False)
+        sell_token_contract_address = self.CommsBlockchainDataProviders.get_contract_address(symbol=order['sell_symbol'], token_name=order['notes'].get('sell_token_name', None), blockchain_name=self.blockchain_name, blockchain_net=self.blockchain_net, save=True, override=False)
+        pool_address = self.get_pool_address(buy_token_contract_address, sell_token_contract_address, check_exists=False)  # the pool may not be created yet
+        pool_contract = self.get_pool_contract(pool_address)
+
+        ## Read the Pool, only if a Quantity must be Quoted from it
+        sell_quantity = order['quantity_to_sell']
+        raw_reserves = None
+        if (sell_quantity == 0) or ((min_buy_quantity is None) and (order['price_in_sell'] is None)):
+            pool = self.get_raw_reserves_many([pool_contract]).get(pool_address)  # None if the pool isn't deployed
+            if (pool is None) or (min(pool['reserves'].values()) <= 0):
+                error = f'Cannot stage a market order, or one given by quantity_to_buy, on a pool with no liquidity without a quantity_to_sell and min_buy_quantity. Pool: {pool_address}. Order: {order}.'
+                self.logger.critical(error)
+                raise Exception(error)
+            raw_reserves = pool['reserves']
+
+        ## Get Quantities
+        if sell_quantity == 0:  # buy_quantity is specified instead
+            sell_quantity = self.get_sell_amount(
+                pool_contract=pool_contract, slippage=order['slippage'], buy_amount=order['quantity_to_buy'],
+                buy_token_contract_address=buy_token_contract_address,
+                sell_token_contract_address=sell_token_contract_address,
+                raw_reserves=raw_reserves
+            )
+        if min_buy_quantity is None:
+            if order['price_in_sell'] is None:
+                min_buy_quantity = self.get_buy_amount(
+                    pool_contract=pool_contract, slippage=order['slippage'], sell_amount=sell_quantity,
+                    buy_token_contract_address=buy_token_contract_address,
+                    sell_token_contract_address=sell_token_contract_address,
+                    raw_reserves=raw_reserves
+                )
+            else:
+                min_buy_quantity = sell_quantity / order['price_in_sell']
+        if min_buy_quantity <= 0:
+            error = f'Staged order would accept no buy tokens. Min buy quantity: {min_buy_quantity}. Pool: {pool_address}. Order: {order}.'
+            self.logger.critical(error)
+            raise Exception(error)
+
+        ## Sign one Transaction per Gas Price
+        base_gas_price = self.get_gas_price(strategy_name='oracle')
+        nonce = self.get_nonce()  # reserved last, and given back if any rung fails to sign
+        signed_txns = []
+        try:
+            for multiplier in self.staged_order_gas_price_multipliers:
+                signed_txn, txn_info = self.create_swap_txn(
+                    pool_contract=pool_contract,
+                    buy_token_contract_address=buy_token_contract_address,
+                    sell_token_contract_address=sell_token_contract_address,
+                    sell_quantity=sell_quantity,
+                    min_buy_quantity=min_buy_quantity,
+                    nonce=nonce,
+                    gas_price=int(base_gas_price * multiplier),
+                    deadline_minutes=self.staged_order_deadline_minutes,
+                    path=[sell_token_contract_address, buy_token_contract_address]  # the direct pool it was quoted on, which may not be listed yet
+                )
+                signed_txns.append((txn_info['gasPrice'], signed_txn))
+        except Exception as e:
+            self.NonceManager.resync_after_error(e)
+            raise
+
+        return {
+            'order': order,
+            'pool_address': pool_address,
+            'nonce': nonce,
+            'txn_info': txn_info,
+            'signed_txns': signed_txns,  # cheapest first
+            'fired': False,
+        }
+
+
+    def fire_staged_order(self, staged_order: dict, gas_price: Union[int, None] = None):
+        '''
+        Sends one of the staged order's pre-signed transactions: the cheapest one paying at least `gas_price`,
+        which defaults to the gas oracle's current price (read locally). If none pay enough, the most expensive is sent.
+        '''
+        if staged_order['fired']:
+            error = f'Staged order has already been fired. Staged order: {staged_order}.'
+            self.logger.critical(error)
+            raise Exception(error)
+        gas_price = self.get_gas_price(strategy_name='oracle') if gas_price is None else gas_price
+        chosen_gas_price, signed_txn = next(
+            ((txn_gas_price, signed_txn) for txn_gas_price, signed_txn in staged_order['signed_txns'] if txn_gas_price >= gas_price),
+            staged_order['signed_txns'][-1]
+        )
+
+        ## Send Transaction to Blockchain (place order)
+        try:
+            txn_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as e:
+            self.NonceManager.resync_after_error(e)
+            raise
+        staged_order['fired'] = True
+
+        ## Record Order and Return Transaction Info
+        txn_info = dict(staged_order['txn_info'], gasPrice=chosen_gas_price, txn_hash=txn_hash)
+        self.logger.info(f'Staged transaction sent to blockchain: {txn_info}.')
+        return txn_info
+
+
+    def cancel_staged_order(self, staged_order: dict):
+        ''' Gives up a staged order that won't be fired, so its reserved nonce doesn't block later transactions. '''
+        if not staged_order['fired']:
+            staged_order['fired'] = True  # so it can't be fired after its nonce is handed out again
+            self.NonceManager.resync_after_error(f'Staged order cancelled. Nonce: {staged_order["nonce"]}.')
+        return staged_order
+
+
     def place_order(self, order: OrderClass):
         ## Record Order Placement Attempt
         self.logger.info(f'Placing order: {order}.')
@@ -366,13 +953,14 @@ class CommsDEXPancakeSwapV2(CommsBlockchainBSC):
         ## Get Contract Addresses
         buy_token_contract_address  = self.CommsBlockchainDataProviders.get_contract_address(symbol=buy_symbol,  token_name=buy_token_name,  blockchain_name=self.blockchain_name, blockchain_net=self.blockchain_net, save=True, override=False)
         sell_token_contract_address = self.CommsBlockchainDataProviders.get_contract_address(symbol=sell_symbol, token_name=sell_token_name, blockchain_name=self.blockchain_name, blockchain_net=self.blockchain_net, save=True, override=False)
-        pool_contract = self.get_pool_contract(self.get_pool_address(buy_token_contract_address, sell_token_contract_address))
+        pool_contract = self.get_pool_contract(self.get_pool_address(buy_token_contract_address, sell_token_contract_address, check_exists=False))  # if the pool doesn't exist, the swap reverts
 
         ## Convert Quantity if necessary
         if sell_quantity == 0:  # if True, sell_quantity is non-zero
-            sell_quantity = self.contract_router.functions.getAmountsIn(
-                (buy_quantity * slippage),  # THIS MAY HAVE TO BE AN INT  # amount_out, aka amount of tokens to receive after swap
-                [sell_token_contract_address, buy_token_contract_address]  # [{sell_token}, {buy_token}] in example: https://github.com/manuelhb14/cake_uni_transaction_bot/
+            sell_quantity = self.get_sell_amount(
+                pool_contract=pool_contract, slippage=slippage, buy_amount=buy_quantity,
+                buy_token_contract_address=buy_token_contract_address,
+                sell_token_contract_address=sell_token_contract_address
             )
         # else buy_quantity must equal zero, and sell_quantity is specified
 
@@ -387,7 +975,11 @@ class CommsDEXPancakeSwapV2(CommsBlockchainBSC):
         )
 
         ## Send Transaction to Blockchain (place order)
-        txn_hash = self.w3.eth.sendRawTransaction(signed_txn.rawTransaction)
+        try:
+            txn_hash = self.w3.eth.sendRawTransaction(signed_txn.rawTransaction)
+        except Exception as e:
+            self.NonceManager.resync_after_error(e)
+            raise
 
         ## Record Order and Return Transaction Info
         self.logger.info(f'Transaction sent to blockchain: {txn_info}.')
@@ -0,0 +1,497 @@
+## Internal Modules
+from scripts.comms_dex_pancakeswapv2 import CommsDEXPancakeSwapV2
+from scripts.order_class import OrderClass
+from scripts.node_pool import AsyncNodePoolProvider
+from scripts.http_sessions import close_async_session
+
+## External Libraries
+from typing import Union, List
+import asyncio
+import functools
+import json
+import math
+from datetime import datetime, timedelta, timezone
+from web3 import Web3
+from web3.eth import AsyncEth
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from eth_utils import event_abi_to_log_topic
+
+
+class AsyncCommsDEXPancakeSwapV2():
+    '''
+    Asyncio version of CommsDEXPancakeSwapV2, so that one event loop can run hundreds of chain reads concurrently
+    instead of one RPC at a time per process.
+
+    Every method that talks to the blockchain is a coroutine with the same name and arguments as in CommsDEXPancakeSwapV2.
+    Everything that does not need the blockchain (config, addresses, contract objects used to encode and decode calls,
+    the block timestamp index, transaction signing) is done by the sync instance in self.CommsDEXPancakeSwapV2.
+    The few sync calls that can block on the network (BscScan / data provider lookups, the first nonce sync,
+    waiting for the gas oracle's first quote) are run in a worker thread by self._run_sync(), never on the event loop.
+
+    Methods
+    -------
+    close
+    call
+    get_latest_block_number
+    get_pool_address
+    get_token_addresses_from_pool
+    get_reserves
+    get_current_price
+    get_logs
+    get_block_timestamps
+    get_historical_trades_many
+    get_historical_trades
+    get_token_decimals
+    get_raw_reserves
+    get_sell_amount
+    get_buy_amount
+    find_best_route
+    create_swap_txn
+    place_order
+
+    Attributes
+    ----------
+    self.CommsDEXPancakeSwapV2
+    self.logger
+    self.w3  (async web3 object, only has the AsyncEth module; requests are routed by the sync instance's NodePool)
+    self.max_concurrent_requests
+    '''
+
+    def __init__(self, blockchain_net: str):
+        self.CommsDEXPancakeSwapV2 = CommsDEXPancakeSwapV2(blockchain_net=blockchain_net)
+        self.logger = self.CommsDEXPancakeSwapV2.logger
+        with open(self.CommsDEXPancakeSwapV2.DataLoc.File.CONFIG.value) as json_file:
+            config = json.load(json_file)['CommsBlockchainBSC']
+            self.max_concurrent_requests = config['async_max_concurrent_requests']
+        self.w3 = Web3(AsyncNodePoolProvider(self.CommsDEXPancakeSwapV2.NodePool), modules={'eth': (AsyncEth,)}, middlewares=[])
+        self.semaphore = None  # made on first request, so it belongs to the running event loop
+        self.chain_id = None
+        return
+
+
+    async def _request(self, awaitable):
+        ''' Awaits an RPC, with at most self.max_concurrent_requests in flight at once. '''
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        async with self.semaphore:
+            return await awaitable
+
+
+    async def _run_sync(self, function, *args, **kwargs):
+        ''' Runs a blocking call of the sync instance in the default thread pool, so the event loop isn't stalled. '''
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(function, *args, **kwargs))
+
+
+    async def close(self):
+        ''' Closes the event loop's shared HTTP session. Await before the event loop ends. '''
+        await close_async_session()
+        self.semaphore = None
+
+
+    async def call(self, contract_function, block_identifier: Union[str, int] = 'latest'):
+        '''
+        Async version of contract_function.call().
+
+        Parameters
+        ----------
+        contract_function
+            Made from a sync contract object, e.g. pool_contract.functions.getReserves()
+        '''
+        result = await self._request(self.w3.eth.call(
+            {'to': contract_function.address, 'data': contract_function._encode_transaction_data()},
+            block_identifier
+        ))
+        output_types = get_abi_output_types(contract_function.abi)
+        output = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, self.w3.codec.decode_abi(output_types, result))
+        return output[0] if len(output) == 1 else output
+
+
+    async def get_latest_block_number(self):
+        return await self._request(self.w3.eth.block_number)
+
+
+    async def get_pool_address(self, token_contract_address_a: str, token_contract_address_one: str, check_exists: bool = True):
+        ''' See CommsDEXPancakeSwapV2.get_pool_address(). Shares the sync instance's set of pools confirmed to exist. '''
+        comms = self.CommsDEXPancakeSwapV2
+        pool_address = comms.get_pool_address(token_contract_address_a, token_contract_address_one, check_exists=False)
+        if check_exists and (pool_address not in comms.existing_pools):
+            if len(await self._request(self.w3.eth.get_code(pool_address))) == 0:
+                self.logger.info(f'No PancakeSwapV2 pool exists for these addresses: [{token_contract_address_a}, {token_contract_address_one}].')
+                return None
+            comms.existing_pools.add(pool_address)
+        return pool_address
+
+
+    async def get_token_addresses_from_pool(self, pool_contract):
+        ''' Returns (token0_address, token1_address), sharing the sync instance's per pool cache. '''
+        pool_tokens = self.CommsDEXPancakeSwapV2.pool_tokens
+        if pool_contract.address not in pool_tokens:
+            pool_tokens[pool_contract.address] = tuple(await asyncio.gather(
+                self.call(pool_contract.functions.token0()),
+                self.call(pool_contract.functions.token1()),
+            ))
+        return pool_tokens[pool_contract.address]
+
+
+    async def get_reserves(self, pool_contract):
+        '''
+        Returns the amount of token_a and token_b that make up the liquidity pool.
+        '''
+        decimals, reserves, (token0_address, token1_address) = await asyncio.gather(
+            self.call(pool_contract.functions.decimals()),
+            self.call(pool_contract.functions.getReserves()),
+            self.get_token_addresses_from_pool(pool_contract),
+        )
+        decimals = 10 ** decimals
+        return {
+            token0_address: (reserves[0] / decimals),
+            token1_address: (reserves[1] / decimals),
+        }
+
+
+    async def get_current_price(self, buy_token_contract_address: str, sell_token_contract_address: str):
+        ''' See CommsDEXPancakeSwapV2.get_current_price(). '''
+        pool_address = await self.get_pool_address(buy_token_contract_address, sell_token_contract_address)
+        reserves = await self.get_reserves(self.CommsDEXPancakeSwapV2.get_pool_contract(pool_address=pool_address))
+        return reserves[sell_token_contract_address] / reserves[buy_token_contract_address]
+
+
+    async def get_logs(self, filter_params: dict, from_block: int, to_block: int) -> list:
+        '''
+        Async version of LogScanner.get_logs(), handling errors the same way:
+            - a chunk that fails with a range / timeout type error is halved, and both halves are fetched.
+            - a chunk that fails with any other error, including rate limiting, is retried whole after an exponential
+              backoff, up to the LogScanner's max_retries.
+            - a chunk that ends past the latest block is retried after the backoff, rather than trusted to be [].
+        At most requests_per_node chunks per configured node are in-flight at once.
+        '''
+        log_scanner = self.CommsDEXPancakeSwapV2.LogScanner
+        semaphore = asyncio.Semaphore(log_scanner.requests_per_node * len(log_scanner.nodes))
+        head = {'block_number': -1}  # latest block number known to be on the nodes
+
+        async def get_chunk(start: int, end: int, attempt: int = 0) -> list:
+            try:
+                async with semaphore:
+                    ## Check the Nodes have every Block in the Range, else they answer [] for the ones they don't have
+                    if end > head['block_number']:
+                        head['block_number'] = max(head['block_number'], await self.get_latest_block_number())
+                        if end > head['block_number']:
+                            raise Exception(f'Node head {head["block_number"]} is below block {end}.')
+                    return await self._request(self.w3.eth.get_logs(dict(filter_params, fromBlock=start, toBlock=end)))
+            except Exception as e:
+                if (isinstance(e, asyncio.TimeoutError) or log_scanner.is_range_error(e)) and (end > start):
+                    mid = (start + end) // 2
+                    self.logger.debug(f'Halving eth_getLogs block range after error. Blocks: {start}-{end}. Error: {e}.')
+                    halves = await asyncio.gather(get_chunk(start, mid), get_chunk(mid + 1, end))
+                    return halves[0] + halves[1]
+                if attempt >= log_scanner.max_retries:
+                    self.logger.critical(f'eth_getLogs failed after {log_scanner.max_retries} retries. Blocks: {start}-{end}. Filter: {filter_params}. Error: {e}.')
+                    raise
+                backoff_seconds = log_scanner.retry_backoff_seconds * (2 ** attempt)
+                self.logger.debug(f'Retrying eth_getLogs block range after error, in {backoff_seconds}s. Blocks: {start}-{end}. Attempt: {attempt + 1}. Error: {e}.')
+                await asyncio.sleep(backoff_seconds)
+                return await get_chunk(start, end, attempt + 1)
+
+        chunk_blocks = log_scanner.initial_chunk_blocks
+        chunks = await asyncio.gather(*[
+            get_chunk(start, min(start + chunk_blocks - 1, to_block))
+            for start in range(from_block, to_block + 1, chunk_blocks)
+        ])
+        logs = [log for chunk in chunks for log in chunk]
+        logs.sort(key=lambda log: (log['blockNumber'], log['logIndex']))
+        return logs
+
+
+    async def get_block_timestamps(self, block_numbers: list) -> dict:
+        ''' Async version of CommsBlockchainBSC.get_block_timestamps(); missing block headers are downloaded concurrently. '''
+        index = self.CommsDEXPancakeSwapV2.BlockTimestampIndex.refresh()
+        missing_block_numbers = index.missing(block_numbers)
+        if missing_block_numbers:
+            blocks = await asyncio.gather(*[self._request(self.w3.eth.get_block(block_number)) for block_number in missing_block_numbers])
+            index.add({block_number: block['timestamp'] for block_number, block in zip(missing_block_numbers, blocks)})
+        return {block_number: index.timestamp_by_block[block_number] for block_number in block_numbers}
+
+
+    async def get_historical_trades_many(
+        self, pairs: List[tuple],
+        start: Union[datetime, None] = None, end: Union[datetime, None] = None,
+        start_block: Union[int, None] = None, end_block: Union[int, None] = None
+    ) -> dict:
+        '''
+        Async version of CommsDEXPancakeSwapV2.get_historical_trades_many(), with the same output.
+            - Swap direction is always decoded from the Swap event args (no receipts), so "gas_used" is recorded as None.
+            - The transactions and block headers of all swaps are downloaded concurrently.
+        '''
+        comms = self.CommsDEXPancakeSwapV2
+
+        ## Get Contract Addresses and Objects
+        pools = {}  # {pool_address: pool info}
+        for symbol_1, symbol_2 in pairs:
+            symbol_1_address, symbol_2_address = await asyncio.gather(
+                self._run_sync(comms.get_token_address, symbol=symbol_1),
+                self._run_sync(comms.get_token_address, symbol=symbol_2),
+            )
+            pool_address = await self.get_pool_address(symbol_1_address, symbol_2_address)
+            pool_contract = comms.get_pool_contract(pool_address=pool_address)
+            decimals, token_addresses = await asyncio.gather(
+                self.call(pool_contract.functions.decimals()),
+                self.get_token_addresses_from_pool(pool_contract),
+            )
+            pools[pool_address] = {
+                'pair': (symbol_1, symbol_2),
+                'symbols': {symbol_1_address: symbol_1, symbol_2_address: symbol_2},
+                'decimals': decimals,
+                'token_addresses': token_addresses,
+            }
+
+        ## Get all Swap Events from Pool Contracts between datetimes
+        from_block = await self._run_sync(comms.get_block_number_by_datetime, dt=start, closest='before') if start_block is None else start_block
+        to_block = await self._run_sync(comms.get_block_number_by_datetime, dt=end, closest='after') if end_block is None else end_block
+        swap_event_decoder = comms.get_pool_contract(pool_address=list(pools)[0]).events.Swap()
+        raw_swap_logs = await self.get_logs(
+            filter_params={'address': list(pools), 'topics': [Web3.toHex(event_abi_to_log_topic(swap_event_decoder.abi))]},
+            from_block=from_block, to_block=to_block
+        )
+        swap_logs = {pool_address: {} for pool_address in pools}
+        for log in raw_swap_logs:
+            swap_log = swap_event_decoder.processLog(log)
+            swap_logs[swap_log.address][swap_log.transactionHash] = swap_log
+
+        ## Download the Transaction of each Swap Event, and the Timestamp of each Block
+        txn_hashes = list({txn_hash for pool_swap_logs in swap_logs.values() for txn_hash in pool_swap_logs})
+        block_numbers = list({swap_log.blockNumber for pool_swap_logs in swap_logs.values() for swap_log in pool_swap_logs.values()})
+        txns, block_timestamps = await asyncio.gather(
+            asyncio.gather(*[self._request(self.w3.eth.get_transaction(txn_hash)) for txn_hash in txn_hashes]),
+            self.get_block_timestamps(block_numbers),
+        )
+        txns = dict(zip(txn_hashes, txns))
+
+        ## Parse each Swap Event
+        all_output_data = {}
+        for pool_address, pool in pools.items():
+            output_data = {}
+            for txn_hash, swap_log in swap_logs[pool_address].items():
+                buy_address, sell_address, amount_in, amount_out = comms.decode_swap_direction(swap_log.args, *pool['token_addresses'])
+                output_data[txn_hash.hex()] = {
+                    'block_number': swap_log.blockNumber,
+                    'txn_index': swap_log.transactionIndex,
+                    'block_datetime': datetime.fromtimestamp(block_timestamps[swap_log.blockNumber], tz=timezone.utc),
+                    'buy_symbol': pool['symbols'].get(buy_address, None),
+                    'sell_symbol': pool['symbols'].get(sell_address, None),
+                    'buy_amount': comms.from_dex_number(amount_out, decimals=pool['decimals']),
+                    'sell_amount': comms.from_dex_number(amount_in, decimals=pool['decimals']),
+                    'gas_used': None,
+                    'gas_price': txns[txn_hash]['gasPrice'],
+                }
+            all_output_data[pool['pair']] = output_data
+        return all_output_data
+
+
+    async def get_historical_trades(
+        self, symbol_1: str, symbol_2: str,
+        start: Union[datetime, None] = None, end: Union[datetime, None] = None,
+        start_block: Union[int, None] = None, end_block: Union[int, None] = None
+    ):
+        ''' Single pair version of self.get_historical_trades_many(). '''
+        all_output_data = await self.get_historical_trades_many(
+            pairs=[(symbol_1, symbol_2)],
+            start=start, end=end, start_block=start_block, end_block=end_block
+        )
+        return all_output_data[(symbol_1, symbol_2)]
+
+
+    async def get_token_decimals(self, token_address: str) -> int:
+        ''' Shares the sync instance's per token cache. '''
+        token_decimals = self.CommsDEXPancakeSwapV2.token_decimals
+        if token_address not in token_decimals:
+            token_decimals[token_address] = await self.call(self.CommsDEXPancakeSwapV2.get_pool_contract(pool_address=token_address).functions.decimals())
+        return token_decimals[token_address]
+
+
+    async def get_raw_reserves(self, pool_contract) -> dict:
+        ''' Returns the pool's {token_address: reserve} in integer token units. '''
+        reserves, (token0_address, token1_address) = await asyncio.gather(
+            self.call(pool_contract.functions.getReserves()),
+            self.get_token_addresses_from_pool(pool_contract),
+        )
+        return {token0_address: reserves[0], token1_address: reserves[1]}
+
+
+    async def get_sell_amount(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, slippage: float, buy_amount: float = 0):
+        ''' See CommsDEXPancakeSwapV2.get_sell_amount(). '''
+        comms = self.CommsDEXPancakeSwapV2
+        raw_reserves, buy_decimals, sell_decimals = await asyncio.gather(
+            self.get_raw_reserves(pool_contract),
+            self.get_token_decimals(buy_token_contract_address),
+            self.get_token_decimals(sell_token_contract_address),
+        )
+        slippage_adjusted_buy_amount = buy_amount * (1 + slippage)  # adding (+) slippage because more input is needed to account for slippage
+        sell_amount = comms.AMM.get_amount_in(
+            comms.to_dex_number(slippage_adjusted_buy_amount, decimals=buy_decimals),
+            reserve_in=raw_reserves[sell_token_contract_address], reserve_out=raw_reserves[buy_token_contract_address]
+        )
+        return comms.from_dex_number(sell_amount, decimals=sell_decimals)
+
+
+    async def get_buy_amount(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, slippage: float = 0.02, sell_amount: float = 0):
+        ''' See CommsDEXPancakeSwapV2.get_buy_amount(). '''
+        comms = self.CommsDEXPancakeSwapV2
+        raw_reserves, buy_decimals, sell_decimals = await asyncio.gather(
+            self.get_raw_reserves(pool_contract),
+            self.get_token_decimals(buy_token_contract_address),
+            self.get_token_decimals(sell_token_contract_address),
+        )
+        slippage_adjusted_sell_amount = sell_amount * (1 - slippage)  # subtracting (-) slippage because expecting less output is needed to account for slippage
+        buy_amount = comms.AMM.get_amount_out(
+            comms.to_dex_number(slippage_adjusted_sell_amount, decimals=sell_decimals),
+            reserve_in=raw_reserves[sell_token_contract_address], reserve_out=raw_reserves[buy_token_contract_address]
+        )
+        return comms.from_dex_number(buy_amount, decimals=buy_decimals)
+
+
+    async def find_best_route(self, buy_token_contract_address: str, sell_token_contract_address: str, sell_quantity: float) -> Union[dict, None]:
+        '''
+        See CommsDEXPancakeSwapV2.find_best_route(). The candidate pools' reserves are read concurrently, into the
+        sync instance's RouteFinder. A candidate pool that hasn't been deployed has no data to decode, so its read fails and it is left out.
+        '''
+        comms = self.CommsDEXPancakeSwapV2
+        buy_token_contract_address, sell_token_contract_address = Web3.toChecksumAddress(buy_token_contract_address), Web3.toChecksumAddress(sell_token_contract_address)
+        pool_addresses = comms.get_route_pools([sell_token_contract_address, buy_token_contract_address])
+        *raw_reserves, sell_decimals = await asyncio.gather(
+            *[self.get_raw_reserves(comms.get_pool_contract(pool_address)) for pool_address in pool_addresses],
+            self.get_token_decimals(sell_token_contract_address),
+            return_exceptions=True
+        )
+        if isinstance(sell_decimals, Exception):
+            raise sell_decimals
+        raw_reserves = {
+            pool_address: reserves for pool_address, reserves in zip(pool_addresses, raw_reserves)
+            if not isinstance(reserves, Exception)
+        }
+        comms.RouteFinder.update_reserves(raw_reserves)
+        return comms.RouteFinder.find_best_route(
+            comms.to_dex_number(sell_quantity, decimals=sell_decimals),
+            token_in=sell_token_contract_address, token_out=buy_token_contract_address,
+            pool_addresses=set(raw_reserves)  # only the pools just read, not ones left in the graph by earlier orders
+        )
+
+
+    async def create_swap_txn(self, pool_contract, buy_token_contract_address: str, sell_token_contract_address: str, sell_quantity: float, price_in_sell: Union[float, None] = None, slippage : Union[float, None] = None):
+        '''
+        See CommsDEXPancakeSwapV2.create_swap_txn(). The route, decimals and chain id are fetched concurrently,
+        and every transaction field is given to buildTransaction so that it makes no RPC calls of its own.
+        The nonce and gas price come from the sync instance's local NonceManager and GasOracle.
+        '''
+        comms = self.CommsDEXPancakeSwapV2
+        if self.chain_id is None:
+            self.chain_id = await self._request(self.w3.eth.chain_id)
+
+        ## Get Data
+        route, buy_decimals, sell_decimals = await asyncio.gather(
+            self.find_best_route(buy_token_contract_address, sell_token_contract_address, sell_quantity=sell_quantity),
+            self.get_token_decimals(buy_token_contract_address),
+            self.get_token_decimals(sell_token_contract_address),
+        )
+        path = [sell_token_contract_address, buy_token_contract_address] if route is None else route['path']  # with no liquidity on any path, the direct pool is used
+
+        ## Market Order
+        if price_in_sell is None:  # use slippage from market price, along the route
+            if route is None:
+                error = f'Cannot quote a market order with no liquidity on any route. Path: {path}.'
+                self.logger.critical(error)
+                raise Exception(error)
+            slippage_adjusted_sell_amount = sell_quantity * (1 - slippage)  # subtracting (-) slippage because expecting less output is needed to account for slippage
+            buy_amount = comms.RouteFinder.quote(comms.to_dex_number(slippage_adjusted_sell_amount, decimals=sell_decimals), route['path'])[-1]
+            min_buy_quantity = comms.from_dex_number(buy_amount, decimals=buy_decimals)
+        ## Limit Order
+        else:
+            min_buy_quantity = sell_quantity / price_in_sell  # see sync version for why this ignores pool reserves
+
+        decimal_sell_quantity = comms.to_dex_number(sell_quantity, decimals=sell_decimals)
+        decimal_min_buy_quantity = comms.to_dex_number(min_buy_quantity, decimals=buy_decimals)
+        gas_price = await self._run_sync(comms.get_gas_price, strategy_name='oracle')  # only the first call waits, for the oracle's first quote
+
+        ## Reserve Nonce, last, so that a failure above can't burn it
+        nonce = await self._run_sync(comms.get_nonce)  # only the first call syncs from the chain
+        try:
+            ## Create Transaction Inputs
+            txn_inputs = {
+                'from'      : comms.address_wallet,
+                'value'     : decimal_sell_quantity,
+                'gas'       : 250000,  # 250000 looks to be much larger than any DEX uses on average
+                'gasPrice'  : gas_price,  # stated in Wei
+                'nonce'     : nonce,
+                'chainId'   : self.chain_id,
+            }
+
+            ## Create and Sign Swap Transaction
+            txn = comms.contract_router.functions.swapExactTokensForTokens(
+                decimal_sell_quantity,       # amount of sell token to sell
+                decimal_min_buy_quantity,    # min amount of buy token to receive
+                path,
+                comms.address_wallet,
+                math.floor((datetime.utcnow() + timedelta(minutes=5)).timestamp()),
+            ).buildTransaction(txn_inputs)
+            signed_txn = comms.w3.eth.account.sign_transaction(txn, comms.private_key)
+        except Exception as e:
+            comms.NonceManager.resync_after_error(e)
+            raise
+
+        ## Return Info
+        txn_inputs.update({
+            'sell_quantity': sell_quantity,
+            'min_buy_quantity': min_buy_quantity,
+            'path': path,
+        })
+        return signed_txn, txn_inputs
+
+
+    async def place_order(self, order: OrderClass):
+        ''' See CommsDEXPancakeSwapV2.place_order(). '''
+        comms = self.CommsDEXPancakeSwapV2
+        self.logger.info(f'Placing order: {order}.')
+
+        ## Check for Shit Order
+        if order['order_type'] != 'spot':
+            error = f'Only spot orders can be placed on PancakeSwapV2. Order: {order}.'
+            self.logger.critical(error)  # critical because my code is shit
+            raise Exception(error)
+
+        ## Get Contract Addresses
+        buy_token_contract_address, sell_token_contract_address = await asyncio.gather(
+            self._run_sync(comms.CommsBlockchainDataProviders.get_contract_address, symbol=order['buy_symbol'],  token_name=order['notes'].get('buy_token_name', None),  blockchain_name=comms.blockchain_name, blockchain_net=comms.blockchain_net, save=True, override=False),
+            self._run_sync(comms.CommsBlockchainDataProviders.get_contract_address, symbol=order['sell_symbol'], token_name=order['notes'].get('sell_token_name', None), blockchain_name=comms.blockchain_name, blockchain_net=comms.blockchain_net, save=True, override=False),
+        )
+        pool_contract = comms.get_pool_contract(await self.get_pool_address(buy_token_contract_address, sell_token_contract_address, check_exists=False))  # if the pool doesn't exist, the swap reverts
+
+        ## Convert Quantity if necessary
+        sell_quantity = order['quantity_to_sell']
+        if sell_quantity == 0:  # buy_quantity is specified instead
+            sell_quantity = await self.get_sell_amount(
+                pool_contract=pool_contract, slippage=order['slippage'], buy_amount=order['quantity_to_buy'],
+                buy_token_contract_address=buy_token_contract_address,
+                sell_token_contract_address=sell_token_contract_address
+            )
+
+        ## Create Signed Transaction
+        signed_txn, txn_info = await self.create_swap_txn(
+            pool_contract=pool_contract,
+            buy_token_contract_address=buy_token_contract_address,
+            sell_token_contract_address=sell_token_contract_address,
+            sell_quantity=sell_quantity,
+            price_in_sell=order['price_in_sell'],
+            slippage=order['slippage']
+        )
+
+        ## Send Transaction to Blockchain (place order)
+        try:
+            txn_hash = await self._request(self.w3.eth.send_raw_transaction(signed_txn.rawTransaction))
+        except Exception as e:
+            comms.NonceManager.resync_after_error(e)
+            raise
+
+        ## Record Order and Return Transaction Info
+        self.logger.info(f'Transaction sent to blockchain: {txn_info}.')
+        txn_info.update({'txn_hash': txn_hash})
+        return txn_info
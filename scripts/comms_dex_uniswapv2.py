@@ -2,6 +2,7 @@
 from scripts.utils import DataLoc, MyLogger, handle_ccxt_error, get_token_address
 from scripts.comms_blockchain_data_providers import CommsBlockchainDataProviders
 from scripts.order_class import OrderClass
+from scripts.http_sessions import get_session
 
 ## External Libraries
 from typing import Union
@@ -69,7 +70,7 @@ class CommsDEXUniSwapV2():
 
     def connect(self, infura_project_id: str = None):
         for node in self.nodes:
-            w3 = Web3(Web3.HTTPProvider(f'{node}/{infura_project_id}'))
+            w3 = Web3(Web3.HTTPProvider(f'{node}/{infura_project_id}', session=get_session()))
             # w3.middleware_onion.inject(geth_poa_middleware, layer=0)
             is_connected = w3.isConnected()
             if is_connected is True:
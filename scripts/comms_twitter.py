@@ -1,11 +1,11 @@
 ## Internal Modules
 from scripts.utils import DataLoc, MyLogger, catch_and_log_exception
+from scripts.http_sessions import get_session
 
 ## External Libraries
 from threading import TIMEOUT_MAX
 from typing import Union
 from pandas.core.frame import DataFrame
-import requests
 import json
 import multiprocessing  # used for multiprocessing Processes, Queues, the Manager
 import queue  # used for Exception: queue.Empty
@@ -82,9 +82,9 @@ class CommsTwitter():
             if self.request_counter % 10 == 0:
                 print(f'Request counter: {self.request_counter}')
             if type == 'get':
-                response = requests.get(url, auth=self.bearer_oauth, headers=headers, params=payload, stream=stream)
+                response = get_session().get(url, auth=self.bearer_oauth, headers=headers, params=payload, stream=stream)
             elif type == 'post':
-                response = requests.post(url, auth=self.bearer_oauth, headers=headers, json=payload)
+                response = get_session().post(url, auth=self.bearer_oauth, headers=headers, json=payload)
             if response.status_code in [200, 201]:
                 break
             else:
@@ -0,0 +1,88 @@
+## Internal Modules
+from scripts.utils import DataLoc
+
+## External Libraries
+from typing import Union
+import json
+import threading
+from web3 import Web3
+
+
+class ContractRegistry():
+    '''
+    Process-wide cache of ABIs and contract objects, shared by every comms class.
+        - abi.json is parsed once per process.
+        - one contract factory is built per (w3, abi), and one contract object per (w3, abi, address).
+
+    Everything is stored on the class, so there is nothing to instantiate: use ContractRegistry.get_contract(...).
+
+    Methods
+    -------
+    load_abi_file
+    get_abi
+    get_contract
+    '''
+
+    lock = threading.RLock()
+    abi_files = {}           # {fileloc: parsed abi file}
+    contract_factories = {}  # {(id(w3), abi_key): (w3, contract factory)}; w3 is kept so its id is never reused
+    contracts = {}           # {(id(w3), abi_key, address): contract object}
+
+
+    @classmethod
+    def load_abi_file(cls, fileloc: Union[str, None] = None) -> dict:
+        ''' Returns the parsed abi file. Defaults to config/abi.json. '''
+        fileloc = DataLoc().File.ABI.value if fileloc is None else fileloc
+        try:
+            return cls.abi_files[fileloc]
+        except KeyError:
+            with cls.lock:
+                if fileloc not in cls.abi_files:
+                    with open(fileloc) as json_file:
+                        cls.abi_files[fileloc] = json.load(json_file)
+            return cls.abi_files[fileloc]
+
+
+    @classmethod
+    def get_abi(cls, abi_path: tuple, fileloc: Union[str, None] = None) -> list:
+        '''
+        Parameters
+        ----------
+        abi_path : tuple
+            The keys to the abi in the abi file. E.g. ('binance_smart_chain', 'mainnet', 'pancakeswapv2', 'pair')
+        '''
+        abi = cls.load_abi_file(fileloc)
+        for key in abi_path:
+            abi = abi[key]
+        return abi
+
+
+    @classmethod
+    def get_contract(cls, w3, address: str, abi_path: Union[tuple, None] = None, abi: Union[list, None] = None, abi_key=None):
+        '''
+        Returns the cached contract object for the address, building it the first time.
+
+        Parameters
+        ----------
+        abi_path : tuple
+            Where the abi is in abi.json (see ContractRegistry.get_abi()).
+        abi / abi_key
+            For abis that are not in abi.json (e.g. downloaded from BscScan), give the abi itself,
+            plus a hashable key that identifies it. Defaults to keying on the address.
+        '''
+        address = Web3.toChecksumAddress(address)
+        if abi_key is None:
+            abi_key = abi_path if abi_path is not None else ('address', address)
+        contract_key = (id(w3), abi_key, address)
+        try:
+            return cls.contracts[contract_key]
+        except KeyError:
+            pass
+        with cls.lock:
+            factory_key = (id(w3), abi_key)
+            if factory_key not in cls.contract_factories:
+                factory_abi = cls.get_abi(abi_path) if abi is None else abi
+                cls.contract_factories[factory_key] = (w3, w3.eth.contract(abi=factory_abi))
+            _, contract_factory = cls.contract_factories[factory_key]
+            contract = cls.contracts.setdefault(contract_key, contract_factory(address=address))
+        return contract
@@ -0,0 +1,91 @@
+## External Libraries
+from typing import Union
+import json
+from web3 import Web3
+from web3._utils.events import get_event_data
+from web3.exceptions import MismatchedABI
+from eth_utils import event_abi_to_log_topic
+
+
+class EventDecoder():
+    '''
+    Decodes raw logs with a topic0 -> event abi lookup that is built once per abi,
+    so each log is decoded exactly once, by the one event that emitted it.
+
+    Methods
+    -------
+    add_abi
+    decode_log
+    decode_logs
+
+    Attributes
+    ----------
+    self.events_by_topic  ({abi_key: {topic0 hex: event abi}})
+    '''
+
+    def __init__(self, codec, logger):
+        '''
+        Parameters
+        ----------
+        codec
+            The w3.codec of the chain's w3 object.
+        '''
+        self.codec = codec
+        self.logger = logger
+        self.events_by_topic = {}
+
+
+    def add_abi(self, abi_key, abi: Union[list, str]) -> dict:
+        ''' Builds the topic0 lookup for the abi (a list, or a json string as given by BscScan), once per abi_key (e.g. the contract address). '''
+        try:
+            return self.events_by_topic[abi_key]
+        except KeyError:
+            if isinstance(abi, str):
+                abi = json.loads(abi)
+            events_by_topic = {
+                Web3.toHex(event_abi_to_log_topic(event_abi)): event_abi
+                for event_abi in abi
+                if (event_abi['type'] == 'event') and (not event_abi.get('anonymous', False))
+            }
+            self.events_by_topic[abi_key] = events_by_topic
+            return events_by_topic
+
+
+    def decode_log(self, log: dict, abi_key, abi: Union[list, str, None] = None):
+        '''
+        Returns the decoded event (as returned by contract.events.X().processLog()),
+        or None if the log's topic0 is not an event in the abi, or its data doesn't fit the event.
+
+        Parameters
+        ----------
+        abi
+            Only needed the first time abi_key is used.
+        '''
+        events_by_topic = self.events_by_topic[abi_key] if abi is None else self.add_abi(abi_key, abi)
+        if not log['topics']:
+            return None
+        event_abi = events_by_topic.get(Web3.toHex(log['topics'][0]), None)
+        if event_abi is None:
+            return None
+        try:
+            return get_event_data(self.codec, event_abi, log)
+        except MismatchedABI as e:  # e.g. an ERC-721 Transfer matching an ERC-20 Transfer signature, but with a different number of indexed args
+            self.logger.debug(f'Log matched an event signature but could not be decoded. Event: {event_abi["name"]}. Address: {log["address"]}. Error: {e}.')
+            return None
+
+
+    def decode_logs(self, logs: list, abis: dict) -> list:
+        '''
+        Parameters
+        ----------
+        abis : dict
+            {contract address: abi}, with an abi for the address of every log.
+
+        Returns the decoded events, in log order, skipping logs that could not be decoded.
+        '''
+        decoded_logs = []
+        for log in logs:
+            decoded_log = self.decode_log(log, abi_key=log['address'], abi=abis[log['address']])
+            if decoded_log is not None:
+                decoded_logs.append(decoded_log)
+        return decoded_logs
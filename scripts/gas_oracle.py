@@ -0,0 +1,139 @@
+## External Libraries
+from typing import Union, List
+from collections import deque
+import threading
+import time
+import numpy as np
+
+
+class GasOracle():
+    '''
+    Samples the gas prices paid in recent blocks on a background thread, and keeps a quote of their percentiles,
+    so the order path can read a fresh gas price without any network call.
+
+        - each new block (as told by a NewBlockSubscriber) is downloaded once, and its transactions' gas prices
+          are kept for the last `sample_blocks` blocks. Zero gas price system transactions are ignored.
+        - the node's own eth_gasPrice is sampled too, and is the floor of every quote, as the node rejects anything lower.
+        - self.quote is replaced as a whole on each update, so readers never see a half updated quote.
+
+    Methods
+    -------
+    start
+    stop
+    update
+    get_quote
+    get_gas_price
+    get_node_gas_price
+
+    Attributes
+    ----------
+    self.quote  ({'block_number', 'updated', 'node_gas_price', 'percentiles': {percentile: gas price}})
+    '''
+
+    def __init__(
+        self, w3, logger, NewBlockSubscriber,
+        sample_blocks: int = 20, percentiles: List[int] = (25, 50, 75, 90, 99),
+        max_age_seconds: float = 15, swap_percentile: int = 90
+    ):
+        '''
+        Parameters
+        ----------
+        max_age_seconds : float
+            A quote older than this is logged as stale when read.
+        swap_percentile : int
+            The percentile used by default, e.g. by create_swap_txn. Must be in `percentiles`.
+        '''
+        self.w3 = w3
+        self.logger = logger
+        self.NewBlockSubscriber = NewBlockSubscriber
+        self.sample_blocks = sample_blocks
+        self.percentiles = percentiles
+        self.max_age_seconds = max_age_seconds
+        self.swap_percentile = swap_percentile
+        self.block_gas_prices = deque(maxlen=sample_blocks)  # (block_number, np.array of gas prices)
+        self.quote = None
+        self.first_quote_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+
+    def update(self, block_number: int):
+        ''' Samples the block, and replaces the quote. '''
+        block = self.w3.eth.get_block(block_number, full_transactions=True)
+        gas_prices = np.array([txn['gasPrice'] for txn in block['transactions'] if txn.get('gasPrice', 0) > 0], dtype=np.float64)
+        self.block_gas_prices.append((block_number, gas_prices))
+        node_gas_price = self.w3.eth.gas_price
+        all_gas_prices = np.concatenate([prices for _, prices in self.block_gas_prices])
+        if len(all_gas_prices) == 0:
+            all_gas_prices = np.array([node_gas_price], dtype=np.float64)
+        percentile_gas_prices = np.percentile(all_gas_prices, self.percentiles)
+        self.quote = {
+            'block_number': block_number,
+            'updated': time.time(),
+            'node_gas_price': node_gas_price,
+            'percentiles': {
+                percentile: max(int(gas_price), node_gas_price)
+                for percentile, gas_price in zip(self.percentiles, percentile_gas_prices)
+            },
+        }
+        self.first_quote_event.set()
+        return self.quote
+
+
+    def _run(self):
+        ## Fill the Sample with Recent Blocks
+        latest_block_number = self.w3.eth.block_number
+        for block_number in range(latest_block_number - self.sample_blocks + 1, latest_block_number + 1):
+            self._try_update(block_number)
+        ## Sample each New Block as soon as it Exists
+        while not self.stop_event.is_set():
+            next_block_number = latest_block_number + 1
+            latest_block_number = max(self.NewBlockSubscriber.wait_for_block(next_block_number, timeout=self.max_age_seconds), latest_block_number)
+            if latest_block_number >= next_block_number:
+                for block_number in range(max(next_block_number, latest_block_number - self.sample_blocks + 1), latest_block_number + 1):
+                    self._try_update(block_number)
+
+
+    def _try_update(self, block_number: int):
+        try:
+            self.update(block_number)
+        except Exception as e:
+            self.logger.warning(f'Gas oracle could not sample block. Block: {block_number}. Error: {e}.')
+
+
+    def start(self):
+        if (self.thread is None) or (not self.thread.is_alive()):
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name='GasOracle', daemon=True)
+            self.thread.start()
+        return self
+
+
+    def stop(self):
+        self.stop_event.set()
+        return self
+
+
+    def get_quote(self) -> dict:
+        ''' Returns the latest quote. Only the very first call waits, for the oracle to start and make its first quote. '''
+        quote = self.quote
+        if quote is None:
+            self.start()
+            if not self.first_quote_event.wait(timeout=self.max_age_seconds):
+                error = f'Gas oracle made no quote within {self.max_age_seconds} seconds of starting.'
+                self.logger.critical(error)
+                raise Exception(error)
+            quote = self.quote
+        elif (time.time() - quote['updated']) > self.max_age_seconds:
+            self.logger.warning(f'Gas oracle quote is stale. Age: {time.time() - quote["updated"]:.1f}s. Block: {quote["block_number"]}.')
+        return quote
+
+
+    def get_gas_price(self, percentile: Union[int, None] = None) -> int:
+        ''' In Wei. Defaults to self.swap_percentile. '''
+        return self.get_quote()['percentiles'][self.swap_percentile if percentile is None else percentile]
+
+
+    def get_node_gas_price(self) -> int:
+        ''' The node's eth_gasPrice, as of the last quote. In Wei. '''
+        return self.get_quote()['node_gas_price']
@@ -0,0 +1,91 @@
+## Internal Modules
+from scripts.utils import DataLoc
+
+## External Libraries
+import json
+import os
+import threading
+import asyncio
+import requests
+from requests.adapters import HTTPAdapter
+
+
+'''
+Process-wide HTTP sessions, so that every comms class reuses keep-alive connections
+instead of opening a new TCP + TLS connection on every request.
+
+    - get_session() returns the requests.Session shared by everything in this process.
+      Each host gets its own pool of up to "pool_maxsize" kept-alive connections.
+    - get_async_session() returns the aiohttp.ClientSession shared by everything on the running event loop.
+      It raises for HTTP error statuses (e.g. 429, 5xx), as web3's own session does, so they aren't decoded as JSON.
+      Call close_async_session() before the event loop ends. Sessions of event loops that were closed without it
+      are dropped the next time a session is made.
+
+Sessions are made per process id, so a forked multiprocessing child never reuses its parent's sockets.
+
+Threads share the process's requests.Session (e.g. LogScanner's worker threads). That is safe for how it's used here:
+    - connections come from urllib3's pools, which are thread-safe, so each request gets a connection of its own
+      (a thread waits for a free one if "pool_maxsize" are all busy, instead of sharing one).
+    - nothing changes the session's state after it is made (headers, auth, adapters); every request passes its own.
+    - the one bit of shared mutable state, the cookie jar, is locked by http.cookiejar. No API used here relies on cookies.
+'''
+
+_lock = threading.Lock()
+_sessions = {}        # {pid: requests.Session}
+_async_sessions = {}  # {(pid, event loop): aiohttp.ClientSession}
+_config = None
+
+
+def get_config() -> dict:
+    global _config
+    if _config is None:
+        with open(DataLoc().File.CONFIG.value) as json_file:
+            _config = json.load(json_file)['HTTPSessions']
+    return _config
+
+
+def get_session() -> requests.Session:
+    pid = os.getpid()
+    session = _sessions.get(pid, None)
+    if session is None:
+        with _lock:
+            if pid not in _sessions:
+                config = get_config()
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=config['pool_connections'],  # number of hosts to keep a pool for
+                    pool_maxsize=config['pool_maxsize'],          # connections kept alive per host
+                    max_retries=config['max_retries'],
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _sessions[pid] = session
+            session = _sessions[pid]
+    return session
+
+
+async def get_async_session():
+    ''' Must be awaited inside the event loop that will use the session. '''
+    import aiohttp  # only needed by the asyncio comms classes
+    key = (os.getpid(), asyncio.get_running_loop())
+    session = _async_sessions.get(key, None)
+    if (session is None) or session.closed:
+        for dead_key in [k for k in _async_sessions if k[1].is_closed()]:
+            del _async_sessions[dead_key]
+        config = get_config()
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=config['pool_connections'] * config['pool_maxsize'],
+                limit_per_host=config['pool_maxsize'],
+            ),
+            raise_for_status=True,
+        )
+        _async_sessions[key] = session
+    return session
+
+
+async def close_async_session():
+    ''' Closes the running event loop's session, if it has one. Must be awaited inside that event loop. '''
+    session = _async_sessions.pop((os.getpid(), asyncio.get_running_loop()), None)
+    if (session is not None) and (not session.closed):
+        await session.close()
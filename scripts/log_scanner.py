@@ -0,0 +1,197 @@
+## Internal Modules
+from scripts.http_sessions import get_session
+
+## External Libraries
+from typing import Union, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import time
+import requests
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+
+
+class LogScanner():
+    '''
+    Runs eth_getLogs over block ranges that are too large for a single request.
+
+    The range is split into chunks that adapt to what the nodes will accept:
+        - a chunk that fails with a "too many results" / "range too large" / timeout type error is halved and re-queued,
+          and the chunk size used for the rest of the range is halved too.
+        - a chunk that fails with any other error, including rate limiting (HTTP 429), is retried whole after an
+          exponential backoff, as halving it would only multiply the requests made while throttled.
+        - each successful chunk grows the chunk size by `chunk_growth_factor`, up to `max_chunk_blocks`.
+    Chunks are fetched concurrently, with each in-flight chunk assigned to a different node in `nodes`.
+    A node is only given a chunk that ends at or below its head, so a lagging node can't answer [] for blocks it
+    doesn't have yet. A chunk past a node's head is retried, on whichever node is free, after the backoff.
+    If a NodePool is given, every request's latency and outcome is recorded in it, and nodes it has ejected are
+    not given chunks while a healthy node can take them.
+
+    Methods
+    -------
+    is_rate_limit_error
+    is_range_error
+    get_logs
+    '''
+
+    rate_limit_error_messages = ['rate limit', 'too many requests', '429', 'request limit', 'throttl', 'capacity']
+    range_error_messages = [
+        'block range', 'range too large', 'range is too large', 'too many results', 'too many logs', 'more than',
+        'response size', 'results exceed', 'timeout', 'timed out'
+    ]
+
+    def __init__(
+        self, nodes: List[str], logger, node_pool=None,
+        initial_chunk_blocks: int = 1000, min_chunk_blocks: int = 1, max_chunk_blocks: int = 5000,
+        chunk_growth_factor: float = 1.5, requests_per_node: int = 1, max_retries: int = 5, request_timeout_seconds: int = 30,
+        retry_backoff_seconds: float = 0.5
+    ):
+        '''
+        Parameters
+        ----------
+        nodes : List[str]
+            Node urls to spread the chunks across.
+        node_pool : NodePool
+            Optional. The pool that tracks the health of `nodes`.
+        requests_per_node : int
+            Max number of chunks in-flight at once on each node.
+        max_retries : int
+            Number of times a chunk is retried after an error that is not a range error, before the error is raised.
+        retry_backoff_seconds : float
+            Wait before the first retry of a chunk. Doubles with each further retry.
+        '''
+        self.logger = logger
+        self.nodes = nodes
+        self.node_pool = node_pool
+        self.initial_chunk_blocks = initial_chunk_blocks
+        self.min_chunk_blocks = min_chunk_blocks
+        self.max_chunk_blocks = max_chunk_blocks
+        self.chunk_growth_factor = chunk_growth_factor
+        self.requests_per_node = requests_per_node
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.node_heads = [-1] * len(nodes)  # latest block number known to be on each node
+        self.w3s = []
+        for node in nodes:  # the process-wide session is safe to share across the worker threads, see http_sessions
+            w3 = Web3(Web3.HTTPProvider(node, request_kwargs={'timeout': request_timeout_seconds}, session=get_session()))
+            w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+            self.w3s.append(w3)
+
+
+    def is_rate_limit_error(self, e: Exception) -> bool:
+        ''' True if the error means the node is throttling us, which a smaller block range would make worse. '''
+        if isinstance(e, requests.exceptions.HTTPError) and (e.response is not None) and (e.response.status_code == 429):
+            return True
+        message = str(e).lower()
+        return any(s in message for s in self.rate_limit_error_messages)
+
+
+    def is_range_error(self, e: Exception) -> bool:
+        ''' True if the error means the node wants a smaller block range. '''
+        if self.is_rate_limit_error(e):
+            return False
+        if isinstance(e, requests.exceptions.Timeout):
+            return True
+        message = str(e).lower()
+        return any(s in message for s in self.range_error_messages)
+
+
+    def _get_logs(self, node_i: int, filter_params: dict, start: int, end: int) -> list:
+        ## Check the Node has every Block in the Range, else it answers [] for the ones it doesn't have
+        if end > self.node_heads[node_i]:
+            self.node_heads[node_i] = self.w3s[node_i].eth.block_number
+            if end > self.node_heads[node_i]:
+                raise Exception(f'Node head {self.node_heads[node_i]} is below block {end}. Node: {self.nodes[node_i]}.')
+        start_time = time.monotonic()
+        try:
+            logs = self.w3s[node_i].eth.get_logs(dict(filter_params, fromBlock=start, toBlock=end))
+        except Exception as e:
+            ## A range error is the node answering, so only other errors count against the node's health
+            if (self.node_pool is not None) and (not self.is_range_error(e)):
+                self.node_pool.record_failure(self.nodes[node_i], e)
+            raise
+        if self.node_pool is not None:
+            self.node_pool.record_success(self.nodes[node_i], time.monotonic() - start_time)
+        return logs
+
+
+    def _pop_free_node(self, free_nodes: deque, in_flight: dict) -> Union[int, None]:
+        '''
+        Takes the first free node that the node pool has not ejected.
+        An ejected node is only used if nothing is in flight (so there is nothing to wait on instead).
+        '''
+        if self.node_pool is None:
+            return free_nodes.popleft()
+        for i, node_i in enumerate(free_nodes):
+            if not self.node_pool.stats[self.nodes[node_i]]['ejected']:
+                del free_nodes[i]
+                return node_i
+        return None if in_flight else free_nodes.popleft()
+
+
+    def get_logs(self, filter_params: dict, from_block: int, to_block: int, chunk_blocks: Union[int, None] = None) -> list:
+        '''
+        Parameters
+        ----------
+        filter_params : dict
+            eth_getLogs filter params, without "fromBlock" and "toBlock". E.g. {'address': ..., 'topics': [...]}
+        from_block / to_block : int
+            Inclusive block range.
+        chunk_blocks : int
+            The starting chunk size. Defaults to self.initial_chunk_blocks.
+
+        Returns the raw logs, sorted by (blockNumber, logIndex).
+        '''
+        chunk_blocks = self.initial_chunk_blocks if chunk_blocks is None else chunk_blocks
+        next_block = from_block
+        retry_ranges = deque()  # (start, end, attempt, monotonic time it can be retried at)
+        free_nodes = deque(node_i for node_i in range(len(self.w3s)) for _ in range(self.requests_per_node))
+        in_flight = {}  # {future: (start, end, node_i, attempt)}
+        logs = []
+        with ThreadPoolExecutor(max_workers=len(free_nodes)) as executor:
+            while in_flight or retry_ranges or (next_block <= to_block):
+                ## Hand out Block Ranges to Free Nodes
+                while free_nodes:
+                    now = time.monotonic()
+                    ready_i = next((i for i, (_, _, _, ready_at) in enumerate(retry_ranges) if ready_at <= now), None)
+                    if (ready_i is None) and (next_block > to_block):
+                        break
+                    node_i = self._pop_free_node(free_nodes, in_flight)
+                    if node_i is None:
+                        break
+                    if ready_i is not None:
+                        start, end, attempt, _ = retry_ranges[ready_i]
+                        del retry_ranges[ready_i]
+                    else:
+                        start, end, attempt = next_block, min(next_block + int(chunk_blocks) - 1, to_block), 0
+                        next_block = end + 1
+                    future = executor.submit(self._get_logs, node_i, filter_params, start, end)
+                    in_flight[future] = (start, end, node_i, attempt)
+
+                ## Collect Finished Block Ranges, or Wait for the next Retry to be Ready
+                retry_wait = max(min(ready_at for _, _, _, ready_at in retry_ranges) - time.monotonic(), 0) if retry_ranges else None
+                if not in_flight:
+                    time.sleep(retry_wait or 0)
+                    continue
+                done, _ = wait(in_flight, timeout=retry_wait, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, end, node_i, attempt = in_flight.pop(future)
+                    free_nodes.append(node_i)
+                    try:
+                        logs.extend(future.result())
+                        chunk_blocks = min(chunk_blocks * self.chunk_growth_factor, self.max_chunk_blocks)
+                    except Exception as e:
+                        if self.is_range_error(e) and (end > start):
+                            chunk_blocks = max(chunk_blocks / 2, self.min_chunk_blocks)
+                            mid = (start + end) // 2
+                            retry_ranges.extend([(start, mid, 0, 0), (mid + 1, end, 0, 0)])
+                            self.logger.debug(f'Halving eth_getLogs block range after error. Blocks: {start}-{end}. Node: {self.nodes[node_i]}. Error: {e}.')
+                        elif attempt < self.max_retries:
+                            backoff_seconds = self.retry_backoff_seconds * (2 ** attempt)
+                            retry_ranges.append((start, end, attempt + 1, time.monotonic() + backoff_seconds))
+                            self.logger.debug(f'Retrying eth_getLogs block range after error, in {backoff_seconds}s. Blocks: {start}-{end}. Attempt: {attempt + 1}. Node: {self.nodes[node_i]}. Error: {e}.')
+                        else:
+                            self.logger.critical(f'eth_getLogs failed after {self.max_retries} retries. Blocks: {start}-{end}. Filter: {filter_params}. Error: {e}.')
+                            raise
+        logs.sort(key=lambda log: (log['blockNumber'], log['logIndex']))
+        return logs
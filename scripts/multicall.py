@@ -0,0 +1,81 @@
+## External Libraries
+from typing import Union
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+
+class Multicall():
+    '''
+    Runs many contract view calls in one eth_call, through the Multicall3 contract's aggregate3 function.
+    Multicall3 is deployed at the same address on every chain it supports, including BSC mainnet and testnet.
+
+    If given a BlockReadCache, calls for the 'latest' block are read at the cache's block number and memoized
+    for the rest of that block, and only the calls not already read this block are sent.
+
+    Methods
+    -------
+    aggregate
+
+    Attributes
+    ----------
+    self.contract_multicall
+    self.max_calls  (calls per eth_call; bigger lists are split over several eth_calls)
+    '''
+
+    def __init__(self, w3, contract_multicall, logger, max_calls: int = 500, BlockReadCache=None):
+        self.w3 = w3
+        self.contract_multicall = contract_multicall
+        self.logger = logger
+        self.max_calls = max_calls
+        self.BlockReadCache = BlockReadCache
+
+
+    def decode_output(self, contract_function, return_data: bytes):
+        ''' Decodes a call's return data the same way contract_function.call() would. '''
+        output_types = get_abi_output_types(contract_function.abi)
+        output = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, self.w3.codec.decode_abi(output_types, return_data))
+        return output[0] if len(output) == 1 else output
+
+
+    def aggregate(self, contract_functions: list, allow_failure: bool = False, block_identifier: Union[str, int] = 'latest') -> list:
+        '''
+        Parameters
+        ----------
+        contract_functions : list
+            Contract function calls, built but not called. E.g. [pool_contract.functions.getReserves(), ...]
+        allow_failure : bool
+            If True, a call that reverts returns None. Else, the whole aggregate reverts.
+        block_identifier
+            All calls are read at this block, so they are consistent with each other.
+
+        Returns the output of each call, in the same order as `contract_functions`.
+        '''
+        ## Look up Calls already Read this Block
+        call_keys = [(contract_function.address, contract_function._encode_transaction_data()) for contract_function in contract_functions]
+        use_cache = (self.BlockReadCache is not None) and (block_identifier == 'latest')
+        if use_cache:
+            block_number = self.BlockReadCache.get_block_number()
+            block_identifier = block_number  # read exactly the block the outputs are cached under
+            outputs = [self.BlockReadCache.get(call_key) for call_key in call_keys]
+            missing_indexes = [i for i, output in enumerate(outputs) if output is self.BlockReadCache.missing]
+        else:
+            outputs = [None] * len(contract_functions)
+            missing_indexes = list(range(len(contract_functions)))
+
+        ## Read the Rest
+        for batch_start in range(0, len(missing_indexes), self.max_calls):
+            batch_indexes = missing_indexes[batch_start: batch_start + self.max_calls]
+            results = self.contract_multicall.functions.aggregate3([
+                (call_keys[i][0], allow_failure, call_keys[i][1])
+                for i in batch_indexes
+            ]).call(block_identifier=block_identifier)
+            for i, (success, return_data) in zip(batch_indexes, results):
+                contract_function = contract_functions[i]
+                if success and return_data:
+                    outputs[i] = self.decode_output(contract_function, return_data)
+                    if use_cache:
+                        self.BlockReadCache.set(call_keys[i], outputs[i], block_number=block_number)
+                else:
+                    self.logger.debug(f'Multicall call failed. Contract: {contract_function.address}. Function: {contract_function.fn_name}.')
+                    outputs[i] = None
+        return outputs
@@ -0,0 +1,183 @@
+## External Libraries
+from typing import List, Union, Callable
+import asyncio
+import json
+import threading
+import time
+
+
+class NewBlockSubscriber():
+    '''
+    Tells consumers about each new block as soon as it exists, instead of them sleeping for a guessed number of seconds.
+
+    A background thread listens to a "newHeads" WebSocket subscription on the first `ws_nodes` node that works.
+    If there are no WebSocket nodes, or they all fail, it polls eth_blockNumber every `poll_interval_seconds` instead,
+    and retries the WebSocket nodes every `reconnect_seconds`.
+
+    Every block number is given to consumers exactly once and in order; if blocks are skipped (e.g. two blocks
+    between polls), the skipped block numbers are given too.
+
+    Consumers can:
+        - register a callback with subscribe(), which is called with each new block number on the background thread.
+        - block until a given block exists with wait_for_block().
+        - iterate over new block numbers in an event loop with `async for block_number in subscriber.iter_blocks()`.
+
+    Methods
+    -------
+    start
+    stop
+    subscribe
+    unsubscribe
+    wait_for_block
+    iter_blocks
+
+    Attributes
+    ----------
+    self.latest_block_number
+    self.source  ('websocket', 'polling', or None before starting)
+    '''
+
+    def __init__(
+        self, w3, logger, ws_nodes: List[str],
+        poll_interval_seconds: float = 0.5, reconnect_seconds: float = 30, ws_timeout_seconds: float = 15
+    ):
+        '''
+        Parameters
+        ----------
+        w3
+            Used for eth_blockNumber when polling.
+        ws_nodes : List[str]
+            WebSocket node urls. E.g. ['wss://...']. Can be empty, to always poll.
+        ws_timeout_seconds : float
+            A WebSocket that sends no new block for this long is treated as dead.
+        '''
+        self.w3 = w3
+        self.logger = logger
+        self.ws_nodes = ws_nodes
+        self.poll_interval_seconds = poll_interval_seconds
+        self.reconnect_seconds = reconnect_seconds
+        self.ws_timeout_seconds = ws_timeout_seconds
+        self.latest_block_number = None
+        self.source = None
+        self.callbacks = []
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+
+    ## Consumers
+
+    def subscribe(self, callback: Callable):
+        ''' callback(block_number) is called for every new block, on the subscriber's thread, so it should be quick. '''
+        with self.condition:
+            self.callbacks.append(callback)
+        return self
+
+
+    def unsubscribe(self, callback: Callable):
+        with self.condition:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+        return self
+
+
+    def wait_for_block(self, block_number: int, timeout: Union[float, None] = None) -> int:
+        '''
+        Blocks until `block_number` has been mined (or `timeout` seconds pass), starting the subscriber if needed.
+        Returns the latest block number.
+        '''
+        self.start()
+        with self.condition:
+            self.condition.wait_for(lambda: self.latest_block_number >= block_number, timeout=timeout)
+            return self.latest_block_number
+
+
+    async def iter_blocks(self):
+        ''' Async iterator of new block numbers, for consumers running in an event loop. '''
+        self.start()
+        loop = asyncio.get_running_loop()
+        block_queue = asyncio.Queue()
+        def callback(block_number):
+            loop.call_soon_threadsafe(block_queue.put_nowait, block_number)
+        self.subscribe(callback)
+        try:
+            while True:
+                yield await block_queue.get()
+        finally:
+            self.unsubscribe(callback)
+
+
+    ## Producer
+
+    def _emit(self, block_number: int):
+        with self.condition:
+            if block_number <= self.latest_block_number:
+                return
+            new_block_numbers = range(self.latest_block_number + 1, block_number + 1)
+            self.latest_block_number = block_number
+            self.condition.notify_all()
+            callbacks = list(self.callbacks)
+        for new_block_number in new_block_numbers:
+            for callback in callbacks:
+                try:
+                    callback(new_block_number)
+                except Exception:
+                    self.logger.exception(f'New block callback failed. Callback: {callback}. Block: {new_block_number}.')
+
+
+    async def _listen_websocket(self, node: str):
+        ''' Emits blocks from a newHeads subscription until stopped, or until the WebSocket errors or goes quiet. '''
+        import websockets  # only needed if WebSocket nodes are configured
+        async with websockets.connect(node) as ws:
+            await ws.send(json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_subscribe', 'params': ['newHeads']}))
+            response = json.loads(await asyncio.wait_for(ws.recv(), timeout=self.ws_timeout_seconds))
+            if 'result' not in response:
+                raise Exception(f'newHeads subscription refused. Response: {response}.')
+            self.source = 'websocket'
+            self.logger.info(f'Subscribed to new blocks over WebSocket. Node: {node}.')
+            while not self.stop_event.is_set():
+                message = json.loads(await asyncio.wait_for(ws.recv(), timeout=self.ws_timeout_seconds))
+                header = message.get('params', {}).get('result', {})
+                if 'number' in header:
+                    self._emit(int(header['number'], 16))
+
+
+    def _poll(self, until: Union[float, None] = None):
+        ''' Emits blocks by polling eth_blockNumber until stopped, or until time.monotonic() passes `until`. '''
+        self.source = 'polling'
+        while not self.stop_event.is_set():
+            try:
+                self._emit(self.w3.eth.block_number)
+            except Exception as e:
+                self.logger.warning(f'Polling for new blocks failed. Error: {e}.')
+            if (until is not None) and (time.monotonic() > until):
+                return
+            self.stop_event.wait(self.poll_interval_seconds)
+
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            for node in self.ws_nodes:
+                try:
+                    asyncio.run(self._listen_websocket(node))
+                except Exception as e:
+                    self.logger.warning(f'New block WebSocket subscription failed, falling back to polling. Node: {node}. Error: {e}.')
+                if self.stop_event.is_set():
+                    return
+            self._poll(until=(time.monotonic() + self.reconnect_seconds) if self.ws_nodes else None)
+
+
+    def start(self):
+        if (self.thread is None) or (not self.thread.is_alive()):
+            with self.condition:
+                if self.latest_block_number is None:
+                    self.latest_block_number = self.w3.eth.block_number
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name='NewBlockSubscriber', daemon=True)
+            self.thread.start()
+        return self
+
+
+    def stop(self):
+        self.stop_event.set()
+        return self
@@ -0,0 +1,282 @@
+## Internal Modules
+from scripts.http_sessions import get_session, get_async_session
+
+## External Libraries
+from typing import List, Union
+import json
+import threading
+import asyncio
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from web3.providers.base import JSONBaseProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+
+class NodePool():
+    '''
+    Keeps the latency and error rate of every RPC node, and sends each request to the best healthy node,
+    failing over to the next best node if it errors.
+
+    Node Health
+    -----------
+        - latency and error rate are exponentially weighted moving averages (weight of newest = `latency_smoothing`).
+        - a node's score is its expected seconds per successful request: latency / (1 - error rate). Lowest is best.
+        - a node is ejected after `max_consecutive_failures` failed requests in a row, and is no longer sent requests.
+        - a background thread probes ejected nodes every `probe_interval_seconds`, and reinstates them once they answer.
+        - only connection errors, timeouts, and HTTP errors (e.g. 429 rate limited) count as failures; a JSON-RPC error
+          (e.g. a reverted call) is the node answering, so it is returned to the caller as normal.
+
+    Methods
+    -------
+    probe
+    probe_all
+    record_success
+    record_failure
+    ranked_nodes
+    best_node
+    post
+    async_post
+    start
+    stop
+
+    Attributes
+    ----------
+    self.nodes
+    self.stats  ({node: {'latency', 'error_rate', 'consecutive_failures', 'ejected', 'requests'}})
+    '''
+
+    def __init__(
+        self, nodes: List[str], logger,
+        request_timeout_seconds: int = 10, latency_smoothing: float = 0.3,
+        max_consecutive_failures: int = 3, probe_interval_seconds: int = 30
+    ):
+        self.logger = logger
+        self.nodes = nodes
+        self.request_timeout_seconds = request_timeout_seconds
+        self.latency_smoothing = latency_smoothing
+        self.max_consecutive_failures = max_consecutive_failures
+        self.probe_interval_seconds = probe_interval_seconds
+        self.stats = {
+            node: {'latency': None, 'error_rate': 0.0, 'consecutive_failures': 0, 'ejected': False, 'requests': 0}
+            for node in nodes
+        }
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.probe_thread = None
+
+
+    ## Health Tracking
+
+    def record_success(self, node: str, latency: float):
+        with self.lock:
+            stats = self.stats[node]
+            a = self.latency_smoothing
+            stats['latency'] = latency if stats['latency'] is None else (a * latency) + ((1 - a) * stats['latency'])
+            stats['error_rate'] = (1 - a) * stats['error_rate']
+            stats['consecutive_failures'] = 0
+            stats['requests'] += 1
+            if stats['ejected']:
+                stats['ejected'] = False
+                self.logger.info(f'RPC node reinstated. Node: {node}. Latency: {latency:.3f}s.')
+
+
+    def record_failure(self, node: str, error: Exception):
+        with self.lock:
+            stats = self.stats[node]
+            a = self.latency_smoothing
+            stats['error_rate'] = (a * 1) + ((1 - a) * stats['error_rate'])
+            stats['consecutive_failures'] += 1
+            stats['requests'] += 1
+            if (not stats['ejected']) and (stats['consecutive_failures'] >= self.max_consecutive_failures):
+                stats['ejected'] = True
+                self.logger.warning(f'RPC node ejected after {stats["consecutive_failures"]} failures in a row. Node: {node}. Error: {error}.')
+
+
+    def ranked_nodes(self, include_ejected: bool = False) -> List[str]:
+        ''' Healthy nodes, best first. Ejected nodes are put after them if `include_ejected`. '''
+        def score(node):
+            stats = self.stats[node]
+            latency = self.request_timeout_seconds if stats['latency'] is None else stats['latency']
+            return latency / max(1 - stats['error_rate'], 0.01)
+        with self.lock:
+            healthy = sorted([node for node in self.nodes if not self.stats[node]['ejected']], key=score)
+            ejected = sorted([node for node in self.nodes if self.stats[node]['ejected']], key=score)
+        return healthy + ejected if include_ejected else healthy
+
+
+    def best_node(self) -> Union[str, None]:
+        ranked_nodes = self.ranked_nodes()
+        return ranked_nodes[0] if ranked_nodes else None
+
+
+    ## Requests
+
+    def _post(self, node: str, data: Union[bytes, str]):
+        ''' Posts to one node, and records how it went. Raises if the node did not answer. '''
+        start_time = time.monotonic()
+        try:
+            response = get_session().post(
+                node, data=data,
+                headers={'Content-Type': 'application/json'},
+                timeout=self.request_timeout_seconds
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.record_failure(node, e)
+            raise
+        self.record_success(node, time.monotonic() - start_time)
+        return response
+
+
+    def post(self, data: Union[bytes, str], exclude_nodes: Union[List[str], None] = None):
+        '''
+        Posts a JSON-RPC request (or batch) to the best healthy node, failing over to the next best node on a failure.
+        If every healthy node fails, ejected nodes are tried too before giving up.
+
+        Parameters
+        ----------
+        exclude_nodes : List[str]
+            Nodes not to post to, e.g. ones that already answered the request without a usable result.
+
+        Returns (node, requests.Response)
+        '''
+        errors = {}
+        for node in self.ranked_nodes(include_ejected=True):
+            if (exclude_nodes is not None) and (node in exclude_nodes):
+                continue
+            try:
+                return node, self._post(node, data)
+            except requests.exceptions.RequestException as e:
+                errors[node] = e
+                self.logger.debug(f'RPC request failed, failing over to the next node. Node: {node}. Error: {e}.')
+        error = f'All RPC nodes failed. Errors: {errors}.'
+        self.logger.critical(error)
+        raise Exception(error)
+
+
+    async def _async_post(self, node: str, data: Union[bytes, str]) -> bytes:
+        ''' Async version of self._post(). Returns the response body. '''
+        import aiohttp  # only needed by the asyncio comms classes
+        start_time = time.monotonic()
+        try:
+            session = await get_async_session()
+            async with session.post(
+                node, data=data,
+                headers={'Content-Type': 'application/json'},
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout_seconds)
+            ) as response:
+                content = await response.read()  # the shared session raises for HTTP error statuses
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.record_failure(node, e)
+            raise
+        self.record_success(node, time.monotonic() - start_time)
+        return content
+
+
+    async def async_post(self, data: Union[bytes, str]):
+        '''
+        Async version of self.post(), failing over the same way.
+
+        Returns (node, response body as bytes)
+        '''
+        import aiohttp  # only needed by the asyncio comms classes
+        errors = {}
+        for node in self.ranked_nodes(include_ejected=True):
+            try:
+                return node, await self._async_post(node, data)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                errors[node] = e
+                self.logger.debug(f'RPC request failed, failing over to the next node. Node: {node}. Error: {e!r}.')
+        error = f'All RPC nodes failed. Errors: {errors}.'
+        self.logger.critical(error)
+        raise Exception(error)
+
+
+    ## Probing
+
+    def probe(self, node: str) -> bool:
+        ''' Sends eth_blockNumber to the node. True if it answered. '''
+        data = json.dumps({'jsonrpc': '2.0', 'method': 'eth_blockNumber', 'params': [], 'id': 0})
+        try:
+            response = self._post(node, data)
+            return 'result' in response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.logger.debug(f'RPC node probe failed. Node: {node}. Error: {e}.')
+            return False
+
+
+    def probe_all(self):
+        '''
+        Probes every node at once, to get a starting latency for each. Nodes that don't answer are ejected straight away.
+        Returns the healthy nodes, best first.
+        '''
+        with ThreadPoolExecutor(max_workers=len(self.nodes)) as executor:
+            answered = dict(zip(self.nodes, executor.map(self.probe, self.nodes)))
+        with self.lock:
+            for node, is_healthy in answered.items():
+                if not is_healthy:
+                    self.stats[node]['ejected'] = True
+        return self.ranked_nodes()
+
+
+    def _probe_loop(self):
+        while not self.stop_event.wait(self.probe_interval_seconds):
+            for node in self.nodes:
+                if self.stats[node]['ejected']:
+                    self.probe(node)
+
+
+    def start(self):
+        ''' Starts the background thread that re-probes ejected nodes. '''
+        if (self.probe_thread is None) or (not self.probe_thread.is_alive()):
+            self.stop_event.clear()
+            self.probe_thread = threading.Thread(target=self._probe_loop, name='NodePoolProbe', daemon=True)
+            self.probe_thread.start()
+        return self
+
+
+    def stop(self):
+        self.stop_event.set()
+        return self
+
+
+
+class NodePoolProvider(JSONBaseProvider):
+    '''
+    A web3 provider that sends every request through a NodePool, instead of to one fixed node url.
+    '''
+
+    def __init__(self, node_pool: NodePool):
+        self.node_pool = node_pool
+        super().__init__()
+
+
+    def __str__(self):
+        return f'NodePool connection {self.node_pool.nodes}'
+
+
+    def make_request(self, method, params):
+        _, response = self.node_pool.post(self.encode_rpc_request(method, params))
+        return self.decode_rpc_response(response.content)
+
+
+
+class AsyncNodePoolProvider(AsyncJSONBaseProvider):
+    '''
+    Async version of NodePoolProvider, for a web3 object with the AsyncEth module.
+    Shares the NodePool (and so the node health) of the sync provider.
+    '''
+
+    def __init__(self, node_pool: NodePool):
+        self.node_pool = node_pool
+        super().__init__()
+
+
+    def __str__(self):
+        return f'Async NodePool connection {self.node_pool.nodes}'
+
+
+    async def make_request(self, method, params):
+        _, content = await self.node_pool.async_post(self.encode_rpc_request(method, params))
+        return self.decode_rpc_response(content)
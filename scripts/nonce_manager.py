@@ -0,0 +1,67 @@
+## External Libraries
+from typing import Union
+import threading
+
+
+class NonceManager():
+    '''
+    Hands out transaction nonces for one wallet from a local counter, so back-to-back transactions
+    never wait on an RPC call for their nonce, and never get the same nonce.
+
+        - the counter is synced from the wallet's pending transaction count the first time a nonce is needed.
+        - nonces are handed out under a lock, so threads sharing the wallet never get the same one.
+        - if anything fails between get_nonce() and the send, call resync_after_error(); the counter is re-synced
+          from the chain before the next nonce. Reserve the nonce as late as possible, just before signing.
+          A nonce that was handed out but never sent would otherwise leave a gap that blocks every later transaction.
+
+    Use NonceManager.get_manager() to get the one manager per wallet in the process.
+
+    Methods
+    -------
+    get_manager
+    sync
+    get_nonce
+    resync_after_error
+    '''
+
+    managers = {}  # {(blockchain_name, blockchain_net, address): NonceManager}
+    managers_lock = threading.Lock()
+
+    def __init__(self, w3, address: str, logger):
+        self.w3 = w3
+        self.address = address
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.next_nonce = None  # None until synced
+
+
+    @classmethod
+    def get_manager(cls, w3, address: str, logger, blockchain_name: str, blockchain_net: str):
+        key = (blockchain_name, blockchain_net, address)
+        with cls.managers_lock:
+            if key not in cls.managers:
+                cls.managers[key] = cls(w3=w3, address=address, logger=logger)
+            return cls.managers[key]
+
+
+    def sync(self) -> int:
+        ''' Sets the counter to the wallet's transaction count, including pending transactions. Call with self.lock held. '''
+        self.next_nonce = self.w3.eth.get_transaction_count(self.address, 'pending')
+        self.logger.debug(f'Nonce synced from chain. Wallet: {self.address}. Next nonce: {self.next_nonce}.')
+        return self.next_nonce
+
+
+    def get_nonce(self) -> int:
+        with self.lock:
+            if self.next_nonce is None:
+                self.sync()
+            nonce = self.next_nonce
+            self.next_nonce += 1
+            return nonce
+
+
+    def resync_after_error(self, error: Union[Exception, None] = None):
+        ''' Makes the next get_nonce() re-sync from the chain. '''
+        with self.lock:
+            self.next_nonce = None
+        self.logger.warning(f'Nonce will be re-synced from chain after a failed transaction. Wallet: {self.address}. Error: {error}.')
@@ -0,0 +1,30 @@
+## External Libraries
+from functools import lru_cache
+from web3 import Web3
+
+
+def sort_tokens(token_address_a: str, token_address_b: str) -> tuple:
+    ''' Returns (token0, token1), ordered as a V2 factory orders them: by address, as a number. '''
+    if int(token_address_a, 16) < int(token_address_b, 16):
+        return token_address_a, token_address_b
+    return token_address_b, token_address_a
+
+
+@lru_cache(maxsize=None)
+def compute_pair_address(factory_address: str, token_address_a: str, token_address_b: str, init_code_hash: str) -> str:
+    '''
+    The address of a Uniswap V2 style pair, computed offline the same way the factory deploys it with CREATE2:
+        keccak256(0xff ++ factory ++ keccak256(token0 ++ token1) ++ init_code_hash)[12:]
+
+    Doesn't matter which way you put the two token addresses in. The pair may not have been created yet,
+    in which case nothing is deployed at the address.
+
+    Parameters
+    ----------
+    init_code_hash : str
+        keccak256 of the pair contract's creation code, which is fixed per factory. Hex string.
+    '''
+    token0, token1 = sort_tokens(token_address_a, token_address_b)
+    salt = Web3.keccak(bytes.fromhex(token0[2:]) + bytes.fromhex(token1[2:]))
+    raw_address = Web3.keccak(b'\xff' + bytes.fromhex(factory_address[2:]) + salt + bytes.fromhex(init_code_hash[2:]))[12:]
+    return Web3.toChecksumAddress(raw_address)
@@ -2,6 +2,9 @@
 from scripts.comms_dex_pancakeswapv2 import CommsDEXPancakeSwapV2
 from scripts.strat_coin_listing import StratCoinListing
 from scripts.utils import catch_and_log_exception
+from scripts.backfill_checkpoint import BackfillCheckpoint
+from scripts.trade_storage import TradeStorage, TradeSegmentWriter
+from scripts.bar_builder import BarBuilder
 
 ## External Libraries
 from typing import Union
@@ -28,6 +31,7 @@ class ReconCoinListing(StratCoinListing):
         self.run_strat = None  # disable trading via recon class
         with open(self.DataLoc.File.CONFIG.value) as json_file:
             config = json.load(json_file)[self.__class__.__name__]
+        self.bar_interval_seconds = config['bar_interval_seconds']
         self.logger_strat_coin_listing = self.logger  # sometimes logging to the strategy class makes more sense
         self.logger = self.MyLogger.configure_logger(fileloc=self.DataLoc.Log.RECON_COIN_LISTING.value)
 
@@ -45,43 +49,51 @@ class ReconCoinListing(StratCoinListing):
             pickle.dump(output_data, pfile, protocol=pickle.HIGHEST_PROTOCOL)
 
 
+    def get_price_data_file_loc(self, exchange_name: str, start_dt: datetime, end_dt: datetime, symbol_1: str, symbol_2: str, suffix: str = ''):
+        start_strf = start_dt.strftime("%Y-%m-%d-%H-%M-%S")
+        end_strf = end_dt.strftime("%Y-%m-%d-%H-%M-%S")
+        file_name = f'{exchange_name}_{symbol_1}_{symbol_2}_{start_strf}_{end_strf}{suffix}{TradeStorage.file_extension}'
+        return f'{self.DataLoc.Folder.DATA_RECON_COIN_LISTING.value}/{file_name}'
+
+
     def save_downloaded_price_data(self, output_data: dict, exchange_name: str, start_dt: datetime, end_dt: datetime, symbol_1: str, symbol_2: str, add_to_existing: bool = True):
         '''
         Records price data for an exchange and spot trading pair for a small length of time
         before and after the underlying asset has been newly listed on an exchange.
+            - Saved in the columnar format of TradeStorage.
+            - If add_to_existing is True, only the new rows are written, as a segment that
+              self.compact_downloaded_price_data() merges into the file once the window closes.
+              Else, the file is overwritten with `output_data`.
         '''
-        start_strf = start_dt.strftime("%Y-%m-%d-%H-%M-%S")
-        end_strf = end_dt.strftime("%Y-%m-%d-%H-%M-%S")
-        file_name = f'{exchange_name}_{symbol_1}_{symbol_2}_{start_strf}_{end_strf}.pkl'
-        file_loc = f'{self.DataLoc.Folder.DATA_RECON_COIN_LISTING.value}/{file_name}'
-
-        ## Add Existing Data
+        file_loc = self.get_price_data_file_loc(exchange_name=exchange_name, start_dt=start_dt, end_dt=end_dt, symbol_1=symbol_1, symbol_2=symbol_2)
+        columns = TradeStorage.to_columns(output_data)
         if add_to_existing is True:
-            try:
-                with open(file_loc, 'rb') as handle:
-                    saved_data = pickle.load(handle)
-                output_data.update(saved_data)
-            except EOFError:  # empty file
-                pass
-            except FileNotFoundError:
-                pass
-
-        ## Save New and Existing Data
-        with open(file_loc, 'wb') as pfile:
-            pickle.dump(output_data, pfile, protocol=pickle.HIGHEST_PROTOCOL)
+            TradeSegmentWriter(file_loc).append(columns)
+        else:
+            TradeStorage.save(file_loc, columns)
+
+
+    def compact_downloaded_price_data(self, exchange_name: str, start_dt: datetime, end_dt: datetime, symbol_1: str, symbol_2: str):
+        ''' Merges the segments written by self.save_downloaded_price_data() into one file. '''
+        file_loc = self.get_price_data_file_loc(exchange_name=exchange_name, start_dt=start_dt, end_dt=end_dt, symbol_1=symbol_1, symbol_2=symbol_2)
+        TradeSegmentWriter(file_loc).compact()
 
 
-    def grab_price_data_pancakeswapv2(self, exchange_name: str, exchange_data: dict):
+    def grab_price_data_pancakeswapv2(self, exchange_name: str, exchange_data_list: list, listing_dt: Union[datetime, None] = None):
         '''
-        Queries price data for PancakeswapV2 for a spot trading pair, for 4 hours before
+        Queries price data for PancakeswapV2 for every spot trading pair in `exchange_data_list`, for 4 hours before
         and 4 hours after the underlying asset has been newly listed on an exchange,
         and while waiting to query more data, periodically saves the queried data.
+            - The Swap events of all the pairs' pools are queried together, with one log query per block range.
+            - Progress is checkpointed per pool, so a restarted process resumes the same window where it stopped.
+              The checkpoint is named after the listing (`listing_dt`, when the listing was found), so a later listing
+              of the same pairs, or another process, never picks up this window. Without `listing_dt`, the job is named
+              after its start block, and is only resumed by a process pulling the same window.
         '''
         self.MyLogger.activate_mp_logger()
         global CommsDEXPancakeSwapV2
         CommsDEXPancakeSwapV2 = CommsDEXPancakeSwapV2(blockchain_net='mainnet')
-        symbol_underlying = exchange_data['underlying']
-        symbol_quote = exchange_data['quote']
+        pairs = [(exchange_data['underlying'], exchange_data['quote']) for exchange_data in exchange_data_list]
         now = datetime.utcnow()
         now_block = CommsDEXPancakeSwapV2.get_latest_block_number()
 
@@ -94,32 +106,70 @@ class ReconCoinListing(StratCoinListing):
         end_block = int(np.ceil(now_block  + (4 * 60 * 60 / CommsDEXPancakeSwapV2.average_block_seconds)))  # 4 hours of data after event
         query_period_in_blocks = 1000  # query data every 1000 blocks
 
-        self.logger.debug(f'Downloading price data from PancakeSwapV2 for symbol "{symbol_underlying}/{symbol_quote}" between start "{start_dt}" and end "{end_dt}".')
-
-        ## Grab Data at Specific Intervals, then sleep
-        sub_end_block = start_block - 1
-        for sub_start_block in range(start_block, end_block, query_period_in_blocks):
-            sub_end_block = sub_start_block + query_period_in_blocks
+        ## Resume the Pull if a Previous Process Died Part Way Through it
+        window_name = listing_dt.strftime('%Y-%m-%d-%H-%M-%S') if listing_dt is not None else str(start_block)
+        job_name = f'{self.__class__.__name__}_{exchange_name}_' + '_'.join(f'{symbol_underlying}_{symbol_quote}' for symbol_underlying, symbol_quote in pairs) + f'_{window_name}'
+        checkpoint = BackfillCheckpoint.open(job_name=job_name, DataLoc=self.DataLoc).start(
+            start_block=start_block, end_block=end_block,
+            pool_keys=[CommsDEXPancakeSwapV2.get_backfill_pool_key(*pair) for pair in pairs],
+            metadata={'start_dt': start_dt.isoformat(), 'end_dt': end_dt.isoformat()}
+        )
+        start_dt = datetime.fromisoformat(checkpoint.metadata['start_dt'])  # the saved window if resuming, so data keeps going to the same files
+        end_dt = datetime.fromisoformat(checkpoint.metadata['end_dt'])
+
+        self.logger.debug(f'Downloading price data from PancakeSwapV2 for symbols {[f"{symbol_underlying}/{symbol_quote}" for symbol_underlying, symbol_quote in pairs]} between start "{start_dt}" and end "{end_dt}". Checkpoint: {checkpoint.last_blocks}.')
+
+        ## Roll OHLCV Bars Forward as Chunks arrive, starting from any Data saved before a Restart
+        bar_builders = {}
+        replayed_txn_hashes = {}  # {pair: txn hashes already in the bars that a resumed chunk may fetch again}
+        for symbol_underlying, symbol_quote in pairs:
+            bar_builder = BarBuilder(underlying_symbol=symbol_underlying, quote_symbol=symbol_quote, interval=self.bar_interval_seconds, by='time')
+            file_loc = self.get_price_data_file_loc(exchange_name=exchange_name, start_dt=start_dt, end_dt=end_dt, symbol_1=symbol_underlying, symbol_2=symbol_quote)
+            saved_columns = TradeSegmentWriter(file_loc).load()
+            bar_builder.update(saved_columns)
+            bar_builders[(symbol_underlying, symbol_quote)] = bar_builder
+            ## A crash after a chunk was saved but before the checkpoint was updated means that chunk is fetched again
+            resume_block = checkpoint.next_block(CommsDEXPancakeSwapV2.get_backfill_pool_key(symbol_underlying, symbol_quote))
+            replayed_txn_hashes[(symbol_underlying, symbol_quote)] = {txn_hash.tobytes() for txn_hash in saved_columns['txn_hash'][saved_columns['block_number'] >= resume_block]}
+
+        ## Save Price Data after every Chunk, in case program crashes or something
+        def save_chunk(all_output_data: dict, chunk_start_block: int, chunk_end_block: int):
+            chunk_end_timestamp = CommsDEXPancakeSwapV2.get_block_timestamps([chunk_end_block])[chunk_end_block]
+            for (symbol_underlying, symbol_quote), output_data in all_output_data.items():
+                self.save_downloaded_price_data(
+                    output_data=output_data, exchange_name=exchange_name,
+                    start_dt=start_dt, end_dt=end_dt,
+                    symbol_1=symbol_underlying, symbol_2=symbol_quote,
+                    add_to_existing=True
+                )
+                columns = TradeStorage.to_columns(output_data)
+                if replayed_txn_hashes[(symbol_underlying, symbol_quote)]:  # leave out trades already in the bars, so their volume isn't counted twice
+                    is_new = np.array([txn_hash.tobytes() not in replayed_txn_hashes[(symbol_underlying, symbol_quote)] for txn_hash in columns['txn_hash']], dtype=bool)
+                    columns = {column: array[is_new] for column, array in columns.items()}
+                closed_bars = bar_builders[(symbol_underlying, symbol_quote)].update(columns, up_to=chunk_end_timestamp)
+                if len(closed_bars['bar_start']) != 0:
+                    self.logger.debug(f'PancakeSwapV2 {symbol_underlying}/{symbol_quote}: {len(closed_bars["bar_start"])} new {self.bar_interval_seconds}s bars. Last close: {closed_bars["close"][-1]}.')
+
+        ## Grab Data in Chunks, processing each Chunk as soon as its Blocks exist
+        CommsDEXPancakeSwapV2.backfill_historical_trades(
+            checkpoint=checkpoint, pairs=pairs, on_chunk=save_chunk,
+            chunk_blocks=query_period_in_blocks, wait_for_blocks=True,
+            batch_size=CommsDEXPancakeSwapV2.rpc_batch_size
+        )
 
-            while True:
-                ## Download Data
-                latest_block = CommsDEXPancakeSwapV2.get_latest_block_number()
-                if sub_end_block <= latest_block:
-                    output_data = CommsDEXPancakeSwapV2.get_historical_trades(symbol_1=symbol_underlying, symbol_2=symbol_quote, start_block=sub_start_block, end_block=sub_end_block)
-                    break
-                ## If sub_end_block isn't ready yet, sleep for the estimated time needed to get to sub_end_block
-                else:
-                    time.sleep(abs(sub_end_block - latest_block) * CommsDEXPancakeSwapV2.average_block_seconds)
-
-            ## Save Price Data in case program crashes or something
-            self.save_downloaded_price_data(
-                output_data=output_data, exchange_name=exchange_name,
-                start_dt=start_dt, end_dt=end_dt,
-                symbol_1=exchange_data['underlying'], symbol_2=exchange_data['quote'],
-                add_to_existing=True
+        ## Window Closed: merge each Pair's Chunks into one File, and save its Bars
+        for symbol_underlying, symbol_quote in pairs:
+            self.compact_downloaded_price_data(
+                exchange_name=exchange_name, start_dt=start_dt, end_dt=end_dt,
+                symbol_1=symbol_underlying, symbol_2=symbol_quote
+            )
+            bar_builder = bar_builders[(symbol_underlying, symbol_quote)]
+            bar_builder.flush()
+            BarBuilder.save(
+                file_loc=self.get_price_data_file_loc(exchange_name=exchange_name, start_dt=start_dt, end_dt=end_dt, symbol_1=symbol_underlying, symbol_2=symbol_quote, suffix=f'_bars_{self.bar_interval_seconds}s'),
+                bars=bar_builder.bars
             )
-            ## Sleep for query_period_in_blocks number of blocks
-            time.sleep(query_period_in_blocks * CommsDEXPancakeSwapV2.average_block_seconds)
+        self.logger.debug(f'Finished downloading price data from PancakeSwapV2 for symbols {[f"{symbol_underlying}/{symbol_quote}" for symbol_underlying, symbol_quote in pairs]}.')
         return
 
 
@@ -127,7 +177,7 @@ class ReconCoinListing(StratCoinListing):
     def grab_price_data_all_exchanges(self, new_listing_queue: multiprocessing.Queue):
         '''
         Queries a queue of symbols that are newly listed, finds all exchanges and pairs on each exchange
-        that exist for the symbol, then make a new process to download price data, for each pair on each
+        that exist for the symbol, then make a new process to download price data for all the pairs on each
         exchange.
 
         UPGRADE
@@ -160,18 +210,18 @@ class ReconCoinListing(StratCoinListing):
                 self.save_exchange_data(symbol=new_listing_symbol, exchanges_listing_coin=exchanges_listing_coin, datetime_pulled=exchange_data_datetime)
 
                 ## Download Price Data from all Exchanges listing the Symbol
-                processes = {}
+                exchange_data_by_exchange = {}
                 for exchange_data in exchanges_listing_coin:
-                    exchange_name = exchange_data['exchange_name']
-                    symbol_underlying = exchange_data['underlying']
-                    symbol_quote = exchange_data['quote']
-                    process_name = f'p_data_downloader_{exchange_name}_{symbol_underlying}_v_{symbol_quote}'
+                    exchange_data_by_exchange.setdefault(exchange_data['exchange_name'], []).append(exchange_data)
+                processes = {}
+                for exchange_name, exchange_data_list in exchange_data_by_exchange.items():
+                    process_name = f'p_data_downloader_{exchange_name}_{new_listing_symbol}'
                     process_target = process_target_index.get(exchange_name, None)
                     if process_target is not None:
                         process_object = multiprocessing.Process(
                             name=process_name,
                             target=process_target,
-                            kwargs={'exchange_name': exchange_name, 'exchange_data': exchange_data}
+                            kwargs={'exchange_name': exchange_name, 'exchange_data_list': exchange_data_list, 'listing_dt': exchange_data_datetime}
                         )
                         processes.update({process_name: process_object})
                 for process_name, process_object in processes.items():
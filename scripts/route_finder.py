@@ -0,0 +1,117 @@
+## External Libraries
+from typing import List, Union
+
+
+class RouteFinder():
+    '''
+    Finds the swap path that returns the most output tokens, over a local graph of known pairs and their reserves.
+
+    A newly listed token often only has liquidity against WBNB or BUSD, so a direct [sell, buy] swap can be impossible,
+    or much worse than going through one or two liquid base tokens. Paths of 1 to self.max_hops pools are searched.
+        - the graph only changes when a pair is added, so the simple paths between two tokens are found once and kept.
+        - quotes are done with self.AMM's exact integer math, from the reserves last given to self.update_reserves(),
+          so searching makes no network calls.
+
+    Methods
+    -------
+    add_pair
+    update_reserves
+    get_paths
+    get_path_pools
+    quote
+    find_best_route
+
+    Attributes
+    ----------
+    self.pair_tokens  ({pool_address: (token_address_a, token_address_b)})
+    self.graph  ({token_address: {token_address: pool_address}})
+    self.reserves  ({pool_address: {token_address: reserve}}, in integer token units)
+    '''
+
+    def __init__(self, AMM, max_hops: int = 3):
+        self.AMM = AMM
+        self.max_hops = max_hops
+        self.pair_tokens = {}
+        self.graph = {}
+        self.reserves = {}
+        self.paths = {}  # {(token_in, token_out, max_hops): [path, ...]}
+
+
+    def add_pair(self, pool_address: str, token_address_a: str, token_address_b: str):
+        if pool_address in self.pair_tokens:
+            return
+        self.pair_tokens[pool_address] = (token_address_a, token_address_b)
+        self.graph.setdefault(token_address_a, {})[token_address_b] = pool_address
+        self.graph.setdefault(token_address_b, {})[token_address_a] = pool_address
+        self.paths = {}  # new paths may now exist between any two tokens
+
+
+    def update_reserves(self, raw_reserves: dict):
+        '''
+        Parameters
+        ----------
+        raw_reserves : dict
+            {pool_address: {token_address: reserve}}, e.g. the 'reserves' of each pool from get_raw_reserves_many().
+        '''
+        self.reserves.update(raw_reserves)
+
+
+    def get_paths(self, token_in: str, token_out: str, max_hops: Union[int, None] = None) -> List[tuple]:
+        ''' Every path of token addresses from token_in to token_out, of 1 to max_hops pools, that visits no token twice. '''
+        max_hops = self.max_hops if max_hops is None else max_hops
+        key = (token_in, token_out, max_hops)
+        if key not in self.paths:
+            paths = []
+            stack = [(token_in,)]
+            while stack:
+                path = stack.pop()
+                for next_token in self.graph.get(path[-1], {}):
+                    if next_token == token_out:
+                        paths.append(path + (next_token,))
+                    elif (next_token not in path) and (len(path) < max_hops):
+                        stack.append(path + (next_token,))
+            self.paths[key] = sorted(paths, key=len)
+        return self.paths[key]
+
+
+    def get_path_pools(self, path: tuple) -> List[str]:
+        return [self.graph[token_in][token_out] for token_in, token_out in zip(path[:-1], path[1:])]
+
+
+    def quote(self, amount_in: int, path: tuple) -> Union[List[int], None]:
+        '''
+        Returns the amount after each hop, starting with amount_in, as the router's getAmountsOut.
+        Returns None if any pool on the path has no known reserves or no liquidity.
+        '''
+        path_reserves = []
+        for token_in, token_out in zip(path[:-1], path[1:]):
+            reserves = self.reserves.get(self.graph[token_in][token_out])
+            if (not reserves) or (reserves[token_in] <= 0) or (reserves[token_out] <= 0):
+                return None
+            path_reserves.append((reserves[token_in], reserves[token_out]))
+        return self.AMM.get_amounts_out(amount_in, path_reserves)
+
+
+    def find_best_route(
+        self, amount_in: int, token_in: str, token_out: str, max_hops: Union[int, None] = None, pool_addresses: Union[set, None] = None
+    ) -> Union[dict, None]:
+        '''
+        Parameters
+        ----------
+        amount_in : int
+            In integer token units of token_in.
+        pool_addresses : set
+            If given, only paths whose every pool is in this set are searched, e.g. the pools whose reserves were just
+            refreshed, so that no path is quoted on stale reserves of a pair left in the graph by an earlier search.
+
+        Returns {'path', 'pools', 'amounts', 'amount_out'} of the path with the most output, or None if no path has liquidity.
+        Ties go to the path with fewer hops, as it costs less gas.
+        '''
+        best_route = None
+        for path in self.get_paths(token_in, token_out, max_hops=max_hops):
+            if (pool_addresses is not None) and (not pool_addresses.issuperset(self.get_path_pools(path))):
+                continue
+            amounts = self.quote(amount_in, path)
+            if (amounts is not None) and ((best_route is None) or (amounts[-1] > best_route['amount_out'])):
+                best_route = {'path': list(path), 'pools': self.get_path_pools(path), 'amounts': amounts, 'amount_out': amounts[-1]}
+        return best_route
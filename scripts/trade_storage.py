@@ -0,0 +1,211 @@
+## External Libraries
+from typing import Union, List
+from datetime import datetime, timezone
+import numpy as np
+import os
+
+
+class TradeStorage():
+    '''
+    Columnar storage for the trades returned by CommsDEXPancakeSwapV2.get_historical_trades().
+
+    Trades are stored as one typed NumPy array per column in a compressed .npz file, so that:
+        - a single column can be loaded without loading the others (np.load only decompresses the arrays accessed)
+        - there are no per-row Python objects to (un)pickle.
+
+    Columns
+    -------
+    txn_hash     : V32      raw 32 byte transaction hash (void, not S32, as NumPy strips trailing NUL bytes from S elements)
+    block_number : int64
+    txn_index    : int32
+    timestamp    : int64    block timestamp in unix seconds
+    buy_symbol   : str
+    sell_symbol  : str
+    buy_amount   : float64
+    sell_amount  : float64
+    gas_used     : int64    -1 if not recorded
+    gas_price    : int64    in wei
+
+    Rows are sorted by (block_number, txn_index).
+    '''
+
+    file_extension = '.npz'
+    dtypes = {
+        'txn_hash'    : 'V32',
+        'block_number': np.int64,
+        'txn_index'   : np.int32,
+        'timestamp'   : np.int64,
+        'buy_symbol'  : np.str_,
+        'sell_symbol' : np.str_,
+        'buy_amount'  : np.float64,
+        'sell_amount' : np.float64,
+        'gas_used'    : np.int64,
+        'gas_price'   : np.int64,
+    }
+
+
+    key_columns = ['txn_hash', 'block_number', 'txn_index']  # needed to dedupe and sort rows
+
+
+    @classmethod
+    def empty_columns(cls, columns: Union[List[str], None] = None) -> dict:
+        return {column: np.array([], dtype=cls.dtypes[column]) for column in (cls.dtypes if columns is None else columns)}
+
+
+    @classmethod
+    def to_columns(cls, output_data: dict) -> dict:
+        ''' Converts {txn_hash: {...}} from get_historical_trades() into sorted columns. '''
+        if not output_data:
+            return cls.empty_columns()
+        rows = output_data.values()
+        columns = {
+            'txn_hash'    : np.array([bytes.fromhex(txn_hash[2:] if txn_hash.startswith('0x') else txn_hash) for txn_hash in output_data], dtype='V32'),
+            'block_number': np.fromiter((d['block_number'] for d in rows), dtype=np.int64, count=len(rows)),
+            'txn_index'   : np.fromiter((d['txn_index'] for d in rows), dtype=np.int32, count=len(rows)),
+            'timestamp'   : np.fromiter((int(d['block_datetime'].timestamp()) for d in rows), dtype=np.int64, count=len(rows)),
+            'buy_symbol'  : np.array([d['buy_symbol'] or '' for d in rows], dtype=np.str_),
+            'sell_symbol' : np.array([d['sell_symbol'] or '' for d in rows], dtype=np.str_),
+            'buy_amount'  : np.fromiter((d['buy_amount'] for d in rows), dtype=np.float64, count=len(rows)),
+            'sell_amount' : np.fromiter((d['sell_amount'] for d in rows), dtype=np.float64, count=len(rows)),
+            'gas_used'    : np.fromiter((-1 if d['gas_used'] is None else d['gas_used'] for d in rows), dtype=np.int64, count=len(rows)),
+            'gas_price'   : np.fromiter((d['gas_price'] for d in rows), dtype=np.int64, count=len(rows)),
+        }
+        return cls.sort(columns)
+
+
+    @staticmethod
+    def from_columns(columns: dict) -> dict:
+        ''' Converts columns back into the {txn_hash: {...}} format of get_historical_trades(). '''
+        return {
+            '0x' + columns['txn_hash'][i].tobytes().hex(): {
+                'block_number': int(columns['block_number'][i]),
+                'txn_index': int(columns['txn_index'][i]),
+                'block_datetime': datetime.fromtimestamp(int(columns['timestamp'][i]), tz=timezone.utc),
+                'buy_symbol': str(columns['buy_symbol'][i]) or None,
+                'sell_symbol': str(columns['sell_symbol'][i]) or None,
+                'buy_amount': float(columns['buy_amount'][i]),
+                'sell_amount': float(columns['sell_amount'][i]),
+                'gas_used': None if columns['gas_used'][i] == -1 else int(columns['gas_used'][i]),
+                'gas_price': int(columns['gas_price'][i]),
+            }
+            for i in range(len(columns['txn_hash']))
+        }
+
+
+    @staticmethod
+    def sort(columns: dict) -> dict:
+        order = np.lexsort((columns['txn_index'], columns['block_number']))
+        return {column: array[order] for column, array in columns.items()}
+
+
+    @classmethod
+    def concat(cls, columns_list: List[dict]) -> dict:
+        '''
+        Joins many sets of columns into one, sorted, set of columns.
+        Rows with the same txn_hash are only kept once; the row from the latest set in `columns_list` is kept.
+        Every set must have the same columns, including self.key_columns.
+        '''
+        column_names = list(columns_list[0]) if columns_list else list(cls.dtypes)
+        columns_list = [columns for columns in columns_list if len(columns['txn_hash']) != 0]
+        if not columns_list:
+            return cls.empty_columns(column_names)
+        columns = {column: np.concatenate([c[column] for c in reversed(columns_list)]) for column in column_names}
+        _, first_index = np.unique(columns['txn_hash'], return_index=True)
+        return cls.sort({column: array[first_index] for column, array in columns.items()})
+
+
+    @classmethod
+    def save(cls, file_loc: str, columns: dict):
+        ''' Saves columns (see self.to_columns) to file_loc, which should end with self.file_extension. '''
+        with open(file_loc, 'wb') as f:
+            np.savez_compressed(f, **{column: columns[column] for column in cls.dtypes})
+
+
+    @classmethod
+    def load(cls, file_loc: str, columns: Union[List[str], None] = None) -> dict:
+        '''
+        Parameters
+        ----------
+        columns : List[str]
+            The columns to load. Loads all columns if None.
+        '''
+        with np.load(file_loc) as npz_file:
+            output = {column: npz_file[column] for column in (cls.dtypes if columns is None else columns)}
+        if ('txn_hash' in output) and (output['txn_hash'].dtype.kind == 'S'):  # saved before txn_hash was V32. S32 is stored NUL padded, so the view restores any stripped bytes
+            output['txn_hash'] = output['txn_hash'].astype('S32').view('V32')
+        return output
+
+
+
+class TradeSegmentWriter():
+    '''
+    Appends trades to a TradeStorage file without rewriting it.
+
+    Each call to self.append() writes only the new rows, as a new segment file in the folder
+    f'{file_loc}.segments'. Once no more rows are coming, self.compact() merges the segments
+    (and file_loc itself, if it already exists) into file_loc and deletes the segments.
+    Total I/O is therefore linear in the number of rows instead of quadratic.
+
+    Methods
+    -------
+    segment_locs
+    append
+    load
+    compact
+    '''
+
+    def __init__(self, file_loc: str):
+        self.file_loc = file_loc
+        self.segments_folder = f'{file_loc}.segments'
+
+
+    def segment_locs(self) -> List[str]:
+        ''' Saved segments, oldest first. '''
+        if not os.path.isdir(self.segments_folder):
+            return []
+        file_names = sorted(f for f in os.listdir(self.segments_folder) if f.endswith(TradeStorage.file_extension))
+        return [os.path.join(self.segments_folder, f) for f in file_names]
+
+
+    def append(self, columns: dict):
+        ''' Writes `columns` (see TradeStorage.to_columns) as a new segment. Does nothing if there are no rows. '''
+        if len(columns['txn_hash']) == 0:
+            return self
+        os.makedirs(self.segments_folder, exist_ok=True)
+        segment_locs = self.segment_locs()
+        segment_number = int(os.path.basename(segment_locs[-1]).split('.')[0]) + 1 if segment_locs else 0
+        segment_loc = os.path.join(self.segments_folder, f'{segment_number:06d}{TradeStorage.file_extension}')
+        ## Write then Rename, so a crash never leaves a partial segment
+        temp_loc = f'{segment_loc}.tmp'
+        TradeStorage.save(temp_loc, columns)
+        os.replace(temp_loc, segment_loc)
+        return self
+
+
+    def load(self, columns: Union[List[str], None] = None) -> dict:
+        '''
+        Loads file_loc plus all segments not yet compacted into it, deduped and sorted.
+
+        Parameters
+        ----------
+        columns : List[str]
+            The columns to load. Loads all columns if None. TradeStorage.key_columns are always read, to dedupe and sort.
+        '''
+        file_locs = ([self.file_loc] if os.path.exists(self.file_loc) else []) + self.segment_locs()
+        load_columns = None if columns is None else list(dict.fromkeys(TradeStorage.key_columns + list(columns)))
+        output = TradeStorage.concat([TradeStorage.load(f, load_columns) for f in file_locs] or [TradeStorage.empty_columns(load_columns)])
+        return output if columns is None else {column: output[column] for column in columns}
+
+
+    def compact(self):
+        ''' Merges all segments into file_loc, then deletes the segments. '''
+        segment_locs = self.segment_locs()
+        if not segment_locs:
+            return self
+        temp_loc = f'{self.file_loc}.tmp{TradeStorage.file_extension}'
+        TradeStorage.save(temp_loc, self.load())
+        os.replace(temp_loc, self.file_loc)
+        for segment_loc in segment_locs:
+            os.remove(segment_loc)
+        os.rmdir(self.segments_folder)
+        return self
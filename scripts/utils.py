@@ -58,6 +58,9 @@ class Folder(Enum):
     DATA_RECON_COIN_LISTING = os.path.join(parent, 'data', 'recon_coin_listing')
     DATA_TWEETS             = os.path.join(parent, 'data', 'tweets')
     DATA_DEX_PRICES         = os.path.join(parent, 'data', 'dex_prices')
+    DATA_CHAIN_INDEX        = os.path.join(parent, 'data', 'chain_index')
+    DATA_CHECKPOINTS        = os.path.join(parent, 'data', 'checkpoints')
+    DATA_ABIS               = os.path.join(parent, 'data', 'abis')
     LOGS                    = os.path.join(parent, 'logs')
 class File(Enum):
     CONFIG           = os.path.join(Folder.CONFIG.value, 'config.json')
@@ -0,0 +1,65 @@
+## Internal Modules
+from scripts.amm_math import ConstantProductAMM
+
+## External Libraries
+import numpy as np
+import pytest
+
+
+## 100 WBNB / 30,000 BUSD pool, in 18 decimal integer units
+reserve_wbnb = 100 * 10**18
+reserve_busd = 30_000 * 10**18
+
+
+def test_get_amount_out_matches_router():
+    assert ConstantProductAMM().get_amount_out(10**18, reserve_wbnb, reserve_busd) == 296294462734226094705
+    assert ConstantProductAMM(fee_numerator=997, fee_denominator=1000).get_amount_out(10**18, reserve_wbnb, reserve_busd) == 296147410319118389655
+
+
+def test_get_amount_in_matches_router():
+    assert ConstantProductAMM().get_amount_in(300 * 10**18, reserve_wbnb, reserve_busd) == 1012632591579960002
+
+
+def test_get_amount_in_buys_at_least_amount_out():
+    amm = ConstantProductAMM()
+    for amount_out in [1, 10**6, 10**18, 1234 * 10**18]:
+        amount_in = amm.get_amount_in(amount_out, reserve_wbnb, reserve_busd)
+        assert amm.get_amount_out(amount_in, reserve_wbnb, reserve_busd) >= amount_out
+        assert amm.get_amount_out(amount_in - 1, reserve_wbnb, reserve_busd) < amount_out
+
+
+def test_multi_hop_amounts_chain_single_hops():
+    amm = ConstantProductAMM()
+    path_reserves = [(reserve_wbnb, reserve_busd), (50_000 * 10**18, 49_900 * 10**18)]
+    amounts = amm.get_amounts_out(10**18, path_reserves)
+    assert amounts[1] == amm.get_amount_out(10**18, *path_reserves[0])
+    assert amounts[2] == amm.get_amount_out(amounts[1], *path_reserves[1])
+    assert amm.get_amounts_in(amounts[2], path_reserves)[-1] == amounts[2]
+
+
+def test_many_matches_scalar():
+    amm = ConstantProductAMM()
+    amounts = np.array([0, 1, 10**15, 10**18, 50 * 10**18], dtype=object)
+    reserves_in = np.array([reserve_wbnb, 10**30, 0], dtype=object)
+    reserves_out = np.array([reserve_busd, 10**12, reserve_busd], dtype=object)
+    amounts_out = amm.get_amount_out_many(amounts[:, None], reserves_in, reserves_out)
+    amounts_in = amm.get_amount_in_many(amounts[:, None], reserves_in, reserves_out)
+    for i, amount in enumerate(amounts):
+        for j in range(len(reserves_in)):
+            assert amounts_out[i, j] == amm.get_amount_out(amount, reserves_in[j], reserves_out[j])
+            try:
+                expected_amount_in = amm.get_amount_in(amount, reserves_in[j], reserves_out[j])
+            except ValueError:
+                expected_amount_in = None
+            assert amounts_in[i, j] == expected_amount_in
+
+
+def test_empty_pool_is_not_quoted():
+    amm = ConstantProductAMM()
+    assert amm.get_amount_out(10**18, 0, reserve_busd) == 0
+    with pytest.raises(ValueError):
+        amm.get_amount_in(10**18, 0, reserve_busd)
+    with pytest.raises(ValueError):
+        amm.get_amount_in(10**18, reserve_wbnb, 0)
+    with pytest.raises(ValueError):
+        amm.get_amount_in(reserve_busd, reserve_wbnb, reserve_busd)
@@ -0,0 +1,68 @@
+## Internal Modules
+from scripts.bar_builder import BarBuilder
+
+## External Libraries
+import numpy as np
+
+
+def make_columns(trades: list) -> dict:
+    ''' trades: [(timestamp, buy_symbol, sell_symbol, buy_amount, sell_amount)] '''
+    return {
+        'timestamp': np.array([trade[0] for trade in trades], dtype=np.int64),
+        'block_number': np.array([trade[0] // 3 for trade in trades], dtype=np.int64),
+        'buy_symbol': np.array([trade[1] for trade in trades]),
+        'sell_symbol': np.array([trade[2] for trade in trades]),
+        'buy_amount': np.array([trade[3] for trade in trades], dtype=np.float64),
+        'sell_amount': np.array([trade[4] for trade in trades], dtype=np.float64),
+    }
+
+
+trades = [
+    (100, 'NEW', 'BUSD', 10.0, 10.0),   # buy 10 NEW at 1.0
+    (110, 'BUSD', 'NEW', 6.0, 3.0),     # sell 3 NEW at 2.0
+    (115, 'WBNB', 'BUSD', 1.0, 300.0),  # another pair, ignored
+    (130, 'NEW', 'BUSD', 1.0, 1.5),     # buy 1 NEW at 1.5
+    (175, 'NEW', 'BUSD', 2.0, 1.0),     # buy 2 NEW at 0.5
+]
+
+
+def test_build():
+    bars = BarBuilder(underlying_symbol='NEW', quote_symbol='BUSD', interval=60).build(make_columns(trades))
+    assert list(bars['bar_start']) == [60, 120]
+    assert list(bars['open']) == [1.0, 1.5]
+    assert list(bars['high']) == [2.0, 1.5]
+    assert list(bars['low']) == [1.0, 0.5]
+    assert list(bars['close']) == [2.0, 0.5]
+    assert list(bars['volume']) == [13.0, 3.0]
+    assert list(bars['quote_volume']) == [16.0, 2.5]
+    assert list(bars['vwap']) == [16.0 / 13.0, 2.5 / 3.0]
+    assert list(bars['trade_count']) == [2, 2]
+
+
+def test_update_in_chunks_matches_build():
+    bar_builder = BarBuilder(underlying_symbol='NEW', quote_symbol='BUSD', interval=60)
+    closed_bars = bar_builder.update(make_columns(trades[:1]), up_to=105)
+    assert len(closed_bars['bar_start']) == 0  # the 60-119 bar is still open
+    closed_bars = bar_builder.update(make_columns(trades[1:4]), up_to=140)
+    assert list(closed_bars['bar_start']) == [60]
+    bar_builder.update(make_columns(trades[4:]), up_to=179)
+    assert list(bar_builder.open_bar['bar_start']) == []  # 179 is the last second of the 120-179 bar
+    bar_builder.flush()
+    expected_bars = BarBuilder(underlying_symbol='NEW', quote_symbol='BUSD', interval=60).build(make_columns(trades))
+    for column in BarBuilder.bar_columns:
+        assert list(bar_builder.bars[column]) == list(expected_bars[column])
+
+
+def test_bars_by_block():
+    bars = BarBuilder(underlying_symbol='NEW', quote_symbol='BUSD', interval=20, by='block').build(make_columns(trades))
+    assert list(bars['bar_start']) == [20, 40]
+    assert list(bars['trade_count']) == [2, 2]
+
+
+def test_save_and_load(tmp_path):
+    bars = BarBuilder(underlying_symbol='NEW', quote_symbol='BUSD', interval=60).build(make_columns(trades))
+    file_loc = str(tmp_path / 'bars.npz')
+    BarBuilder.save(file_loc, bars)
+    loaded_bars = BarBuilder.load(file_loc)
+    for column in BarBuilder.bar_columns:
+        assert list(loaded_bars[column]) == list(bars[column])
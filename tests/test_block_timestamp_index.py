@@ -0,0 +1,25 @@
+## Internal Modules
+from scripts.block_timestamp_index import BlockTimestampIndex
+
+
+def test_add_is_shared_through_the_file(tmp_path):
+    fileloc = str(tmp_path / 'index' / 'block_timestamps.bin')
+    index_1 = BlockTimestampIndex(fileloc)
+    index_2 = BlockTimestampIndex(fileloc)
+    index_1.add({10: 1000, 30: 1060})
+    index_1.add({20: 1030, 10: 1000})  # out of order, and a duplicate
+    index_2.refresh()
+    assert index_2.block_numbers == [10, 20, 30]
+    assert index_2.timestamps == [1000, 1030, 1060]
+    assert index_2.missing([10, 15, 20, 25]) == [15, 25]
+
+
+def test_get_bracket(tmp_path):
+    index = BlockTimestampIndex(str(tmp_path / 'block_timestamps.bin')).add({10: 1000, 20: 1030, 30: 1060})
+    assert index.get_bracket(1030, closest='before') == (20, 30)
+    assert index.get_bracket(1030, closest='after') == (10, 20)
+    assert index.get_bracket(1045, closest='before') == (20, 30)
+    assert index.get_bracket(1045, closest='after') == (20, 30)
+    assert index.get_bracket(900, closest='before') == (None, 10)
+    assert index.get_bracket(2000, closest='after') == (30, None)
+    assert BlockTimestampIndex(str(tmp_path / 'empty.bin')).get_bracket(1000) is None
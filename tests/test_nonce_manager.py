@@ -0,0 +1,33 @@
+## Internal Modules
+from scripts.nonce_manager import NonceManager
+
+## External Libraries
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import logging
+
+
+def make_w3(transaction_count: int):
+    calls = []
+    def get_transaction_count(address, block_identifier):
+        calls.append((address, block_identifier))
+        return transaction_count
+    return SimpleNamespace(eth=SimpleNamespace(get_transaction_count=get_transaction_count)), calls
+
+
+def test_nonces_are_unique_across_threads():
+    w3, calls = make_w3(transaction_count=7)
+    nonce_manager = NonceManager(w3=w3, address='0xwallet', logger=logging.getLogger(__name__))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        nonces = list(executor.map(lambda _: nonce_manager.get_nonce(), range(100)))
+    assert sorted(nonces) == list(range(7, 107))
+    assert calls == [('0xwallet', 'pending')]  # synced once
+
+
+def test_resync_after_error():
+    w3, calls = make_w3(transaction_count=3)
+    nonce_manager = NonceManager(w3=w3, address='0xwallet', logger=logging.getLogger(__name__))
+    assert [nonce_manager.get_nonce(), nonce_manager.get_nonce()] == [3, 4]
+    nonce_manager.resync_after_error(Exception('send failed'))
+    assert nonce_manager.get_nonce() == 3
+    assert len(calls) == 2
@@ -0,0 +1,57 @@
+## Internal Modules
+from scripts.amm_math import ConstantProductAMM
+from scripts.route_finder import RouteFinder
+
+
+def make_route_finder() -> RouteFinder:
+    '''
+    NEW only has a thin pool against BUSD, and a deep one against WBNB:
+        NEW/BUSD: 1,200 NEW / 1,000 BUSD  (a better price than through WBNB, for small trades)
+        NEW/WBNB: 100,000 NEW / 300 WBNB
+        WBNB/BUSD: 10,000 WBNB / 3,000,000 BUSD
+    '''
+    route_finder = RouteFinder(ConstantProductAMM(), max_hops=3)
+    route_finder.add_pair('pool_new_busd', 'NEW', 'BUSD')
+    route_finder.add_pair('pool_new_wbnb', 'NEW', 'WBNB')
+    route_finder.add_pair('pool_wbnb_busd', 'WBNB', 'BUSD')
+    route_finder.update_reserves({
+        'pool_new_busd': {'NEW': 1_200 * 10**18, 'BUSD': 1_000 * 10**18},
+        'pool_new_wbnb': {'NEW': 100_000 * 10**18, 'WBNB': 300 * 10**18},
+        'pool_wbnb_busd': {'WBNB': 10_000 * 10**18, 'BUSD': 3_000_000 * 10**18},
+    })
+    return route_finder
+
+
+def test_get_paths_are_simple_and_shortest_first():
+    route_finder = make_route_finder()
+    assert route_finder.get_paths('BUSD', 'NEW') == [('BUSD', 'NEW'), ('BUSD', 'WBNB', 'NEW')]
+    assert route_finder.get_paths('BUSD', 'NEW', max_hops=1) == [('BUSD', 'NEW')]
+
+
+def test_large_trade_routes_through_deeper_pool():
+    route_finder = make_route_finder()
+    amount_in = 500 * 10**18
+    route = route_finder.find_best_route(amount_in, 'BUSD', 'NEW')
+    assert route['path'] == ['BUSD', 'WBNB', 'NEW']
+    assert route['pools'] == ['pool_wbnb_busd', 'pool_new_wbnb']
+    assert route['amounts'][0] == amount_in
+    assert route['amount_out'] == route_finder.quote(amount_in, ('BUSD', 'WBNB', 'NEW'))[-1]
+    assert route['amount_out'] > route_finder.quote(amount_in, ('BUSD', 'NEW'))[-1]
+
+
+def test_small_trade_takes_direct_pool():
+    route = make_route_finder().find_best_route(10**15, 'BUSD', 'NEW')
+    assert route['path'] == ['BUSD', 'NEW']
+
+
+def test_pools_without_reserves_are_skipped():
+    route_finder = make_route_finder()
+    route_finder.update_reserves({'pool_new_wbnb': {'NEW': 0, 'WBNB': 0}})
+    assert route_finder.find_best_route(500 * 10**18, 'BUSD', 'NEW')['path'] == ['BUSD', 'NEW']
+
+
+def test_only_given_pools_are_searched():
+    route_finder = make_route_finder()
+    route = route_finder.find_best_route(500 * 10**18, 'BUSD', 'NEW', pool_addresses={'pool_new_busd'})
+    assert route['path'] == ['BUSD', 'NEW']
+    assert route_finder.find_best_route(500 * 10**18, 'BUSD', 'NEW', pool_addresses=set()) is None
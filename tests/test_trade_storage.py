@@ -0,0 +1,48 @@
+## Internal Modules
+from scripts.trade_storage import TradeStorage, TradeSegmentWriter
+
+## External Libraries
+from datetime import datetime, timezone
+
+
+def make_trade(block_number: int, txn_index: int) -> dict:
+    return {
+        'block_number': block_number,
+        'txn_index': txn_index,
+        'block_datetime': datetime.fromtimestamp(1_600_000_000 + block_number, tz=timezone.utc),
+        'buy_symbol': 'WBNB',
+        'sell_symbol': 'BUSD',
+        'buy_amount': 1.5,
+        'sell_amount': 450.0,
+        'gas_used': None,
+        'gas_price': 5_000_000_000,
+    }
+
+
+def test_txn_hash_ending_in_zero_byte_round_trips(tmp_path):
+    output_data = {
+        '0x' + 'ab' * 31 + '00': make_trade(10, 0),
+        '0x' + '00' * 32: make_trade(10, 1),
+        '0x' + 'cd' * 32: make_trade(11, 0),
+    }
+    file_loc = str(tmp_path / f'trades{TradeStorage.file_extension}')
+    TradeStorage.save(file_loc, TradeStorage.to_columns(output_data))
+    assert TradeStorage.from_columns(TradeStorage.load(file_loc)) == output_data
+
+
+def test_concat_keeps_hashes_that_differ_only_by_trailing_zero_byte():
+    output_data_1 = {'0x' + 'ab' * 31 + '00': make_trade(10, 0)}
+    output_data_2 = {'0x' + '00' + 'ab' * 31: make_trade(10, 1), '0x' + 'ab' * 31 + '00': make_trade(10, 0)}
+    columns = TradeStorage.concat([TradeStorage.to_columns(output_data_1), TradeStorage.to_columns(output_data_2)])
+    assert len(columns['txn_hash']) == 2
+
+
+def test_segment_load_with_columns_is_deduped_and_sorted(tmp_path):
+    writer = TradeSegmentWriter(str(tmp_path / f'trades{TradeStorage.file_extension}'))
+    writer.append(TradeStorage.to_columns({'0x' + '11' * 32: make_trade(12, 0), '0x' + '22' * 32: make_trade(10, 0)}))
+    writer.append(TradeStorage.to_columns({'0x' + '11' * 32: make_trade(12, 0), '0x' + '33' * 32: make_trade(11, 0)}))
+    full = writer.load()
+    partial = writer.load(columns=['timestamp'])
+    assert list(partial) == ['timestamp']
+    assert list(partial['timestamp']) == list(full['timestamp'])
+    assert list(full['block_number']) == [10, 11, 12]